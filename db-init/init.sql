@@ -2,14 +2,17 @@
 CREATE TABLE IF NOT EXISTS users (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(80) NOT NULL,
-    email VARCHAR(80) NOT NULL
+    email VARCHAR(80) NOT NULL,
+    INDEX idx_users_email (email)
 );
 
 CREATE TABLE IF NOT EXISTS products (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(80) NOT NULL,
     brand VARCHAR(20) NOT NULL,
-    price DECIMAL(10, 2) NOT NULL
+    price DECIMAL(10, 2) NOT NULL,
+    INDEX idx_products_brand (brand),
+    INDEX idx_products_price (price)
 );
 
 -- Créer des enregistrements dans Users
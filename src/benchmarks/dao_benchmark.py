@@ -0,0 +1,279 @@
+"""
+DAO micro-benchmarks
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+
+Measures throughput and p50/p95/p99 latency of each DAO operation and of model construction,
+then writes the results as JSON so that two commits can be compared.
+
+Run from the src directory:
+    python -m benchmarks.dao_benchmark --backend local --output bench.json
+    python -m benchmarks.dao_benchmark --backend docker --sizes 1000,100000
+    python -m benchmarks.dao_benchmark --compare before.json after.json
+
+The "local" backend uses an SQLite file and an in-memory MongoDB (mongomock, installed by
+requirements-dev.txt). The "docker" backend uses the MySQL and MongoDB servers from .env;
+it EMPTIES the users and products tables, exactly like the test suite does.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.standins import create_mongo_client
+from daos.fast_rows import HAVE_CEXT
+from daos.product_dao import ProductDAO
+from daos.product_dao_sqlite import ProductDAOSQLite
+from daos.user_dao import UserDAO
+from daos.user_dao_sqlite import UserDAOSQLite
+from daos.user_dao_mongo import UserDAOMongo
+from models.product import Product
+from models.product_batch import ProductBatch
+from models.user import User
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+BRANDS = ("Apple", "Samsung", "Google", "Sony", "Lenovo", "Dell", "Asus", "LG")
+
+
+def make_product(i):
+    return Product(None, f"Produit {i}", BRANDS[i % len(BRANDS)], round(1 + (i % 100000) / 100, 2))
+
+
+def make_user(i):
+    return User(None, f"Utilisateur {i}", f"user{i}@example.com")
+
+
+def percentile(sorted_samples, q):
+    """ Nearest-rank percentile of already sorted samples """
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, round(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(target, name, latencies, rows):
+    """ Turn per-call latencies (seconds) into one result record; throughput is rows per second """
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        "target": target,
+        "name": name,
+        "calls": len(ordered),
+        "rows": rows,
+        "throughput": rows / total if total else 0.0,
+        "mean_ms": total / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+    }
+
+
+def time_calls(calls):
+    """ Run each zero-argument callable and return its latency in seconds """
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_dao(target, dao, make_item, sizes, samples, batch_size):
+    """ Benchmark the CRUD operations of one DAO """
+    results = []
+    dao.delete_all()
+
+    items = [make_item(i) for i in range(samples)]
+    ids = []
+    latencies = time_calls(lambda item=item: ids.append(dao.insert(item)) for item in items)
+    results.append(summarize(target, "insert", latencies, samples))
+
+    for item, item_id in zip(items, ids):
+        item.id = item_id
+        item.name = item.name + " (modifié)"
+    latencies = time_calls(lambda item=item: dao.update(item) for item in items)
+    results.append(summarize(target, "update", latencies, samples))
+
+    latencies = time_calls(lambda item_id=item_id: dao.delete(item_id) for item_id in ids)
+    results.append(summarize(target, "delete", latencies, samples))
+
+    batches = [[make_item(i) for i in range(batch_size)] for _ in range(3)]
+    latencies = time_calls(lambda batch=batch: dao.insert_many(batch) for batch in batches)
+    results.append(summarize(target, f"insert_many[{batch_size}]", latencies, 3 * batch_size))
+
+    for size in sizes:
+        dao.delete_all()
+        dao.insert_many(make_item(i) for i in range(size))
+        # Fewer repetitions for large tables keeps the run time bounded
+        repeat = max(1, min(5, 1000000 // size))
+        latencies = time_calls([dao.select_all] * repeat)
+        results.append(summarize(target, f"select_all[{size}]", latencies, repeat * size))
+        # Fast read path (daos.fast_rows), to models and to tuples
+        latencies = time_calls([lambda: dao.select_all(fast=True)] * repeat)
+        results.append(summarize(target, f"select_all_fast[{size}]", latencies, repeat * size))
+        latencies = time_calls([lambda: dao.select_all(as_tuples=True)] * repeat)
+        results.append(summarize(target, f"select_all_tuples[{size}]", latencies, repeat * size))
+
+    dao.delete_all()
+    return results
+
+
+def bench_models(count):
+    """ Benchmark model construction, in batches of 10 000 objects """
+    results = []
+    chunk = 10000
+    rounds = max(1, count // chunk)
+
+    def build_products():
+        for i in range(chunk):
+            Product(i, "iPhone 15", "Apple", 999.99)
+
+    def build_users():
+        for i in range(chunk):
+            User(i, "Ada Lovelace", "alovelace@example.com")
+
+    rows = [(i, "iPhone 15", "Apple", 999.99) for i in range(chunk)]
+
+    def build_batch():
+        ProductBatch.from_rows(rows)
+
+    for name, build in (("Product", build_products), ("User", build_users), ("ProductBatch", build_batch)):
+        latencies = time_calls([build] * rounds)
+        results.append(summarize("models", name, latencies, rounds * chunk))
+    return results
+
+
+def create_targets(backend, workdir):
+    """ Return (name, dao, make_item) for each DAO of the chosen backend, named after the engine it runs on """
+    if backend == "local":
+        path = os.path.join(workdir, "bench.sqlite3")
+        return [
+            ("products_sqlite", ProductDAOSQLite(path), make_product),
+            ("users_sqlite", UserDAOSQLite(path), make_user),
+            ("users_mongomock", UserDAOMongo(create_mongo_client()), make_user),
+        ]
+    return [
+        ("products_mysql", ProductDAO(), make_product),
+        ("users_mysql", UserDAO(), make_user),
+        ("users_mongo", UserDAOMongo(), make_user),
+    ]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(backend, sizes, samples, batch_size, model_count, only=None):
+    results = bench_models(model_count)
+    with tempfile.TemporaryDirectory() as workdir:
+        for target, dao, make_item in create_targets(backend, workdir):
+            if only and target not in only:
+                dao.close()
+                continue
+            print(f"... {target}", file=sys.stderr)
+            results.extend(bench_dao(target, dao, make_item, sizes, samples, batch_size))
+            dao.close()
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "backend": backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mysql_c_extension": HAVE_CEXT,
+            "sizes": list(sizes),
+            "samples": samples,
+            "batch_size": batch_size,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, tolerance):
+    """
+    List the results whose throughput dropped or p95 latency grew by more than `tolerance`.
+    Raises ValueError for reports of different backends, whose numbers are not comparable.
+    """
+    backends = (baseline["meta"].get("backend"), current["meta"].get("backend"))
+    if backends[0] != backends[1]:
+        raise ValueError(f"Backends différents ({backends[0]} et {backends[1]}) : comparaison impossible")
+    before = {(r["target"], r["name"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = before.get((result["target"], result["name"]))
+        if old is None:
+            continue
+        slower = result["throughput"] < old["throughput"] * (1 - tolerance)
+        tail = result["p95_ms"] > old["p95_ms"] * (1 + tolerance)
+        if slower or tail:
+            regressions.append((result, old))
+    return regressions
+
+
+def print_results(report):
+    print(f"{'cible':<16} {'opération':<24} {'lignes/s':>14} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for r in report["results"]:
+        print(
+            f"{r['target']:<16} {r['name']:<24} {r['throughput']:>14.0f} "
+            f"{r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks des DAO")
+    parser.add_argument("--backend", choices=("local", "docker"), default="local")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="tailles de table pour select_all, séparées par des virgules")
+    parser.add_argument("--samples", type=int, default=500, help="appels mesurés pour insert, update et delete")
+    parser.add_argument("--batch-size", type=int, default=10000, help="taille des lots de insert_many")
+    parser.add_argument("--models", type=int, default=100000, help="objets construits par modèle")
+    parser.add_argument("--only", help="cibles à mesurer, séparées par des virgules (ex. products_mysql)")
+    parser.add_argument("--output", help="fichier JSON de résultats")
+    parser.add_argument("--compare", nargs=2, metavar=("AVANT", "APRES"),
+                        help="compare deux fichiers de résultats au lieu de mesurer")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="écart toléré avant de signaler une régression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        try:
+            regressions = compare(baseline, current, args.tolerance)
+        except ValueError as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            return 2
+        for result, old in regressions:
+            print(
+                f"RÉGRESSION {result['target']} {result['name']}: "
+                f"{old['throughput']:.0f} -> {result['throughput']:.0f} lignes/s, "
+                f"p95 {old['p95_ms']:.3f} -> {result['p95_ms']:.3f} ms"
+            )
+        if not regressions:
+            print("Aucune régression.")
+        return 1 if regressions else 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    only = set(args.only.split(",")) if args.only else None
+    report = run(args.backend, sizes, args.samples, args.batch_size, args.models, only)
+    print_results(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""
+Concurrent load test of the controllers
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+
+Runs N simulated clients, each repeatedly picking an operation from a weighted mix
+(list, create, delete...) and calling ProductController / UserController, for a fixed
+duration or number of operations. Reports throughput, latency percentiles and error rate
+per operation, and samples connection pool usage over time.
+
+Run from the src directory:
+    python -m benchmarks.load_test --backend local --clients 16 --duration 10
+    python -m benchmarks.load_test --backend docker --clients 64 --processes 4 --duration 60 --output load.json
+    python -m benchmarks.load_test --mix list_products=8,create_product=1,delete_product=1 --operations 10000
+
+With --processes P, the clients are spread over P processes, each with its own controllers
+and connection pools (like P application servers); otherwise they are threads sharing one
+pair of controllers. The "local" backend uses an SQLite file; the "docker" backend uses the
+servers from .env and leaves the users it creates in the database.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.dao_benchmark import git_commit, make_product, make_user, percentile
+from controllers.product_controller import ProductController
+from controllers.user_controller import UserController
+from daos.product_dao_sqlite import ProductDAOSQLite
+from daos.user_dao_sqlite import UserDAOSQLite
+
+DEFAULT_MIX = "list_products=40,get_product=20,create_product=15,delete_product=10,list_users=10,create_user=5"
+PAGE_SIZE = 20
+
+
+class ClientContext:
+    """ Controllers and state shared by the clients of one process """
+
+    def __init__(self, products, users, product_ids):
+        self.products = products
+        self.users = users
+        # IDs that clients may read or delete; created products are added, deleted ones removed
+        self.product_ids = product_ids
+        self.lock = threading.Lock()
+        self.counter = 0
+
+    def next_number(self):
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+    def random_product_id(self, rng):
+        with self.lock:
+            return rng.choice(self.product_ids) if self.product_ids else 0
+
+    def take_product_id(self, rng):
+        with self.lock:
+            if not self.product_ids:
+                return None
+            i = rng.randrange(len(self.product_ids))
+            self.product_ids[i], self.product_ids[-1] = self.product_ids[-1], self.product_ids[i]
+            return self.product_ids.pop()
+
+
+def op_list_products(ctx, rng):
+    ctx.products.list_products_page(max(0, ctx.random_product_id(rng) - PAGE_SIZE), PAGE_SIZE)
+
+
+def op_get_product(ctx, rng):
+    ctx.products.get_product(ctx.random_product_id(rng))
+
+
+def op_create_product(ctx, rng):
+    product_id = ctx.products.create_product(make_product(ctx.next_number()))
+    if product_id is None:
+        raise RuntimeError("insertion refusée")
+    with ctx.lock:
+        ctx.product_ids.append(product_id)
+
+
+def op_delete_product(ctx, rng):
+    product_id = ctx.take_product_id(rng)
+    if product_id is not None:
+        ctx.products.delete_product(product_id)
+
+
+def op_list_users(ctx, rng):
+    ctx.users.list_users_page(0, PAGE_SIZE)
+
+
+def op_create_user(ctx, rng):
+    ctx.users.create_user(make_user(ctx.next_number()))
+
+
+def op_search_products(ctx, rng):
+    ctx.products.search_products(f"produit {rng.randrange(100)}")
+
+
+OPERATIONS = {
+    "list_products": op_list_products,
+    "get_product": op_get_product,
+    "create_product": op_create_product,
+    "delete_product": op_delete_product,
+    "list_users": op_list_users,
+    "create_user": op_create_user,
+    "search_products": op_search_products,
+}
+
+
+def parse_mix(text):
+    """ "list_products=8,create_product=2" -> {"list_products": 8.0, "create_product": 2.0} """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Opération inconnue : {name} (choix : {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class ClientStats:
+    """ Latencies and errors of one client, per operation """
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.last_error = None
+
+    @property
+    def done(self):
+        return sum(len(samples) for samples in self.latencies.values())
+
+    @property
+    def failed(self):
+        return sum(self.errors.values())
+
+
+def run_client(ctx, mix, seed, stop, budget, stats):
+    """ One simulated client: weighted random operations until stop is set or the budget is spent """
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while not stop.is_set() and budget.take():
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            OPERATIONS[name](ctx, rng)
+        except Exception as e:
+            stats.errors[name] = stats.errors.get(name, 0) + 1
+            stats.last_error = f"{name}: {e}"
+        stats.latencies.setdefault(name, []).append(time.perf_counter() - start)
+
+
+class OperationBudget:
+    """ Shared countdown of the operations left to run (unlimited when total is None) """
+
+    def __init__(self, total=None):
+        self.left = total
+        self.lock = threading.Lock()
+
+    def take(self):
+        if self.left is None:
+            return True
+        with self.lock:
+            if self.left <= 0:
+                return False
+            self.left -= 1
+            return True
+
+
+def pool_usage(controller):
+    """ Connection pool counters of a controller's DAO, if it has a pool """
+    pool = getattr(controller.dao, "pool", None)
+    if pool is None or not hasattr(pool, "stats"):
+        return None
+    stats = pool.stats()
+    return {key: stats[key] for key in ("open", "idle", "waits", "checkouts", "wait_time_max")}
+
+
+def sample_usage(ctx, all_stats, started, stop, interval, timeline):
+    """ Record throughput and pool usage every `interval` seconds until stop is set """
+    while not stop.wait(interval):
+        timeline.append({
+            "t": round(time.perf_counter() - started, 3),
+            "operations": sum(s.done for s in all_stats),
+            "errors": sum(s.failed for s in all_stats),
+            "products_pool": pool_usage(ctx.products),
+            "users_pool": pool_usage(ctx.users),
+        })
+
+
+def create_controllers(backend, sqlite_path):
+    if backend == "local":
+        return (ProductController(dao=ProductDAOSQLite(sqlite_path)),
+                UserController(dao=UserDAOSQLite(sqlite_path)))
+    return ProductController(), UserController()
+
+
+def run_process(config):
+    """ Run config["clients"] threads against one pair of controllers; returns raw stats and timeline """
+    products, users = create_controllers(config["backend"], config["sqlite_path"])
+    ctx = ClientContext(products, users, list(config["product_ids"]))
+    ctx.counter = config["first_number"]
+    all_stats = [ClientStats() for _ in range(config["clients"])]
+    stop = threading.Event()
+    budget = OperationBudget(config["operations"])
+    timeline = []
+
+    started = time.perf_counter()
+    sampler = threading.Thread(target=sample_usage, args=(ctx, all_stats, started, stop, config["interval"], timeline))
+    sampler.start()
+    threads = [
+        threading.Thread(target=run_client, args=(ctx, config["mix"], config["seed"] + i, stop, budget, stats))
+        for i, stats in enumerate(all_stats)
+    ]
+    for thread in threads:
+        thread.start()
+    if config["duration"]:
+        stop.wait(config["duration"])
+        stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+    products.shutdown()
+    users.shutdown()
+
+    latencies, errors, last_errors = {}, {}, []
+    for stats in all_stats:
+        for name, samples in stats.latencies.items():
+            latencies.setdefault(name, []).extend(samples)
+        for name, count in stats.errors.items():
+            errors[name] = errors.get(name, 0) + count
+        if stats.last_error:
+            last_errors.append(stats.last_error)
+    return {"elapsed": elapsed, "latencies": latencies, "errors": errors,
+            "last_errors": last_errors[:5], "timeline": timeline}
+
+
+def seed_catalog(backend, sqlite_path, count):
+    """ Make sure there are products to list and delete; returns their IDs """
+    products, users = create_controllers(backend, sqlite_path)
+    try:
+        ids = [product.id for product in products.iter_products()]
+        missing = count - len(ids)
+        if missing > 0:
+            ids.extend(products.dao.insert_many(make_product(i) for i in range(missing)))
+        return ids
+    finally:
+        products.shutdown()
+        users.shutdown()
+
+
+def merge_timelines(timelines):
+    """ Add up the per-process samples taken at the same tick """
+    merged = []
+    for samples in zip(*timelines):
+        merged.append({
+            "t": samples[0]["t"],
+            "operations": sum(s["operations"] for s in samples),
+            "errors": sum(s["errors"] for s in samples),
+            "products_pool": [s["products_pool"] for s in samples],
+            "users_pool": [s["users_pool"] for s in samples],
+        })
+    return merged
+
+
+def summarize(results, elapsed):
+    """ Per-operation and overall throughput, latency percentiles and error rates """
+    operations = {}
+    latencies, errors = {}, {}
+    for result in results:
+        for name, samples in result["latencies"].items():
+            latencies.setdefault(name, []).extend(samples)
+        for name, count in result["errors"].items():
+            errors[name] = errors.get(name, 0) + count
+    for name, samples in sorted(latencies.items()):
+        ordered = sorted(samples)
+        operations[name] = {
+            "calls": len(ordered),
+            "errors": errors.get(name, 0),
+            "error_rate": errors.get(name, 0) / len(ordered),
+            "throughput": len(ordered) / elapsed if elapsed else 0.0,
+            "mean_ms": sum(ordered) / len(ordered) * 1000,
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p95_ms": percentile(ordered, 95) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
+    calls = sum(op["calls"] for op in operations.values())
+    failed = sum(op["errors"] for op in operations.values())
+    return {
+        "elapsed": elapsed,
+        "calls": calls,
+        "errors": failed,
+        "error_rate": failed / calls if calls else 0.0,
+        "throughput": calls / elapsed if elapsed else 0.0,
+        "operations": operations,
+    }
+
+
+def run(backend, clients, processes, mix, duration, operations, seed_products, interval, workdir, seed=0):
+    sqlite_path = os.path.join(workdir, "load.sqlite3")
+    product_ids = seed_catalog(backend, sqlite_path, seed_products)
+    processes = max(0, min(processes, clients))
+    groups = processes or 1
+    configs = []
+    for i in range(groups):
+        configs.append({
+            "backend": backend,
+            "sqlite_path": sqlite_path,
+            "clients": clients // groups + (1 if i < clients % groups else 0),
+            "mix": mix,
+            "duration": duration,
+            # The operation budget is split between processes
+            "operations": None if operations is None else operations // groups + (1 if i < operations % groups else 0),
+            "interval": interval,
+            # Each process deletes its own share of the seeded products
+            "product_ids": product_ids[i::groups],
+            "first_number": (i + 1) * 10 ** 9,
+            "seed": seed + i * clients,
+        })
+
+    started = time.perf_counter()
+    if processes:
+        with multiprocessing.get_context("spawn").Pool(processes) as pool:
+            results = pool.map(run_process, configs)
+    else:
+        results = [run_process(configs[0])]
+    elapsed = time.perf_counter() - started
+
+    report = summarize(results, elapsed)
+    report["timeline"] = merge_timelines([r["timeline"] for r in results])
+    report["last_errors"] = [e for r in results for e in r["last_errors"]][:5]
+    report["meta"] = {
+        "commit": git_commit(),
+        "backend": backend,
+        "clients": clients,
+        "processes": processes,
+        "mix": mix,
+        "duration": duration,
+        "operations": operations,
+    }
+    return report
+
+
+def print_report(report):
+    print(f"{report['calls']} opérations en {report['elapsed']:.1f} s : {report['throughput']:.0f} op/s, "
+          f"{report['error_rate']:.2%} d'erreurs")
+    print(f"{'opération':<18} {'appels':>9} {'op/s':>9} {'erreurs':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, op in report["operations"].items():
+        print(f"{name:<18} {op['calls']:>9} {op['throughput']:>9.0f} {op['error_rate']:>8.2%} "
+              f"{op['p50_ms']:>9.2f} {op['p95_ms']:>9.2f} {op['p99_ms']:>9.2f} {op['max_ms']:>9.2f}")
+    for error in report["last_errors"]:
+        print(f"Erreur : {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge des contrôleurs")
+    parser.add_argument("--backend", choices=("local", "docker"), default="local")
+    parser.add_argument("--clients", type=int, default=8, help="clients simulés en parallèle")
+    parser.add_argument("--processes", type=int, default=0, help="répartir les clients sur ce nombre de processus")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="poids des opérations, ex. list_products=8,create_product=2")
+    parser.add_argument("--duration", type=float, help="durée du test en secondes")
+    parser.add_argument("--operations", type=int, help="nombre total d'opérations (par défaut 10 s de test)")
+    parser.add_argument("--seed-products", type=int, default=1000, help="produits présents au départ")
+    parser.add_argument("--interval", type=float, default=1.0, help="secondes entre deux relevés d'utilisation")
+    parser.add_argument("--output", help="fichier JSON de résultats, avec la série temporelle")
+    args = parser.parse_args(argv)
+
+    duration = args.duration if args.duration or args.operations else 10.0
+    with tempfile.TemporaryDirectory() as workdir:
+        report = run(args.backend, args.clients, args.processes, parse_mix(args.mix), duration, args.operations,
+                     args.seed_products, args.interval, workdir)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
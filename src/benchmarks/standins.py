@@ -0,0 +1,73 @@
+"""
+Local stand-ins for the database servers, used by the benchmarks
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import functools
+import inspect
+import threading
+from types import SimpleNamespace
+import mongomock
+from mongomock.collection import BulkOperationBuilder
+
+_patch_lock = threading.Lock()
+_patched = False
+
+
+def _ignore_sort(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, sort=None, **kwargs):
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _find_raw_batches(self, *args, **kwargs):
+    raise NotImplementedError("find_raw_batches method is not implemented in mongomock yet")
+
+
+def _patch_mongomock():
+    """
+    Adapt mongomock to the calls of UserDAOMongo, on the first stand-in client only, so that
+    importing this module leaves mongomock untouched
+    """
+    global _patched
+    with _patch_lock:
+        if _patched:
+            return
+        # mongomock 4.3 predates the `sort` argument that pymongo >= 4.11 passes to bulk_write operations
+        for name in ("add_replace", "add_update"):
+            method = getattr(BulkOperationBuilder, name)
+            if "sort" not in inspect.signature(method).parameters:
+                setattr(BulkOperationBuilder, name, _ignore_sort(method))
+        # mongomock 4.3 rejects the keyword arguments of find_raw_batches before saying it does not implement it
+        mongomock.collection.Collection.find_raw_batches = _find_raw_batches
+        # Our stand-in sessions carry no state: let mongomock accept and ignore them
+        mongomock.ignore_feature("session")
+        _patched = True
+
+
+class _StandaloneSession:
+    """ Client session of a standalone server: no transactions; mongomock ignores the session argument """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.end_session()
+
+    def end_session(self):
+        pass
+
+
+class _StandInClient(mongomock.MongoClient):
+    """ mongomock 4.3 client, seen as a standalone server and accepting sessions """
+    topology_description = SimpleNamespace(topology_type_name="Single")
+
+    def start_session(self, **kwargs):
+        return _StandaloneSession()
+
+
+def create_mongo_client():
+    """ In-memory MongoDB substitute for UserDAOMongo """
+    _patch_mongomock()
+    return _StandInClient()
@@ -0,0 +1,102 @@
+"""
+Application settings, loaded once from the environment and the .env file
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import threading
+from dotenv import find_dotenv, load_dotenv
+
+
+def _flag(value):
+    return str(value).lower() in ("1", "true", "yes")
+
+
+class Settings:
+    """ Every configuration value used by the application, read from os.environ """
+
+    def __init__(self, env):
+        # MySQL
+        self.mysql_host = env.get("MYSQL_HOST", "localhost")
+        self.mysql_db_name = env.get("MYSQL_DB_NAME")
+        self.db_username = env.get("DB_USERNAME")
+        self.db_password = env.get("DB_PASSWORD")
+        self.mysql_pool_size = int(env.get("MYSQL_POOL_SIZE", "5"))
+        self.mysql_pool_timeout = float(env.get("MYSQL_POOL_TIMEOUT", "10"))
+        self.mysql_pool_ping_interval = float(env.get("MYSQL_POOL_PING_INTERVAL", "5"))
+        self.mysql_allow_local_infile = _flag(env.get("MYSQL_ALLOW_LOCAL_INFILE", "0"))
+        self.mysql_prepared_statements = _flag(env.get("MYSQL_PREPARED_STATEMENTS", "1"))
+        self.mysql_statement_cache_size = int(env.get("MYSQL_STATEMENT_CACHE_SIZE", "32"))
+        # Socket timeouts in whole seconds (what mysql.connector accepts), 0 for none
+        self.mysql_connect_timeout = int(env.get("MYSQL_CONNECT_TIMEOUT", "5"))
+        self.mysql_read_timeout = int(env.get("MYSQL_READ_TIMEOUT", "30"))
+        self.mysql_write_timeout = int(env.get("MYSQL_WRITE_TIMEOUT", "30"))
+        self.mysql_connect_retries = int(env.get("MYSQL_CONNECT_RETRIES", "1"))
+
+        # MongoDB
+        self.mongodb_host = env.get("MONGODB_HOST", "localhost")
+        self.mongodb_db_name = env.get("MONGODB_DB_NAME", "store")
+        self.mongodb_id_block_size = int(env.get("MONGODB_ID_BLOCK_SIZE", "100"))
+        # When MONGODB_HOST is "mongo", try localhost first (app running outside Docker)
+        self.mongodb_probe_localhost = _flag(env.get("MONGODB_PROBE_LOCALHOST", "1"))
+        self.mongodb_connect_timeout_ms = float(env.get("MONGODB_CONNECT_TIMEOUT_MS", "5000"))
+        self.mongodb_socket_timeout_ms = float(env.get("MONGODB_SOCKET_TIMEOUT_MS", "30000"))
+        self.mongodb_server_selection_timeout_ms = float(env.get("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+        # Deadline of each DAO operation (connection wait included), and circuit breakers of MySQL
+        # and MongoDB; 0 disables the deadline
+        self.db_operation_timeout_ms = float(env.get("DB_OPERATION_TIMEOUT_MS", "15000"))
+        self.circuit_failure_threshold = int(env.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.circuit_reset_timeout_ms = float(env.get("CIRCUIT_RESET_TIMEOUT_MS", "1000"))
+        self.circuit_max_reset_timeout_ms = float(env.get("CIRCUIT_MAX_RESET_TIMEOUT_MS", "30000"))
+        self.circuit_jitter = float(env.get("CIRCUIT_JITTER", "0.5"))
+
+        # Storage backends
+        self.store_backend = env.get("STORE_BACKEND", "mysql").lower()
+        self.user_backend = env.get("USER_BACKEND", self.store_backend).lower()
+        self.sqlite_path = env.get("SQLITE_PATH", "store.sqlite3")
+        self.sqlite_pool_size = int(env.get("SQLITE_POOL_SIZE", "4"))
+
+        # CQRS users: MySQL write model, Mongo read model
+        self.user_read_your_writes = _flag(env.get("USER_READ_YOUR_WRITES", "0"))
+        self.user_read_model_timeout_ms = float(env.get("USER_READ_MODEL_TIMEOUT_MS", "500"))
+        self.user_propagation_batch_size = int(env.get("USER_PROPAGATION_BATCH_SIZE", "500"))
+        self.user_propagation_max_delay_ms = float(env.get("USER_PROPAGATION_MAX_DELAY_MS", "50"))
+
+        # Catalog cache
+        self.product_cache_ttl = float(env.get("PRODUCT_CACHE_TTL", "0"))
+        self.product_cache_size = int(env.get("PRODUCT_CACHE_SIZE", "128"))
+
+        # Write-behind (group commit) of creates
+        self.write_behind = _flag(env.get("WRITE_BEHIND", "0"))
+        self.write_behind_batch_size = int(env.get("WRITE_BEHIND_BATCH_SIZE", "500"))
+        self.write_behind_max_delay_ms = float(env.get("WRITE_BEHIND_MAX_DELAY_MS", "50"))
+        self.write_behind_queue_size = int(env.get("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+
+        # Instrumentation
+        self.dao_metrics = _flag(env.get("DAO_METRICS", "0"))
+        self.dao_slow_query_ms = float(env.get("DAO_SLOW_QUERY_MS", "100"))
+        self.dao_metrics_file = env.get("DAO_METRICS_FILE") or None
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings():
+    """ Return the settings, reading .env (one filesystem search) only on the first call """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                load_dotenv(find_dotenv())
+                _settings = Settings(os.environ)
+    return _settings
+
+
+def reload_settings():
+    """ Forget the loaded settings, e.g. after changing os.environ in a test """
+    global _settings
+    with _settings_lock:
+        _settings = None
+    return get_settings()
@@ -0,0 +1,98 @@
+"""
+In-process read cache for the controllers
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+
+_MISSING = object()
+
+class TTLCache:
+    """ Bounded LRU cache whose entries expire `ttl` seconds after they were stored """
+
+    def __init__(self, ttl=30.0, maxsize=128, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate() so that a load racing with a write is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        """ Return the cached value for key, or default if it is absent or expired """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if self._clock() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (value, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    @property
+    def generation(self):
+        """ Pass to set() to skip storing a value loaded before the latest invalidation """
+        return self._generation
+
+    def get_or_load(self, key, load):
+        """ Read-through access: call load() and store its result on a miss """
+        generation = self._generation
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = load()
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self):
+        """ Drop every entry, e.g. after a write to the underlying table """
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+def catalog_cache_from_env():
+    """ Build the product catalog cache from PRODUCT_CACHE_TTL / PRODUCT_CACHE_SIZE, or None if disabled """
+    settings = get_settings()
+    if settings.product_cache_ttl <= 0:
+        return None
+    return TTLCache(ttl=settings.product_cache_ttl, maxsize=settings.product_cache_size)
@@ -0,0 +1,33 @@
+"""
+Deferred construction of controllers
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import threading
+
+
+class Lazy:
+    """
+    Stand-in for an object that is built by factory() on first attribute access,
+    so that menu entries that are never chosen never open their connections.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def created(self):
+        return self._instance is not None
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on Lazy itself
+        return getattr(self.get(), name)
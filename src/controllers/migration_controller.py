@@ -0,0 +1,172 @@
+"""
+Migration controller: parallel, resumable copy of the MySQL users to MongoDB
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import json
+import os
+import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.transfer_controller import TransferProgress
+from daos.batching import DEFAULT_CHUNK_SIZE
+from daos.user_dao import UserDAO
+from daos.user_dao_mongo import UserDAOMongo
+
+DEFAULT_WORKERS = 4
+# Ranges per worker: several small ranges balance the load better than one big range each
+RANGES_PER_WORKER = 4
+
+
+def row_checksum(user):
+    """ CRC32 of one user; range checksums are sums of these, so row order does not matter """
+    return zlib.crc32(f"{user.id}\x1f{user.name}\x1f{user.email}".encode("utf-8"))
+
+
+class MigrationCheckpoint:
+    """
+    Id ranges to copy, each as [after_id, until_id, done_until], and the largest id planned so far.
+    Saved as JSON (write then rename) after every chunk so that an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, path=None, ranges=None, last_id=0):
+        self.path = path
+        self.ranges = ranges or []
+        self.last_id = last_id
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(path, data["ranges"], data["last_id"])
+        return cls(path)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                data = {"last_id": self.last_id, "ranges": [list(r) for r in self.ranges]}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+    def extend_to(self, first_id, last_id, parts):
+        """ Plan the ids in (max(self.last_id, first_id - 1), last_id] as up to `parts` new ranges """
+        start = max(self.last_id, first_id - 1)
+        span = last_id - start
+        if span <= 0:
+            return
+        parts = max(1, min(parts, span))
+        bounds = [start + span * i // parts for i in range(parts + 1)]
+        with self._lock:
+            self.ranges.extend([lo, hi, lo] for lo, hi in zip(bounds, bounds[1:]))
+            self.last_id = last_id
+        self.save()
+
+    def advance(self, index, done_until):
+        with self._lock:
+            self.ranges[index][2] = done_until
+        self.save()
+
+    def pending(self):
+        """ Indexes of the ranges not fully copied yet """
+        with self._lock:
+            return [i for i, (_, until_id, done_until) in enumerate(self.ranges) if done_until < until_id]
+
+
+class UserMigration:
+    """
+    Copies users from the MySQL table to the Mongo collection, keeping their ids.
+
+    The id space is split into ranges read in keyset order by `workers` threads: every read is a
+    short indexed SELECT on the primary key, so the source table is never locked. Each chunk is
+    written with one unordered bulk upsert, which makes copying a row twice harmless. A re-run
+    skips the ranges its checkpoint marks as done and copies the rows added since; rows updated
+    or deleted in MySQL after being copied show up as mismatches in verify().
+    """
+
+    def __init__(self, source=None, target=None, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE,
+                 checkpoint_path=None):
+        self.source = source if source is not None else UserDAO()
+        self.target = target if target is not None else UserDAOMongo()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.checkpoint = MigrationCheckpoint.load(checkpoint_path)
+        self._lock = threading.Lock()
+
+    def plan(self):
+        """ Add the source ids not planned yet to the checkpoint; returns the number of ranges left to copy """
+        first_id, last_id = self.source.id_bounds()
+        if last_id:
+            self.checkpoint.extend_to(first_id, last_id, self.workers * RANGES_PER_WORKER)
+        return len(self.checkpoint.pending())
+
+    def copy(self, on_progress=None):
+        """ Copy every pending range, `workers` ranges at a time """
+        progress = TransferProgress()
+        pending = self.checkpoint.pending()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="migration") as executor:
+            # list() re-raises the first worker error, if any
+            list(executor.map(lambda index: self._copy_range(index, progress, on_progress), pending))
+        return progress
+
+    def _copy_range(self, index, progress, on_progress):
+        _, until_id, after_id = self.checkpoint.ranges[index]
+        while after_id < until_id:
+            users = self.source.select_range(after_id, until_id, self.chunk_size)
+            if not users:
+                after_id = until_id
+            else:
+                self.target.upsert_many(users, len(users))
+                after_id = users[-1].id if len(users) == self.chunk_size else until_id
+            self.checkpoint.advance(index, after_id)
+            with self._lock:
+                progress.rows += len(users)
+                if on_progress:
+                    on_progress(progress)
+
+    def _range_summary(self, dao, after_id, until_id):
+        """ Row count and checksum of one id range """
+        count = checksum = 0
+        while True:
+            users = dao.select_range(after_id, until_id, self.chunk_size)
+            count += len(users)
+            checksum = (checksum + sum(row_checksum(user) for user in users)) & 0xFFFFFFFFFFFFFFFF
+            if len(users) < self.chunk_size:
+                return count, checksum
+            after_id = users[-1].id
+
+    def _verify_range(self, index):
+        after_id, until_id, _ = self.checkpoint.ranges[index]
+        source = self._range_summary(self.source, after_id, until_id)
+        target = self._range_summary(self.target, after_id, until_id)
+        return after_id, until_id, source, target
+
+    def verify(self):
+        """ Compare row counts and checksums of every planned range on both sides, in parallel """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="migration-verify") as executor:
+            results = list(executor.map(self._verify_range, range(len(self.checkpoint.ranges))))
+        return {
+            "source_rows": sum(source[0] for _, _, source, _ in results),
+            "target_rows": sum(target[0] for _, _, _, target in results),
+            "mismatched_ranges": [(lo, hi) for lo, hi, source, target in results if source != target],
+        }
+
+    def run(self, on_progress=None, verify=True):
+        """ Plan, copy and optionally verify; returns the copy progress and the verification report (or None) """
+        self.plan()
+        progress = self.copy(on_progress)
+        return progress, (self.verify() if verify else None)
+
+    def shutdown(self):
+        """ Close database connections """
+        self.source.close()
+        self.target.close()
@@ -5,26 +5,203 @@ Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
 """
 import sys
 import os
+import threading
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from daos.product_dao import ProductDAO
+from controllers.search_index import DEFAULT_SEARCH_LIMIT, ProductSearchIndex
+from daos.async_dao import AsyncProductDAO
+from daos.batching import DEFAULT_PAGE_SIZE
+from daos.factory import create_product_dao
+from daos.protocols import ProductDAOProtocol
+from daos.unit_of_work import UnitOfWork, current_unit_of_work, in_unit_of_work
+from daos.write_behind import write_behind_queue
+from models.product import Product
 
 class ProductController:
-    def __init__(self):
-        self.dao = ProductDAO()
+    def __init__(self, cache=None, dao=None, write_behind=False):
+        # The storage backend comes from the configuration unless a DAO is given
+        self.dao: ProductDAOProtocol = dao if dao is not None else create_product_dao()
+        # Optional TTLCache for catalog reads, invalidated by every write
+        self.cache = cache
+        self._async_dao = None
+        # Optional write-behind queue: creates are grouped into one transaction per batch
+        self.write_behind = write_behind_queue(self.dao, lambda ids: self._invalidate_cache()) if write_behind else None
+        # Search index, loaded from the database on the first search
+        self._search_index = None
+        self._search_index_lock = threading.Lock()
 
     def list_products(self):
         """ List all products """
-        return self.dao.select_all()
+        # Inside a unit of work, reads must see its uncommitted writes, which the cache must not keep
+        if self.cache is None or in_unit_of_work():
+            return self.dao.select_all()
+        return self.cache.get_or_load("all", self.dao.select_all)
 
-    def create_product(self, product):
-        """ Create a new product based on product inputs """
-        self.dao.insert(product)
+    def list_products_page(self, after_id=0, limit=DEFAULT_PAGE_SIZE):
+        """ List one page of products, starting after the given product ID """
+        if self.cache is None or in_unit_of_work():
+            return self.dao.select_page(after_id, limit)
+        return self.cache.get_or_load(("page", after_id, limit), lambda: self.dao.select_page(after_id, limit))
+
+    def iter_products(self, batch_size=DEFAULT_PAGE_SIZE):
+        """ Iterate over all products without loading them all at once """
+        return self.dao.iter_all(batch_size)
+
+    def get_product(self, product_id):
+        """ Get one product by ID, or None """
+        return self.dao.get_by_id(product_id)
+
+    def find_products_by_brand(self, brand):
+        """ List the products of one brand """
+        return self.dao.find_by_brand(brand)
+
+    def find_products_by_price_range(self, lo, hi):
+        """ List the products whose price is between lo and hi """
+        return self.dao.find_by_price_range(lo, hi)
+
+    def count_products(self):
+        """ Number of products in the catalog """
+        return self.dao.count()
+
+    def has_products(self):
+        """ Tell whether the catalog contains at least one product """
+        return self.dao.exists()
+
+    def catalog_summary(self):
+        """ Price statistics per brand """
+        return self.dao.price_stats_by_brand()
+
+    def search_products(self, text=None, lo=None, hi=None, limit=DEFAULT_SEARCH_LIMIT):
+        """ Products whose name or brand words start with the words of text, priced between lo and hi """
+        return self.search_index.search(text, lo, hi, limit)
+
+    @property
+    def search_index(self):
+        """ In-memory search index, streamed from the database on first use and then kept up to date """
+        if self._search_index is None:
+            with self._search_index_lock:
+                if self._search_index is None:
+                    index = ProductSearchIndex().build(self.dao.iter_all())
+                    # Only kept once complete: if reading the catalog fails, the next search builds it again
+                    self._search_index = index
+        return self._search_index
+
+    def _index_product(self, product, product_id):
+        if self._search_index is not None and product_id is not None:
+            self._search_index.add(Product(product_id, product.name, product.brand, product.price))
+
+    def _index_written_product(self, product, future):
+        if not future.cancelled() and future.exception() is None:
+            self._index_product(product, future.result())
+
+    def _unindex_product(self, product_id):
+        if self._search_index is not None:
+            self._search_index.remove(product_id)
+
+    def load_catalog_batch(self):
+        """ Load the whole catalog into a compact columnar ProductBatch, e.g. for reporting """
+        return self.dao.select_batch()
+
+    def create_product(self, product, wait=True):
+        """ Create a new product based on product inputs. In write-behind mode, wait=False returns a Future of the ID """
+        # The write-behind thread would write outside of the current unit of work
+        if self.write_behind is not None and not in_unit_of_work():
+            future = self.write_behind.submit(product)
+            future.add_done_callback(lambda f: self._index_written_product(product, f))
+            return future.result() if wait else future
+        product_id = self.dao.insert(product)
+        self._after_commit(lambda: (self._invalidate_cache(), self._index_product(product, product_id)))
+        return product_id
 
     def delete_product(self, product_id):
         """ Delete a product by ID """
         self.dao.delete(product_id)
+        self._after_commit(lambda: (self._invalidate_cache(), self._unindex_product(product_id)))
+
+    def update_products(self, products):
+        """ Update many products at once, e.g. to reprice them. Returns the number of changed rows per batch """
+        products = list(products)
+        counts = self.dao.update_many(products)
+        self._after_commit(lambda: (self._invalidate_cache(), self._reindex_products(products)))
+        return counts
+
+    def delete_products(self, product_ids):
+        """ Delete many products at once. Returns the number of deleted rows per batch """
+        product_ids = list(product_ids)
+        counts = self.dao.delete_many(product_ids)
+        self._after_commit(lambda: (self._invalidate_cache(), self._unindex_products(product_ids)))
+        return counts
+
+    def _reindex_products(self, products):
+        if self._search_index is not None:
+            for product in products:
+                self._search_index.update(product)
+
+    def _unindex_products(self, product_ids):
+        for product_id in product_ids:
+            self._unindex_product(product_id)
+
+    def transaction(self, *daos):
+        """
+        Unit of work over this controller's DAO and the given ones (e.g. a UserController's),
+        to use as `with controller.transaction() as uow:`. See daos.unit_of_work.UnitOfWork.
+        Creates skip the write-behind queue meanwhile and return the ID, and the cache and the
+        search index only see the writes once they are committed.
+        """
+        return UnitOfWork(self.dao, *daos)
+
+    @staticmethod
+    def _after_commit(callback):
+        """ Run callback now, or once the current unit of work commits """
+        unit_of_work = current_unit_of_work()
+        if unit_of_work is None:
+            callback()
+        else:
+            unit_of_work.on_commit(callback)
+
+    @property
+    def async_dao(self):
+        """ Awaitable facade over this controller's DAO, created on first use """
+        if self._async_dao is None:
+            self._async_dao = AsyncProductDAO(self.dao)
+        return self._async_dao
+
+    async def list_products_async(self):
+        """ Awaitable list_products """
+        if self.cache is None:
+            return await self.async_dao.select_all()
+        generation = self.cache.generation
+        products = self.cache.get("all")
+        if products is None:
+            products = await self.async_dao.select_all()
+            self.cache.set("all", products, generation)
+        return products
+
+    async def create_product_async(self, product):
+        """ Awaitable create_product """
+        product_id = await self.async_dao.insert(product)
+        self._invalidate_cache()
+        self._index_product(product, product_id)
+        return product_id
+
+    async def delete_product_async(self, product_id):
+        """ Awaitable delete_product """
+        await self.async_dao.delete(product_id)
+        self._invalidate_cache()
+        self._unindex_product(product_id)
+
+    def cache_stats(self):
+        """ Hit/miss statistics of the catalog cache, or None if caching is disabled """
+        return self.cache.stats() if self.cache is not None else None
+
+    def _invalidate_cache(self):
+        if self.cache is not None:
+            self.cache.invalidate()
 
     def shutdown(self):
-        """ Close database connection """
+        """ Write pending creates, then close database connection """
+        if self.write_behind is not None:
+            self.write_behind.close()
+        if self._async_dao is not None:
+            self._async_dao.close()
         self.dao.close()
@@ -0,0 +1,150 @@
+"""
+In-process search index over the product catalog
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+
+_WORD = re.compile(r"\w+")
+
+DEFAULT_SEARCH_LIMIT = 50
+
+
+def tokenize(text):
+    """ Lowercase words of text without accents, e.g. "Café Noir" -> ["cafe", "noir"] """
+    text = (text or "").lower()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _WORD.findall(text)
+
+
+class ProductSearchIndex:
+    """
+    Secondary indexes kept in memory next to the catalog:
+
+    - an inverted index from each word of `name` and `brand` to product IDs, with the words
+      also kept sorted so that a prefix maps to a contiguous run of words (bisect);
+    - a price index of (price, id) pairs sorted by price, for range queries.
+
+    Queries never touch the database. The index is built once from a stream of products and
+    then kept up to date with add() and remove().
+    """
+
+    def __init__(self):
+        self._products = {}
+        self._postings = {}       # word -> set of product IDs
+        self._words = []          # sorted distinct words
+        self._prices = []         # sorted (price, id)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._products)
+
+    def build(self, products):
+        """ Fill an empty index from a stream of products, e.g. ProductDAO.iter_all() """
+        with self._lock:
+            postings, prices = self._postings, []
+            for product in products:
+                self._products[product.id] = product
+                for word in self._words_of(product):
+                    ids = postings.get(word)
+                    if ids is None:
+                        ids = postings[word] = set()
+                    ids.add(product.id)
+                prices.append((product.price, product.id))
+            # Sort once at the end instead of one insort per product
+            self._words = sorted(postings)
+            self._prices = sorted(prices)
+        return self
+
+    @staticmethod
+    def _words_of(product):
+        return set(tokenize(f"{product.name} {product.brand}"))
+
+    def add(self, product):
+        """ Index a new product, or re-index one whose name, brand or price changed """
+        with self._lock:
+            if product.id in self._products:
+                self.remove(product.id)
+            self._products[product.id] = product
+            for word in self._words_of(product):
+                ids = self._postings.get(word)
+                if ids is None:
+                    ids = self._postings[word] = set()
+                    bisect.insort(self._words, word)
+                ids.add(product.id)
+            bisect.insort(self._prices, (product.price, product.id))
+
+    def update(self, product):
+        """ Re-index a product already in the index; unknown IDs are ignored """
+        with self._lock:
+            if product.id in self._products:
+                self.add(product)
+
+    def remove(self, product_id):
+        """ Drop a product from the index; unknown IDs are ignored """
+        with self._lock:
+            product = self._products.pop(product_id, None)
+            if product is None:
+                return
+            for word in self._words_of(product):
+                ids = self._postings.get(word)
+                if ids is None:
+                    continue
+                ids.discard(product_id)
+                if not ids:
+                    del self._postings[word]
+                    del self._words[bisect.bisect_left(self._words, word)]
+            entry = (product.price, product_id)
+            i = bisect.bisect_left(self._prices, entry)
+            if i < len(self._prices) and self._prices[i] == entry:
+                del self._prices[i]
+
+    def _ids_with_prefix(self, prefix):
+        """ IDs of the products having a word that starts with prefix """
+        start = bisect.bisect_left(self._words, prefix)
+        # Every word starting with prefix sorts before prefix + the largest code point
+        stop = bisect.bisect_left(self._words, prefix + "\U0010ffff", start)
+        words = self._words[start:stop]
+        if len(words) == 1:
+            return self._postings[words[0]]
+        return set().union(*(self._postings[word] for word in words))
+
+    def search(self, text=None, lo=None, hi=None, limit=DEFAULT_SEARCH_LIMIT):
+        """
+        Products matching every word of text (each word as a prefix of a name or brand word)
+        and priced between lo and hi, both optional. Text matches come by ID, price-only
+        matches by price, at most `limit` of them.
+        """
+        words = tokenize(text)
+        with self._lock:
+            if not words:
+                return self._price_range(lo, hi, limit)
+
+            # Intersect starting from the most selective word
+            candidates = sorted((self._ids_with_prefix(word) for word in words), key=len)
+            ids = candidates[0]
+            for other in candidates[1:]:
+                ids = ids & other
+                if not ids:
+                    return []
+            products = self._products
+            if lo is not None or hi is not None:
+                lo = float("-inf") if lo is None else lo
+                hi = float("inf") if hi is None else hi
+                ids = [i for i in ids if lo <= products[i].price <= hi]
+            return [products[i] for i in heapq.nsmallest(limit, ids)]
+
+    def _price_range(self, lo, hi, limit):
+        start = 0 if lo is None else bisect.bisect_left(self._prices, (lo, float("-inf")))
+        stop = len(self._prices) if hi is None else bisect.bisect_right(self._prices, (hi, float("inf")))
+        stop = min(stop, start + limit)
+        return [self._products[product_id] for _, product_id in self._prices[start:stop]]
+
+    def stats(self):
+        with self._lock:
+            return {"products": len(self._products), "words": len(self._words)}
@@ -0,0 +1,146 @@
+"""
+Transfer controller: streaming import and export of products and users
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import csv
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daos.batching import DEFAULT_CHUNK_SIZE, chunked
+from daos.factory import create_product_dao, create_user_dao
+from models.product import Product
+from models.user import User
+
+# Columns of each entity, in file order, and how to build a model from one record
+ENTITIES = {
+    "products": (("id", "name", "brand", "price"),
+                 lambda r: Product(None, r["name"], r["brand"], float(r["price"]))),
+    "users": (("id", "name", "email"),
+              lambda r: User(None, r["name"], r["email"])),
+}
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path, fmt=None):
+    """ Use the given format, or guess it from the file extension """
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in ("json", "jsonl", "ndjson"):
+        return "jsonl"
+    return "csv"
+
+
+def read_records(stream, fmt):
+    """ Yield (line number, dict) for each CSV row or JSON line, without reading the whole file """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ligne {line_number} : JSON invalide ({e})")
+
+
+class TransferProgress:
+    """ Rows transferred so far and throughput """
+
+    def __init__(self):
+        self.rows = 0
+        self.started_at = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class TransferController:
+    def __init__(self, entity, dao=None):
+        if entity not in ENTITIES:
+            raise ValueError(f"Entité inconnue : {entity}")
+        self.entity = entity
+        self.columns, self.to_model = ENTITIES[entity]
+        if dao is None:
+            dao = create_product_dao() if entity == "products" else create_user_dao()
+        self.dao = dao
+
+    def import_stream(self, stream, fmt, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+        """ Insert every record of the stream, one insert_many (and one commit) per chunk """
+        progress = TransferProgress()
+        for chunk in chunked(self._read_models(stream, fmt), chunk_size):
+            ids = self.dao.insert_many(chunk, chunk_size)
+            progress.rows += len(ids)
+            if len(ids) < len(chunk):
+                raise RuntimeError(f"Insertion interrompue après {progress.rows} lignes")
+            if on_progress:
+                on_progress(progress)
+        return progress
+
+    def _read_models(self, stream, fmt):
+        """ Build one model per record; a malformed record raises ValueError with its line number """
+        for line_number, record in read_records(stream, fmt):
+            try:
+                yield self.to_model(record)
+            except KeyError as e:
+                raise ValueError(f"Ligne {line_number} : champ {e} manquant")
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Ligne {line_number} : enregistrement invalide ({e})")
+
+    def import_file(self, path, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None, load_data=False):
+        """ Import a CSV or JSONL file; load_data uses LOAD DATA LOCAL INFILE for CSV products on MySQL """
+        fmt = detect_format(path, fmt)
+        if load_data and fmt == "csv" and self.entity == "products":
+            progress = TransferProgress()
+            with open(path, newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f))
+            loaded = self.dao.load_data_infile(path, header)
+            if loaded is not None:
+                progress.rows = loaded
+                if on_progress:
+                    on_progress(progress)
+                return progress
+            # The backend cannot do it (e.g. local_infile disabled): fall back to batched inserts
+        with open(path, newline="", encoding="utf-8") as f:
+            return self.import_stream(f, fmt, chunk_size, on_progress)
+
+    def export_stream(self, stream, fmt, batch_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+        """ Write every row, read page by page, to the stream """
+        progress = TransferProgress()
+        writer = csv.writer(stream) if fmt == "csv" else None
+        if writer:
+            writer.writerow(self.columns)
+        for i, item in enumerate(self.dao.iter_all(batch_size), start=1):
+            values = [getattr(item, column) for column in self.columns]
+            if writer:
+                writer.writerow(values)
+            else:
+                stream.write(json.dumps(dict(zip(self.columns, values)), ensure_ascii=False) + "\n")
+            progress.rows = i
+            if on_progress and i % batch_size == 0:
+                on_progress(progress)
+        if on_progress:
+            on_progress(progress)
+        return progress
+
+    def export_file(self, path, fmt=None, batch_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+        fmt = detect_format(path, fmt)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            return self.export_stream(f, fmt, batch_size, on_progress)
+
+    def shutdown(self):
+        """ Close database connection """
+        self.dao.close()
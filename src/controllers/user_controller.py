@@ -7,20 +7,80 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from daos.user_dao import UserDAO
+from daos.async_dao import AsyncUserDAO
+from daos.batching import DEFAULT_PAGE_SIZE
+from daos.factory import create_user_dao
+from daos.protocols import UserDAOProtocol
+from daos.unit_of_work import UnitOfWork, in_unit_of_work
+from daos.write_behind import write_behind_queue
 
 class UserController:
-    def __init__(self):
-        self.dao = UserDAO()
+    def __init__(self, dao=None, write_behind=False):
+        # The storage backend comes from the configuration unless a DAO is given
+        self.dao: UserDAOProtocol = dao if dao is not None else create_user_dao()
+        self._async_dao = None
+        # Optional write-behind queue: creates are grouped into one transaction per batch
+        self.write_behind = write_behind_queue(self.dao) if write_behind else None
 
     def list_users(self):
         """ List all users """
         return self.dao.select_all()
+
+    def list_users_page(self, after_id=0, limit=DEFAULT_PAGE_SIZE):
+        """ List one page of users, starting after the given user ID """
+        return self.dao.select_page(after_id, limit)
+
+    def iter_users(self, batch_size=DEFAULT_PAGE_SIZE):
+        """ Iterate over all users without loading them all at once """
+        return self.dao.iter_all(batch_size)
+
+    def count_users(self):
+        """ Number of users """
+        return self.dao.count()
+
+    def get_user(self, user_id):
+        """ Get one user by ID, or None """
+        return self.dao.get_by_id(user_id)
+
+    def find_user_by_email(self, email):
+        """ Get the user with given email, or None """
+        return self.dao.find_by_email(email)
         
-    def create_user(self, user):
-        """ Create a new user based on user inputs """
-        self.dao.insert(user)
+    def create_user(self, user, wait=True):
+        """ Create a new user based on user inputs. In write-behind mode, wait=False returns a Future of the ID """
+        # The write-behind thread would write outside of the current unit of work
+        if self.write_behind is not None and not in_unit_of_work():
+            future = self.write_behind.submit(user)
+            return future.result() if wait else future
+        return self.dao.insert(user)
+
+    def transaction(self, *daos):
+        """
+        Unit of work over this controller's DAO and the given ones (e.g. a ProductController's),
+        to use as `with controller.transaction() as uow:`. See daos.unit_of_work.UnitOfWork.
+        Creates skip the write-behind queue meanwhile and return the ID.
+        """
+        return UnitOfWork(self.dao, *daos)
+
+    @property
+    def async_dao(self):
+        """ Awaitable facade over this controller's DAO, created on first use """
+        if self._async_dao is None:
+            self._async_dao = AsyncUserDAO(self.dao)
+        return self._async_dao
+
+    async def list_users_async(self):
+        """ Awaitable list_users """
+        return await self.async_dao.select_all()
+
+    async def create_user_async(self, user):
+        """ Awaitable create_user """
+        return await self.async_dao.insert(user)
 
     def shutdown(self):
-        """ Close database connection """
+        """ Write pending creates, then close database connection """
+        if self.write_behind is not None:
+            self.write_behind.close()
+        if self._async_dao is not None:
+            self._async_dao.close()
         self.dao.close()
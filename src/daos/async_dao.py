@@ -0,0 +1,104 @@
+"""
+Asyncio facade over the blocking DAOs
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import asyncio
+import functools
+import os
+import sys
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from daos.product_dao import ProductDAO
+from daos.user_dao import UserDAO
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class AsyncDAO:
+    """
+    Runs the methods of a blocking DAO (MySQL or MongoDB) on a bounded thread pool so that
+    one event loop can overlap many database round trips. At most `max_concurrency` calls
+    are in flight at once; the others wait on a semaphore without occupying a thread.
+
+    Cancelling an awaiting call drops it if it has not started yet. A call that is already
+    running in a worker thread cannot be interrupted: it completes in the background and its
+    pooled connection is returned normally, but its result is discarded.
+    """
+
+    def __init__(self, dao, max_workers=DEFAULT_MAX_WORKERS, max_concurrency=None):
+        self.dao = dao
+        self.max_concurrency = max_concurrency or max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=type(dao).__name__)
+        # asyncio primitives belong to one event loop, so keep one semaphore per loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def run(self, method, *args, timeout=None, **kwargs):
+        """ Await method(*args, **kwargs) on the executor, optionally giving up after `timeout` seconds """
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+            if timeout is None:
+                return await future
+            return await asyncio.wait_for(future, timeout)
+
+    async def select_all(self, fast=False, as_tuples=False, timeout=None):
+        if fast or as_tuples:
+            return await self.run(self.dao.select_all, fast, as_tuples, timeout=timeout)
+        return await self.run(self.dao.select_all, timeout=timeout)
+
+    async def select_page(self, after_id=0, limit=None, timeout=None):
+        if limit is None:
+            return await self.run(self.dao.select_page, after_id, timeout=timeout)
+        return await self.run(self.dao.select_page, after_id, limit, timeout=timeout)
+
+    async def insert(self, item, timeout=None):
+        return await self.run(self.dao.insert, item, timeout=timeout)
+
+    async def insert_many(self, items, timeout=None):
+        return await self.run(self.dao.insert_many, list(items), timeout=timeout)
+
+    async def update(self, item, timeout=None):
+        return await self.run(self.dao.update, item, timeout=timeout)
+
+    async def delete(self, item_id, timeout=None):
+        return await self.run(self.dao.delete, item_id, timeout=timeout)
+
+    async def update_many(self, items, timeout=None):
+        return await self.run(self.dao.update_many, list(items), timeout=timeout)
+
+    async def delete_many(self, item_ids, timeout=None):
+        return await self.run(self.dao.delete_many, list(item_ids), timeout=timeout)
+
+    async def upsert_many(self, items, timeout=None):
+        return await self.run(self.dao.upsert_many, list(items), timeout=timeout)
+
+    def close(self, close_dao=False):
+        """ Stop the executor once the running calls are done """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if close_dao:
+            self.dao.close()
+
+
+class AsyncProductDAO(AsyncDAO):
+    """ Awaitable ProductDAO """
+
+    def __init__(self, dao=None, **kwargs):
+        super().__init__(dao if dao is not None else ProductDAO(), **kwargs)
+
+
+class AsyncUserDAO(AsyncDAO):
+    """ Awaitable UserDAO or UserDAOMongo """
+
+    def __init__(self, dao=None, **kwargs):
+        super().__init__(dao if dao is not None else UserDAO(), **kwargs)
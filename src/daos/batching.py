@@ -0,0 +1,32 @@
+"""
+Batching helpers for the DAOs
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_PAGE_SIZE = 500
+# Documents per cursor batch on the fast read paths (MongoDB still caps each batch at 16 MB)
+FAST_READ_BATCH_SIZE = 10000
+
+def chunked(iterable, size=DEFAULT_CHUNK_SIZE):
+    """ Yield lists of at most `size` items without materializing the whole iterable """
+    if size < 1:
+        raise ValueError("La taille des lots doit être positive")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def placeholders(count):
+    """ "(%s, %s, ...)" with count parameters, e.g. for IN lists """
+    return "(" + ", ".join(["%s"] * count) + ")"
+
+
+def case_by_id(column, count):
+    """ "column = CASE id WHEN %s THEN %s ... END": a new value per row, in one UPDATE """
+    return f"{column} = CASE id " + " ".join(["WHEN %s THEN %s"] * count) + " END"
@@ -0,0 +1,391 @@
+"""
+Connection pools shared by the SQL DAOs
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+import mysql.connector
+from mysql.connector import errors as mysql_errors
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+from daos.resilience import DeadlineExceededError, deadline, operation_timeout, retry_with_jitter, shared_breaker, time_left
+from daos.unit_of_work import SQLTransaction, TransactionError
+
+
+class PoolTimeoutError(Exception):
+    """ Raised when no connection becomes available before the checkout timeout """
+
+
+_CLOSED = object()
+
+
+class _Waiter:
+    """ A thread blocked in checkout, to which _checkin hands a connection directly """
+    __slots__ = ("ready", "handoff")
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self.handoff = None
+
+    def hand_over(self, handoff):
+        self.handoff = handoff
+        self.ready.set()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections. DAOs borrow a connection for
+    the duration of one operation with `with pool.connection() as conn:`
+    instead of holding a dedicated connection and cursor for their lifetime.
+
+    Each operation gets `operation_timeout` seconds (see daos.resilience.deadline), which bound
+    its wait for a connection and, through set_timeouts(conn, seconds_left), each of its round
+    trips. With a breaker, operations fail fast while the database is known to be unavailable.
+    """
+
+    def __init__(self, connect, pool_size=5, checkout_timeout=10.0, ping_interval=5.0, is_alive=None,
+                 operation_timeout=None, set_timeouts=None, breaker=None):
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self.ping_interval = ping_interval
+        self.operation_timeout = operation_timeout
+        self.breaker = breaker
+        self._connect = connect
+        self._is_alive = is_alive or (lambda conn: conn.is_connected())
+        self._set_timeouts = set_timeouts
+        # Used as a stack (LIFO): keeps the most recently used connections warm and lets the others age out
+        self._idle = []
+        # Threads waiting for a connection, served first come, first served
+        self._waiters = deque()
+        self._lock = threading.Lock()
+        # Transaction open by each thread, if any (see transaction())
+        self._local = threading.local()
+        self._created = 0
+        self._closed = False
+
+        # Counters
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.health_check_failures = 0
+
+    @contextmanager
+    def connection(self):
+        """ Borrow a connection for one operation; it is rolled back on error and returned to the pool """
+        transaction = getattr(self._local, "transaction", None)
+        if transaction is not None:
+            # Inside transaction(): same connection for every operation, rollback decided at the end
+            try:
+                with deadline(self.operation_timeout):
+                    self._apply_timeouts(transaction.connection.base_connection)
+                    yield transaction.connection
+            except BaseException:
+                transaction.failed = True
+                raise
+            return
+
+        with deadline(self.operation_timeout), self._guard():
+            conn = self._checkout()
+            reusable = True
+            try:
+                self._apply_timeouts(conn)
+                yield conn
+            except BaseException:
+                reusable = self._rollback(conn)
+                raise
+            finally:
+                self._checkin(conn, reusable)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run the calling thread's operations on this pool in one transaction: connection() hands
+        out the same connection until the end of the block and the DAOs' commits are deferred.
+        The block commits once, or rolls back if it raised or if one of its operations failed
+        (some DAOs only print their errors), raising TransactionError. A nested call opens a savepoint.
+        """
+        current = getattr(self._local, "transaction", None)
+        if current is not None:
+            with current.savepoint():
+                yield current
+            return
+
+        with self._guard():
+            with deadline(self.operation_timeout):
+                conn = self._checkout()
+            reusable = True
+            try:
+                transaction = SQLTransaction(conn)
+                self._local.transaction = transaction
+                try:
+                    yield transaction
+                finally:
+                    self._local.transaction = None
+                if transaction.failed:
+                    raise TransactionError("La transaction a été annulée : une opération a échoué")
+                with deadline(self.operation_timeout):
+                    self._apply_timeouts(conn)
+                    conn.commit()
+            except BaseException:
+                reusable = self._rollback(conn)
+                raise
+            finally:
+                self._checkin(conn, reusable)
+
+    def _guard(self):
+        return self.breaker.guard() if self.breaker is not None else nullcontext()
+
+    def _apply_timeouts(self, conn):
+        if self._set_timeouts is not None:
+            self._set_timeouts(conn, time_left())
+
+    def _checkout(self):
+        if self._closed:
+            raise PoolTimeoutError("Le pool de connexions est fermé")
+
+        start = time.perf_counter()
+        waiter = None
+        with self._lock:
+            # Idle connections only exist while nobody waits: _checkin hands them to waiters first
+            if self._idle:
+                conn, released_at = self._idle.pop()
+            elif self._created < self.pool_size:
+                self._created += 1
+                conn, released_at = None, time.monotonic()
+            else:
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+                self.waits += 1
+        if waiter is not None:
+            conn, released_at = self._wait(waiter)
+        if conn is None:
+            conn = self._new_connection()
+        waited = time.perf_counter() - start
+
+        if time.monotonic() - released_at >= self.ping_interval:
+            conn = self._check_health(conn)
+
+        with self._lock:
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+        return conn
+
+    def _wait(self, waiter):
+        """ Wait for a connection handed over by _checkin: (conn, released_at), conn None meaning "open one" """
+        try:
+            timeout = time_left(self.checkout_timeout)
+        except DeadlineExceededError:
+            timeout = 0
+        if not waiter.ready.wait(timeout):
+            with self._lock:
+                if waiter.handoff is None:
+                    self._waiters.remove(waiter)
+                    if timeout < self.checkout_timeout:
+                        raise DeadlineExceededError("Délai de l'opération dépassé en attendant une connexion")
+                    raise PoolTimeoutError(
+                        f"Aucune connexion disponible après {self.checkout_timeout} s (taille du pool : {self.pool_size})"
+                    )
+        if waiter.handoff is _CLOSED:
+            raise PoolTimeoutError("Le pool de connexions est fermé")
+        return waiter.handoff
+
+    def _new_connection(self):
+        """ Open a connection for a slot already reserved in self._created """
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                # Let the next waiter try in turn rather than wait for a connection that will not come
+                if self._waiters:
+                    self._waiters.popleft().hand_over((None, time.monotonic()))
+                else:
+                    self._created -= 1
+            raise
+
+    def _check_health(self, conn):
+        try:
+            if self._is_alive(conn):
+                return conn
+        except Exception:
+            pass
+        with self._lock:
+            self.health_check_failures += 1
+        self._close_quietly(conn)
+        return self._new_connection()
+
+    def _rollback(self, conn):
+        """ Roll back after a failed operation; returns False if the connection is unusable """
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _checkin(self, conn, reusable):
+        with self._lock:
+            # Hand the connection (or, if it is unusable, its slot) to the oldest waiter, so that
+            # a thread arriving later cannot take it first and starve the threads already waiting
+            waiter = self._waiters.popleft() if self._waiters and not self._closed else None
+            if reusable and not self._closed:
+                if waiter is not None:
+                    waiter.hand_over((conn, time.monotonic()))
+                    return
+                if len(self._idle) < self.pool_size:
+                    self._idle.append((conn, time.monotonic()))
+                    return
+            if waiter is None:
+                self._created -= 1
+            else:
+                waiter.hand_over((None, time.monotonic()))
+        self._close_quietly(conn)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        """ Snapshot of the pool counters """
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "open": self._created,
+                "idle": len(self._idle),
+                "waiting": len(self._waiters),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_time_total": self.wait_time_total,
+                "wait_time_avg": self.wait_time_total / self.checkouts if self.checkouts else 0.0,
+                "wait_time_max": self.wait_time_max,
+                "health_check_failures": self.health_check_failures,
+            }
+
+    def close(self):
+        """ Close idle connections; borrowed ones are closed when they are returned """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            while self._waiters:
+                self._waiters.popleft().hand_over(_CLOSED)
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+
+# Shared pools by key ("mysql", or "sqlite:<path>"), each with its number of users
+_shared_pools = {}
+_shared_lock = threading.Lock()
+
+
+def is_mysql_timeout(error):
+    return isinstance(error, (TimeoutError, mysql_errors.ConnectionTimeoutError,
+                              mysql_errors.ReadTimeoutError, mysql_errors.WriteTimeoutError))
+
+
+def is_mysql_failure(error):
+    """
+    Errors showing that the server is unreachable or not answering in time, as opposed to
+    the errors it answered with (duplicate key, syntax...). Lock wait timeouts and deadlocks
+    are operational errors with a server error number: the server answered those too.
+    """
+    if isinstance(error, (mysql_errors.OperationalError, mysql_errors.InterfaceError)):
+        # Client-side error numbers are in the 2000s
+        return error.errno is None or 2000 <= error.errno < 3000
+    return is_mysql_timeout(error) or isinstance(error, (ConnectionError, OSError))
+
+
+AUTO_INCREMENT_STEP_SQL = "SELECT @@auto_increment_increment"
+
+
+def multi_row_insert_step(conn):
+    """
+    Step between the auto-increment IDs of the rows of one multi-row INSERT on this server.
+    INSERT ... VALUES is a "simple insert": InnoDB reserves all its IDs at once, in every
+    innodb_autoinc_lock_mode, so they are lastrowid, lastrowid + step, ...
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(AUTO_INCREMENT_STEP_SQL)
+        return int(cursor.fetchall()[0][0])
+
+
+def insert_rows(cursor, sql, rows, step):
+    """ Insert rows with the one-row INSERT sql as one multi-row INSERT, and return their IDs """
+    # Text protocol on purpose: executemany turns it into one multi-row INSERT
+    cursor.executemany(sql, rows)
+    return list(range(cursor.lastrowid, cursor.lastrowid + step * len(rows), step))
+
+
+def _round_trip_timeout(configured, left):
+    """ Socket timeout of one round trip: the configured one, shortened to what is left of the deadline """
+    if left is None:
+        return configured or None
+    # mysql.connector takes whole seconds
+    left = max(1, math.ceil(left))
+    return min(configured, left) if configured else left
+
+
+def create_mysql_pool():
+    """ Build a MySQL pool from the settings; connections are opened on first checkout """
+    settings = get_settings()
+    connect_args = {
+        "host": settings.mysql_host,
+        "database": settings.mysql_db_name,
+        "user": settings.db_username,
+        "password": settings.db_password,
+        # Needed by ProductDAO.load_data_infile; off by default since the server could then request local files
+        "allow_local_infile": settings.mysql_allow_local_infile,
+        "read_timeout": settings.mysql_read_timeout or None,
+        "write_timeout": settings.mysql_write_timeout or None,
+    }
+
+    def connect():
+        timeout = _round_trip_timeout(settings.mysql_connect_timeout, time_left())
+        return mysql.connector.connect(connection_timeout=timeout, **connect_args)
+
+    def set_timeouts(conn, left):
+        conn.read_timeout = _round_trip_timeout(settings.mysql_read_timeout, left)
+        conn.write_timeout = _round_trip_timeout(settings.mysql_write_timeout, left)
+
+    return ConnectionPool(
+        # Opening a connection is idempotent: a refused or timed out attempt is retried
+        lambda: retry_with_jitter(connect, attempts=1 + settings.mysql_connect_retries, retry_if=is_mysql_failure),
+        pool_size=settings.mysql_pool_size,
+        checkout_timeout=settings.mysql_pool_timeout,
+        ping_interval=settings.mysql_pool_ping_interval,
+        operation_timeout=operation_timeout(),
+        set_timeouts=set_timeouts,
+        breaker=shared_breaker("mysql", is_failure=is_mysql_failure, is_timeout=is_mysql_timeout),
+    )
+
+
+def acquire_pool(key="mysql", create=create_mysql_pool):
+    """ Return the process-wide pool for key, creating it with create() on first use """
+    with _shared_lock:
+        entry = _shared_pools.get(key)
+        if entry is None:
+            entry = _shared_pools[key] = [create(), 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def release_pool(pool=None):
+    """ Drop one reference to a shared pool (the MySQL one by default) and close it when nobody uses it anymore """
+    with _shared_lock:
+        for key, entry in list(_shared_pools.items()):
+            if entry[0] is pool or (pool is None and key == "mysql"):
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    entry[0].close()
+                    del _shared_pools[key]
+                return
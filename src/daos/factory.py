@@ -0,0 +1,36 @@
+"""
+DAO factory: picks the storage backend from the configuration
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+from daos.product_dao import ProductDAO
+from daos.product_dao_sqlite import ProductDAOSQLite
+from daos.protocols import ProductDAOProtocol, UserDAOProtocol
+from daos.user_dao import UserDAO
+from daos.user_dao_cqrs import UserDAOCQRS
+from daos.user_dao_mongo import UserDAOMongo
+from daos.user_dao_sqlite import UserDAOSQLite
+
+PRODUCT_BACKENDS = {"mysql": ProductDAO, "sqlite": ProductDAOSQLite}
+USER_BACKENDS = {"mysql": UserDAO, "mongo": UserDAOMongo, "sqlite": UserDAOSQLite, "cqrs": UserDAOCQRS}
+
+
+def create_product_dao(backend=None) -> ProductDAOProtocol:
+    """ Product DAO of the given backend, or of STORE_BACKEND (mysql or sqlite) """
+    backend = backend or get_settings().store_backend
+    if backend not in PRODUCT_BACKENDS:
+        raise ValueError(f"Backend de produits inconnu : {backend}")
+    return PRODUCT_BACKENDS[backend]()
+
+
+def create_user_dao(backend=None) -> UserDAOProtocol:
+    """ User DAO of the given backend, or of USER_BACKEND (mysql, mongo, sqlite or cqrs), which defaults to STORE_BACKEND """
+    backend = backend or get_settings().user_backend
+    if backend not in USER_BACKENDS:
+        raise ValueError(f"Backend d'utilisateurs inconnu : {backend}")
+    return USER_BACKENDS[backend]()
@@ -0,0 +1,55 @@
+"""
+Fast read path of the DAOs: rows mapped straight into models or tuples
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+from functools import lru_cache
+from itertools import starmap
+import mysql.connector
+from mysql.connector.connection import MySQLConnection
+
+# True when mysql.connector converts rows in C (mysql-connector-python with its C extension)
+HAVE_CEXT = mysql.connector.HAVE_CEXT
+
+
+@lru_cache(maxsize=None)
+def row_mapper(converters, model=None):
+    """
+    Function turning one row into model(*values), or into a tuple without model, where
+    values[i] is converters[i](row[i]), or row[i] itself when converters[i] is None.
+    The function is generated once per (converters, model), so mapping a row is a single
+    call with no loop over the columns.
+    """
+    args = ", ".join(f"c{i}(r[{i}])" if conv else f"r[{i}]" for i, conv in enumerate(converters))
+    namespace = {f"c{i}": conv for i, conv in enumerate(converters) if conv}
+    namespace["model"] = model
+    return eval(f"lambda r: model({args})" if model else f"lambda r: ({args},)", namespace)
+
+
+def text(value):
+    """ Converter of a raw (bytes) string column """
+    return value.decode("utf-8")
+
+
+def map_rows(rows, model=None):
+    """ Rows already converted by the driver, as models (positional arguments) or left as tuples """
+    return list(starmap(model, rows)) if model else list(rows)
+
+
+def fetch_all_fast(conn, sql, raw_converters, model=None, params=()):
+    """
+    Run a SELECT and map its rows with the least Python work per row: with the C extension
+    (or SQLite) the driver converts columns in C; with the pure Python connector, rows are
+    fetched raw (bytes) and converted by a generated row_mapper(raw_converters) instead of
+    the connector's per-value conversion.
+    """
+    if isinstance(conn, MySQLConnection):
+        with conn.cursor(raw=True) as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        return list(map(row_mapper(raw_converters, model), rows))
+
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return map_rows(rows, model)
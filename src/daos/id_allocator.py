@@ -0,0 +1,75 @@
+"""
+Hi/lo id allocator backed by a MongoDB counter document
+SPDX-License-Identifier: LGPL-3.0-or-later
+"""
+import threading
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+
+DEFAULT_BLOCK_SIZE = 100
+
+
+class BlockIdAllocator:
+    """
+    Reserves ranges of `block_size` ids with one atomic $inc on the counter document,
+    then hands them out locally. Ids stay unique across processes because every
+    process gets disjoint blocks from the same counter.
+
+    Ids left in the current block when the process stops are not reused: the
+    counter keeps increasing, so they become a gap in the sequence. release()
+    gives them back only when no other process reserved a block in the meantime.
+    """
+
+    def __init__(self, counters: Collection, name: str, block_size: int = DEFAULT_BLOCK_SIZE):
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.counters = counters
+        self.name = name
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 1
+        self._last = 0
+        self.blocks_reserved = 0
+
+    def reserve(self, count: int) -> range:
+        """ Reserve `count` consecutive ids directly from the counter, e.g. for a bulk insert """
+        # upsert creates the counter on first use, so building the allocator costs no round trip
+        doc = self.counters.find_one_and_update(
+            {"_id": self.name},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        last_id = int(doc["seq"])
+        return range(last_id - count + 1, last_id + 1)
+
+    def advance_to(self, last_id: int):
+        """ Make sure the counter never hands out ids up to last_id, e.g. after copying rows with their ids """
+        self.counters.update_one({"_id": self.name}, {"$max": {"seq": int(last_id)}}, upsert=True)
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._next > self._last:
+                block = self.reserve(self.block_size)
+                self._next, self._last = block.start, block.stop - 1
+                self.blocks_reserved += 1
+            new_id = self._next
+            self._next += 1
+            return new_id
+
+    def remaining(self) -> int:
+        """ Number of ids still available locally in the current block """
+        with self._lock:
+            return self._last - self._next + 1
+
+    def release(self) -> bool:
+        """ Hand unused ids back if our block is still the last one reserved; returns True if they were """
+        with self._lock:
+            if self._next > self._last:
+                return False
+            res = self.counters.update_one(
+                {"_id": self.name, "seq": self._last},
+                {"$set": {"seq": self._next - 1}},
+            )
+            self._last = self._next - 1
+            return res.modified_count == 1
@@ -0,0 +1,243 @@
+"""
+Timing instrumentation and slow-query log for the DAOs
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import functools
+import json
+import os
+import reprlib
+import sys
+import threading
+import time
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+
+# Upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_args_repr = reprlib.Repr()
+_args_repr.maxstring = 80
+_args_repr.maxother = 80
+
+
+class OperationStats:
+    """ Latency histogram, row count and error count of one DAO operation """
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds, rows, failed):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+        self.calls += 1
+        self.rows += rows
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if failed:
+            self.errors += 1
+
+    def quantile(self, q):
+        """ Upper bound of the bucket holding the q-th quantile """
+        if not self.calls:
+            return 0.0
+        target = q * self.calls
+        seen = 0
+        for bound, count in zip(BUCKETS, self.bucket_counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": self.total_seconds * 1000,
+            "mean_ms": self.total_seconds / self.calls * 1000 if self.calls else 0.0,
+            "max_ms": self.max_seconds * 1000,
+            "p50_ms": self.quantile(0.50) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "p99_ms": self.quantile(0.99) * 1000,
+            "buckets": {str(bound): count for bound, count in zip(BUCKETS, self.bucket_counts)},
+        }
+
+
+class DAOMetrics:
+    """
+    Registry of per-operation statistics. When disabled, instrumented methods only pay
+    for one attribute check before calling the real method.
+    """
+
+    def __init__(self, enabled=False, slow_query_threshold=0.1, slow_log_size=100):
+        self.enabled = enabled
+        self.slow_query_threshold = slow_query_threshold
+        self.slow_log = deque(maxlen=slow_log_size)
+        self.slow_queries = 0
+        self._operations = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, operation, seconds, rows=0, failed=False, args=()):
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                stats = self._operations[operation] = OperationStats()
+            stats.add(seconds, rows, failed)
+            if seconds >= self.slow_query_threshold:
+                self.slow_queries += 1
+                self.slow_log.append({
+                    "operation": operation,
+                    "duration_ms": seconds * 1000,
+                    "rows": rows,
+                    "failed": failed,
+                    "args": _args_repr.repr(args),
+                    "at": time.time(),
+                })
+
+    def mark_failed(self):
+        """ Count the operation running in this thread as failed, for DAOs that catch their own errors """
+        if self.enabled:
+            spans = getattr(self._local, "spans", None)
+            if spans:
+                spans[-1] = True
+
+    def _open_span(self):
+        spans = getattr(self._local, "spans", None)
+        if spans is None:
+            spans = self._local.spans = []
+        spans.append(False)
+
+    def _close_span(self):
+        return self._local.spans.pop()
+
+    def gauge(self, name, read):
+        """ Register a value read at snapshot time, e.g. the lag of a read model """
+        with self._lock:
+            self._gauges[name] = read
+
+    def remove_gauge(self, name):
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def _read_gauges(self):
+        with self._lock:
+            gauges = sorted(self._gauges.items())
+        return {name: float(read()) for name, read in gauges}
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+            self.slow_log.clear()
+            self.slow_queries = 0
+
+    def snapshot(self):
+        gauges = self._read_gauges()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "slow_query_threshold_ms": self.slow_query_threshold * 1000,
+                "slow_queries": self.slow_queries,
+                "operations": {op: stats.to_dict() for op, stats in sorted(self._operations.items())},
+                "gauges": gauges,
+                "slow_log": list(self.slow_log),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """ Snapshot in the Prometheus text exposition format """
+        lines = [
+            "# HELP dao_operation_duration_seconds Latency of DAO operations.",
+            "# TYPE dao_operation_duration_seconds histogram",
+        ]
+        gauges = self._read_gauges()
+        with self._lock:
+            operations = sorted(self._operations.items())
+            for op, stats in operations:
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stats.bucket_counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'dao_operation_duration_seconds_bucket{{operation="{op}",le="{le}"}} {cumulative}')
+                lines.append(f'dao_operation_duration_seconds_sum{{operation="{op}"}} {stats.total_seconds}')
+                lines.append(f'dao_operation_duration_seconds_count{{operation="{op}"}} {stats.calls}')
+            lines.append("# HELP dao_operation_rows_total Rows returned or written by DAO operations.")
+            lines.append("# TYPE dao_operation_rows_total counter")
+            for op, stats in operations:
+                lines.append(f'dao_operation_rows_total{{operation="{op}"}} {stats.rows}')
+            lines.append("# HELP dao_operation_errors_total Failed DAO operations.")
+            lines.append("# TYPE dao_operation_errors_total counter")
+            for op, stats in operations:
+                lines.append(f'dao_operation_errors_total{{operation="{op}"}} {stats.errors}')
+            lines.append("# HELP dao_slow_queries_total DAO operations slower than the slow-query threshold.")
+            lines.append("# TYPE dao_slow_queries_total counter")
+            lines.append(f"dao_slow_queries_total {self.slow_queries}")
+        for name, value in gauges.items():
+            lines.append(f"# TYPE dao_{name} gauge")
+            lines.append(f"dao_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """ Dump a snapshot to path, in Prometheus format for *.prom files and JSON otherwise """
+        with open(path, "w") as f:
+            f.write(self.to_prometheus() if path.endswith(".prom") else self.to_json())
+
+
+def rows_of_result(result):
+    """ Default row count: length of a list-like result, 1 for any other non-None result """
+    if result is None:
+        return 0
+    if isinstance(result, (list, tuple, range)) or hasattr(result, "__len__") and not isinstance(result, (str, dict)):
+        return len(result)
+    return 1
+
+
+def rows_from_count(result):
+    """ Row count for operations that return the number of affected rows """
+    return int(result or 0)
+
+
+def instrumented(operation, rows=rows_of_result):
+    """ Decorator recording latency, row count and errors of a DAO method under `operation` """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return method(*args, **kwargs)
+            METRICS._open_span()
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except BaseException:
+                elapsed = time.perf_counter() - start
+                METRICS._close_span()
+                METRICS.record(operation, elapsed, 0, True, args[1:])
+                raise
+            elapsed = time.perf_counter() - start
+            failed = METRICS._close_span()
+            METRICS.record(operation, elapsed, rows(result), failed, args[1:])
+            return result
+        return wrapper
+    return decorate
+
+
+def metrics_from_env():
+    """ Build the registry from DAO_METRICS and DAO_SLOW_QUERY_MS """
+    settings = get_settings()
+    return DAOMetrics(enabled=settings.dao_metrics, slow_query_threshold=settings.dao_slow_query_ms / 1000)
+
+
+METRICS = metrics_from_env()
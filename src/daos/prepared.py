@@ -0,0 +1,110 @@
+"""
+Per-connection cache of prepared statements for the SQL DAOs
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+
+
+class StatementCache:
+    """
+    Keeps one prepared cursor (binary protocol, `conn.cursor(prepared=True)`) per SQL
+    statement and per connection, so that a statement is parsed once by the server and
+    then only executed. Entries are keyed weakly by connection: when the pool closes or
+    replaces a connection, its statements go away with it.
+
+    mysql.connector re-prepares when it is given a different string object than the one it
+    prepared, so callers must pass the same (module-level constant) SQL string every time.
+    """
+
+    def __init__(self, enabled=True, max_statements=32):
+        self.enabled = enabled
+        self.max_statements = max_statements
+        self._by_connection = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def cursor(self, conn, sql):
+        """ Borrow the prepared cursor of sql on conn, or a plain cursor when the cache is disabled """
+        if not self.enabled:
+            with conn.cursor() as cursor:
+                yield cursor
+            return
+
+        # Inside a transaction the DAOs get a TransactionConnection: cache on the real connection
+        conn = getattr(conn, "base_connection", conn)
+        cursor = self._prepared_cursor(conn, sql)
+        try:
+            yield cursor
+        except BaseException:
+            # The statement or the connection may be broken: prepare again next time
+            self.discard(conn)
+            raise
+
+    def _prepared_cursor(self, conn, sql):
+        with self._lock:
+            cursors = self._by_connection.get(conn)
+            if cursors is None:
+                cursors = self._by_connection[conn] = OrderedDict()
+            cursor = cursors.get(sql)
+            if cursor is not None:
+                cursors.move_to_end(sql)
+                self.hits += 1
+                return cursor
+            self.misses += 1
+            cursor = cursors[sql] = conn.cursor(prepared=True)
+            if len(cursors) > self.max_statements:
+                _, oldest = cursors.popitem(last=False)
+                self.evictions += 1
+                self._close_quietly(oldest)
+            return cursor
+
+    def discard(self, conn):
+        """ Close and forget every prepared cursor of conn """
+        with self._lock:
+            cursors = self._by_connection.pop(conn, None)
+        for cursor in (cursors or {}).values():
+            self._close_quietly(cursor)
+
+    @staticmethod
+    def _close_quietly(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        """ Snapshot of the cache counters """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "connections": len(self._by_connection),
+                "statements": sum(len(cursors) for cursors in self._by_connection.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def statement_cache_from_env():
+    """ Build the cache from MYSQL_PREPARED_STATEMENTS and MYSQL_STATEMENT_CACHE_SIZE """
+    settings = get_settings()
+    return StatementCache(enabled=settings.mysql_prepared_statements, max_statements=settings.mysql_statement_cache_size)
+
+
+STATEMENTS = statement_cache_from_env()
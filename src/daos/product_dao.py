@@ -5,124 +5,416 @@ Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
 """
 import os
 import sys
-from dotenv import find_dotenv, load_dotenv
-import mysql.connector
+from functools import lru_cache
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from daos.batching import DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE, case_by_id, chunked, placeholders
+from daos.connection_pool import acquire_pool, insert_rows, multi_row_insert_step, release_pool
+from daos.fast_rows import fetch_all_fast, text
+from daos.instrumentation import METRICS, instrumented, rows_from_count
+from daos.prepared import STATEMENTS
+from daos.resilience import DatabaseUnavailableError
 from models.product import Product
+from models.product_batch import ProductBatch
+
+PRODUCT_COLUMNS = "id, name, brand, price"
+
+# Fixed statements, run as prepared statements (see daos.prepared): keep them module-level constants
+SELECT_PAGE_SQL = "SELECT " + PRODUCT_COLUMNS + " FROM products WHERE id > %s ORDER BY id LIMIT %s"
+SELECT_BY_ID_SQL = "SELECT " + PRODUCT_COLUMNS + " FROM products WHERE id = %s"
+SELECT_BY_BRAND_SQL = "SELECT " + PRODUCT_COLUMNS + " FROM products WHERE brand = %s ORDER BY id"
+SELECT_BY_PRICE_SQL = "SELECT " + PRODUCT_COLUMNS + " FROM products WHERE price BETWEEN %s AND %s ORDER BY price, id"
+COUNT_SQL = "SELECT COUNT(*) FROM products"
+EXISTS_SQL = "SELECT 1 FROM products LIMIT 1"
+INSERT_SQL = "INSERT INTO products (name, brand, price) VALUES (%s, %s, %s)"
+UPDATE_SQL = "UPDATE products SET name = %s, brand = %s, price = %s WHERE id = %s"
+DELETE_SQL = "DELETE FROM products WHERE id = %s"
+# Fast path: "+ 0E0" makes the server send price as DOUBLE, which the driver turns into a float without a Decimal
+SELECT_ALL_FAST_SQL = "SELECT id, name, brand, price + 0E0 FROM products ORDER BY id"
+RAW_CONVERTERS = (int, text, text, float)
+
+# Bulk statements depend on the batch size: built once per size, sent over the text protocol
+@lru_cache(maxsize=16)
+def _update_many_sql(count):
+    """ One UPDATE for `count` products: CASE picks each row's new values, IN selects the rows """
+    columns = ", ".join(case_by_id(column, count) for column in ("name", "brand", "price"))
+    return f"UPDATE products SET {columns} WHERE id IN {placeholders(count)}"
+
+@lru_cache(maxsize=16)
+def _delete_many_sql(count):
+    return f"DELETE FROM products WHERE id IN {placeholders(count)}"
+
+@lru_cache(maxsize=16)
+def _upsert_many_sql(count):
+    """ Multi-row INSERT that updates the rows whose ID already exists """
+    rows = ", ".join([placeholders(4)] * count)
+    return (f"INSERT INTO products (id, name, brand, price) VALUES {rows} AS new "
+            "ON DUPLICATE KEY UPDATE name = new.name, brand = new.brand, price = new.price")
+
+def _to_product(row):
+    # Convert price from Decimal to float for consistency
+    return Product(id=row[0], name=row[1], brand=row[2], price=float(row[3]))
 
 class ProductDAO:
-    def __init__(self):
-        self.conn = None
-        self.cursor = None
+    def __init__(self, pool=None):
+        """ Use the given connection pool, or the process-wide MySQL pool by default """
+        self.pool = pool
+        self._shared_pool = pool is None
+        # Auto-increment step of insert_many, read from the server on first use
+        self._insert_step = None
+        if pool is not None:
+            return
         
         try:
-            env_file = find_dotenv()
-            load_dotenv(env_file)   
-            
-            # Get database configuration from environment
-            db_host = os.getenv("MYSQL_HOST", "localhost")
-            db_name = os.getenv("MYSQL_DB_NAME")
-            db_user = os.getenv("DB_USERNAME")
-            db_pass = os.getenv("DB_PASSWORD")     
-            
-            # Try to connect to the database
-            self.conn = mysql.connector.connect(
-                host=db_host, 
-                user=db_user, 
-                password=db_pass, 
-                database=db_name
-            )   
-            self.cursor = self.conn.cursor()
-            
+            # Connections are borrowed from the shared pool for each operation
+            self.pool = acquire_pool()
         except FileNotFoundError as e:
             print("Attention : Veuillez créer un fichier .env")
         except Exception as e:
             print("Erreur : " + str(e))
 
-    def select_all(self):
-        """ Select all products from MySQL """
-        if not self.cursor:
+    @instrumented("products.select_all")
+    def select_all(self, fast=False, as_tuples=False):
+        """
+        Select all products from MySQL. With fast, rows are mapped by the fast read path
+        (see daos.fast_rows); with as_tuples, they are returned as (id, name, brand, price)
+        tuples instead of Product objects, which implies fast. Errors are raised: an empty
+        list would read as an empty catalog, and be cached as one.
+        """
+        if not self.pool:
+            raise ConnectionError("Connexion à la base de données non établie")
+        
+        if fast or as_tuples:
+            with self.pool.connection() as conn:
+                return fetch_all_fast(conn, SELECT_ALL_FAST_SQL, RAW_CONVERTERS, None if as_tuples else Product)
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT id, name, brand, price FROM products ORDER BY id")
+            rows = cursor.fetchall()
+        
+        products = []
+        for row in rows:
+            # Convert price from Decimal to float for consistency
+            product = Product(id=row[0], name=row[1], brand=row[2], price=float(row[3]))
+            products.append(product)
+        
+        return products
+
+    @instrumented("products.select_page")
+    def select_page(self, after_id=0, limit=DEFAULT_PAGE_SIZE):
+        """
+        Select up to `limit` products whose ID is greater than `after_id` (keyset pagination).
+        Errors are raised: an empty page would read as the end of the table.
+        """
+        rows = self._select_rows(after_id, limit)
+        return [_to_product(row) for row in rows]
+
+    @instrumented("products.select_batch")
+    def select_batch(self, batch_size=DEFAULT_PAGE_SIZE):
+        """ Select all products into a columnar ProductBatch, without creating one Product per row. Errors are raised """
+        batch = ProductBatch()
+        after_id = 0
+        while True:
+            rows = self._select_rows(after_id, batch_size)
+            batch.extend(rows)
+            if len(rows) < batch_size:
+                return batch
+            after_id = rows[-1][0]
+
+    def _select_rows(self, after_id, limit):
+        """ Fetch raw (id, name, brand, price) rows of one keyset page """
+        if not self.pool:
+            raise ConnectionError("Connexion à la base de données non établie")
+        with self.pool.connection() as conn, STATEMENTS.cursor(conn, SELECT_PAGE_SQL) as cursor:
+            cursor.execute(SELECT_PAGE_SQL, (after_id or 0, limit))
+            return cursor.fetchall()
+
+    def iter_all(self, batch_size=DEFAULT_PAGE_SIZE):
+        """ Iterate over all products one page at a time, so memory use does not grow with the table. Errors are raised """
+        after_id = 0
+        while True:
+            products = self.select_page(after_id, batch_size)
+            yield from products
+            if len(products) < batch_size:
+                return
+            after_id = products[-1].id
+
+    @instrumented("products.get_by_id")
+    def get_by_id(self, product_id):
+        """ Select the product with given ID, or None """
+        rows = self._query(SELECT_BY_ID_SQL, (product_id,))
+        return _to_product(rows[0]) if rows else None
+
+    @instrumented("products.find_by_brand")
+    def find_by_brand(self, brand):
+        """ Select products of given brand (uses idx_products_brand) """
+        rows = self._query(SELECT_BY_BRAND_SQL, (brand,))
+        return [_to_product(row) for row in rows]
+
+    @instrumented("products.find_by_price_range")
+    def find_by_price_range(self, lo, hi):
+        """ Select products with lo <= price <= hi, cheapest first (uses idx_products_price) """
+        rows = self._query(SELECT_BY_PRICE_SQL, (lo, hi))
+        return [_to_product(row) for row in rows]
+
+    @instrumented("products.count")
+    def count(self):
+        """ Count products in MySQL """
+        rows = self._query(COUNT_SQL)
+        return rows[0][0] if rows else 0
+
+    @instrumented("products.exists")
+    def exists(self):
+        """ Tell whether there is at least one product, without counting them all """
+        rows = self._query(EXISTS_SQL)
+        return bool(rows)
+
+    @instrumented("products.price_stats_by_brand")
+    def price_stats_by_brand(self):
+        """ Count, min, max, average and total price per brand, computed by MySQL """
+        rows = self._query(
+            "SELECT brand, COUNT(*), MIN(price), MAX(price), AVG(price), SUM(price) "
+            "FROM products GROUP BY brand ORDER BY brand"
+        )
+        return [
+            {
+                "brand": row[0],
+                "count": row[1],
+                "min": float(row[2]),
+                "max": float(row[3]),
+                "avg": float(row[4]),
+                "sum": float(row[5]),
+            }
+            for row in rows
+        ]
+
+    def _query(self, sql, params=()):
+        """
+        Run a SELECT as a prepared statement and return its rows, or an empty list on error. An
+        unavailable database is raised: an empty result would read as an empty catalog.
+        """
+        if not self.pool:
             print("Erreur : Connexion à la base de données non établie")
             return []
         
         try:
-            self.cursor.execute("SELECT id, name, brand, price FROM products ORDER BY id")
-            rows = self.cursor.fetchall()
-            
-            products = []
-            for row in rows:
-                # Convert price from Decimal to float for consistency
-                product = Product(id=row[0], name=row[1], brand=row[2], price=float(row[3]))
-                products.append(product)
-            
-            return products
+            with self.pool.connection() as conn, STATEMENTS.cursor(conn, sql) as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
+            METRICS.mark_failed()
             print(f"Erreur lors de la sélection des produits : {e}")
             return []
 
+    @instrumented("products.insert")
     def insert(self, product):
         """ Insert given product into MySQL """
-        if not self.cursor:
+        if not self.pool:
             print("Erreur : Connexion à la base de données non établie")
             return None
         
         try:
-            self.cursor.execute(
-                "INSERT INTO products (name, brand, price) VALUES (%s, %s, %s)",
-                (product.name, product.brand, product.price),
-            )
-            self.conn.commit()
-            return self.cursor.lastrowid
+            with self.pool.connection() as conn, STATEMENTS.cursor(conn, INSERT_SQL) as cursor:
+                cursor.execute(INSERT_SQL, (product.name, product.brand, product.price))
+                conn.commit()
+                return cursor.lastrowid
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
+            METRICS.mark_failed()
+            # The pool rolls back the borrowed connection before taking it back
             print(f"Erreur lors de l'insertion du produit : {e}")
-            self.conn.rollback()
             return None
 
+    def _multi_row_insert_step(self, conn):
+        """ Step between the IDs insert_many assigns: queried from the server once per DAO """
+        if self._insert_step is None:
+            self._insert_step = multi_row_insert_step(conn)
+        return self._insert_step
+
+    @instrumented("products.insert_many")
+    def insert_many(self, products, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ Insert given products into MySQL in batches, with one commit per batch. Returns the assigned IDs """
+        if not self.pool:
+            print("Erreur : Connexion à la base de données non établie")
+            return []
+        
+        ids = []
+        try:
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                step = self._multi_row_insert_step(conn)
+                for chunk in chunked(products, chunk_size):
+                    chunk_ids = insert_rows(cursor, INSERT_SQL, [(product.name, product.brand, product.price) for product in chunk], step)
+                    conn.commit()
+                    ids.extend(chunk_ids)
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            METRICS.mark_failed()
+            # IDs of the batches committed before the error are still returned
+            print(f"Erreur lors de l'insertion des produits : {e}")
+        return ids
+
+    @instrumented("products.update_many", rows=sum)
+    def update_many(self, products, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ Update given products by ID, with one UPDATE and one commit per batch. Returns the number of changed rows per batch """
+        if not self.pool:
+            print("Erreur : Connexion à la base de données non établie")
+            return []
+        
+        counts = []
+        try:
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                for chunk in chunked(products, chunk_size):
+                    params = []
+                    for column in ("name", "brand", "price"):
+                        for product in chunk:
+                            params += (product.id, getattr(product, column))
+                    params.extend(product.id for product in chunk)
+                    cursor.execute(_update_many_sql(len(chunk)), params)
+                    conn.commit()
+                    counts.append(cursor.rowcount)
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            METRICS.mark_failed()
+            # Counts of the batches committed before the error are still returned
+            print(f"Erreur lors de la mise à jour des produits : {e}")
+        return counts
+
+    @instrumented("products.delete_many", rows=sum)
+    def delete_many(self, product_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ Delete the products with given IDs, with one DELETE ... IN and one commit per batch. Returns the deleted count per batch """
+        if not self.pool:
+            print("Erreur : Connexion à la base de données non établie")
+            return []
+        
+        counts = []
+        try:
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                for chunk in chunked(product_ids, chunk_size):
+                    cursor.execute(_delete_many_sql(len(chunk)), chunk)
+                    conn.commit()
+                    counts.append(cursor.rowcount)
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            METRICS.mark_failed()
+            print(f"Erreur lors de la suppression des produits : {e}")
+        return counts
+
+    @instrumented("products.upsert_many", rows=sum)
+    def upsert_many(self, products, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Create or replace given products by their ID, with one multi-row INSERT ... ON DUPLICATE
+        KEY UPDATE and one commit per batch. Returns the affected count per batch, as the server
+        counts it: MySQL counts 1 per inserted row and 2 per changed row.
+        """
+        if not self.pool:
+            print("Erreur : Connexion à la base de données non établie")
+            return []
+        
+        counts = []
+        try:
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                for chunk in chunked(products, chunk_size):
+                    params = [value for p in chunk for value in (p.id, p.name, p.brand, p.price)]
+                    cursor.execute(_upsert_many_sql(len(chunk)), params)
+                    conn.commit()
+                    counts.append(cursor.rowcount)
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            METRICS.mark_failed()
+            print(f"Erreur lors de l'enregistrement des produits : {e}")
+        return counts
+
+    @instrumented("products.load_data_infile", rows=rows_from_count)
+    def load_data_infile(self, path, columns):
+        """ Bulk-load a CSV file (with a header) through LOAD DATA LOCAL INFILE. Returns the number of rows, or None if unavailable """
+        if not self.pool:
+            print("Erreur : Connexion à la base de données non établie")
+            return None
+        
+        # Columns other than name, brand and price (e.g. an exported id) are read into a discarded variable
+        targets = ", ".join(c if c in ("name", "brand", "price") else "@skip" for c in columns)
+        with open(path, "rb") as f:
+            line_end = "\\r\\n" if f.readline().endswith(b"\r\n") else "\\n"
+        try:
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(
+                    "LOAD DATA LOCAL INFILE %s INTO TABLE products CHARACTER SET utf8mb4 "
+                    "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                    f"LINES TERMINATED BY '{line_end}' IGNORE 1 LINES ({targets})",
+                    (os.path.abspath(path),),
+                )
+                conn.commit()
+                return cursor.rowcount
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            METRICS.mark_failed()
+            print(f"LOAD DATA LOCAL INFILE indisponible : {e}")
+            return None
+
+    @instrumented("products.update")
     def update(self, product):
         """ Update given product in MySQL """
-        if not self.cursor:
+        if not self.pool:
             print("Erreur : Connexion à la base de données non établie")
             return
         
         try:
-            self.cursor.execute(
-                "UPDATE products SET name = %s, brand = %s, price = %s WHERE id = %s",
-                (product.name, product.brand, product.price, product.id)
-            )
-            self.conn.commit()
+            with self.pool.connection() as conn, STATEMENTS.cursor(conn, UPDATE_SQL) as cursor:
+                cursor.execute(UPDATE_SQL, (product.name, product.brand, product.price, product.id))
+                conn.commit()
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
+            METRICS.mark_failed()
             print(f"Erreur lors de la mise à jour du produit : {e}")
-            self.conn.rollback()
 
+    @instrumented("products.delete")
     def delete(self, product_id):
         """ Delete product from MySQL with given product ID """
-        if not self.cursor:
+        if not self.pool:
             print("Erreur : Connexion à la base de données non établie")
             return
         
         try:
-            self.cursor.execute("DELETE FROM products WHERE id = %s", (product_id,))
-            self.conn.commit()
+            with self.pool.connection() as conn, STATEMENTS.cursor(conn, DELETE_SQL) as cursor:
+                cursor.execute(DELETE_SQL, (product_id,))
+                conn.commit()
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
+            METRICS.mark_failed()
             print(f"Erreur lors de la suppression du produit : {e}")
-            self.conn.rollback()
 
+    @instrumented("products.delete_all")
     def delete_all(self): #optional
         """ Empty products table in MySQL """
-        if not self.cursor:
+        if not self.pool:
             print("Erreur : Connexion à la base de données non établie")
             return
         
         try:
-            self.cursor.execute("DELETE FROM products")
-            self.conn.commit()
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute("DELETE FROM products")
+                conn.commit()
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
+            METRICS.mark_failed()
             print(f"Erreur lors de la suppression de tous les produits : {e}")
-            self.conn.rollback()
         
+    def transaction(self):
+        """ Transaction of the calling thread on this DAO's pool, shared with the other DAOs of the pool """
+        return self.pool.transaction()
+
     def close(self):
-        if self.cursor:
-            self.cursor.close()
-        if self.conn:
-            self.conn.close()
+        """ Give this DAO's reference to the shared pool back """
+        if self.pool and self._shared_pool:
+            release_pool(self.pool)
+        self.pool = None
@@ -0,0 +1,23 @@
+"""
+Product DAO (SQLite)
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from daos.product_dao import ProductDAO
+from daos.sqlite_pool import acquire_sqlite_pool
+
+class ProductDAOSQLite(ProductDAO):
+    """ ProductDAO on an embedded SQLite file; the queries are shared with MySQL """
+
+    def __init__(self, path=None):
+        super().__init__(pool=acquire_sqlite_pool(path))
+        # The pool is shared with the other SQLite DAOs on the same file
+        self._shared_pool = True
+
+    def _multi_row_insert_step(self, conn):
+        # One writer at a time: the rows inserted by executemany get consecutive IDs
+        return 1
@@ -0,0 +1,57 @@
+"""
+Common interface of the DAOs
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import sys
+from typing import Iterable, Iterator, List, Optional, Protocol, runtime_checkable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.product import Product
+from models.user import User
+
+
+@runtime_checkable
+class ProductDAOProtocol(Protocol):
+    """ Operations every product DAO offers, whatever its storage backend """
+
+    def select_all(self, fast: bool = False, as_tuples: bool = False) -> List[Product]: ...
+    def select_page(self, after_id: int = 0, limit: int = ...) -> List[Product]: ...
+    def iter_all(self, batch_size: int = ...) -> Iterator[Product]: ...
+    def get_by_id(self, product_id: int) -> Optional[Product]: ...
+    def find_by_brand(self, brand: str) -> List[Product]: ...
+    def find_by_price_range(self, lo: float, hi: float) -> List[Product]: ...
+    def count(self) -> int: ...
+    def exists(self) -> bool: ...
+    def price_stats_by_brand(self) -> List[dict]: ...
+    def insert(self, product: Product) -> Optional[int]: ...
+    def insert_many(self, products: Iterable[Product], chunk_size: int = ...) -> List[int]: ...
+    def update(self, product: Product): ...
+    def update_many(self, products: Iterable[Product], chunk_size: int = ...) -> List[int]: ...
+    def upsert_many(self, products: Iterable[Product], chunk_size: int = ...) -> List[int]: ...
+    def delete(self, product_id: int): ...
+    def delete_many(self, product_ids: Iterable[int], chunk_size: int = ...) -> List[int]: ...
+    def delete_all(self): ...
+    def close(self): ...
+
+
+@runtime_checkable
+class UserDAOProtocol(Protocol):
+    """ Operations every user DAO offers, whatever its storage backend """
+
+    def select_all(self, fast: bool = False, as_tuples: bool = False) -> List[User]: ...
+    def select_page(self, after_id: int = 0, limit: int = ...) -> List[User]: ...
+    def iter_all(self, batch_size: int = ...) -> Iterator[User]: ...
+    def get_by_id(self, user_id: int) -> Optional[User]: ...
+    def find_by_email(self, email: str) -> Optional[User]: ...
+    def count(self) -> int: ...
+    def insert(self, user: User) -> int: ...
+    def insert_many(self, users: Iterable[User], chunk_size: int = ...) -> List[int]: ...
+    def update(self, user: User) -> int: ...
+    def update_many(self, users: Iterable[User], chunk_size: int = ...) -> List[int]: ...
+    def upsert_many(self, users: Iterable[User], chunk_size: int = ...) -> List[int]: ...
+    def delete(self, user_id: int): ...
+    def delete_many(self, user_ids: Iterable[int], chunk_size: int = ...) -> List[int]: ...
+    def delete_all(self): ...
+    def close(self): ...
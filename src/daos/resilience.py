@@ -0,0 +1,252 @@
+"""
+Deadlines, circuit breakers and retries protecting the DAOs from a slow or unreachable database
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+from daos.instrumentation import METRICS
+
+# Deadline (time.monotonic() value) of the operation running in each thread, if any
+_local = threading.local()
+
+
+class DatabaseUnavailableError(Exception):
+    """ Raised instead of waiting on a database that is known to be down or too slow """
+
+
+class CircuitOpenError(DatabaseUnavailableError):
+    """ Raised without calling the database while its circuit breaker is open """
+
+
+class DeadlineExceededError(DatabaseUnavailableError, TimeoutError):
+    """ Raised when an operation runs out of time before it could reach the database """
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Give the operations of the calling thread `seconds` in total to complete. A nested deadline
+    can only shorten the enclosing one; None or 0 adds no limit of its own.
+    """
+    previous = getattr(_local, "deadline", None)
+    if seconds:
+        at = time.monotonic() + seconds
+        _local.deadline = at if previous is None else min(previous, at)
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def time_left(limit=None):
+    """
+    Seconds left before the calling thread's deadline, capped at limit, or limit (possibly None)
+    without a deadline. Raises DeadlineExceededError once the deadline has passed.
+    """
+    at = getattr(_local, "deadline", None)
+    if at is None:
+        return limit
+    left = at - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceededError("Délai de l'opération dépassé")
+    return left if limit is None else min(left, limit)
+
+
+def retry_with_jitter(operation, attempts=2, base_delay=0.05, max_delay=1.0, retry_if=None,
+                      sleep=time.sleep, random=random.random):
+    """
+    Call operation() up to `attempts` times while it raises an error for which retry_if(error)
+    is true (any Exception by default). Attempt n waits a random delay between 0 and
+    base_delay * 2 ** n, capped at max_delay ("full jitter"), so that clients failing together
+    do not retry together; it gives up at once when the delay would outlast the deadline.
+    Only meant for idempotent calls, such as opening a connection.
+    """
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except Exception as e:
+            if attempt == attempts - 1 or (retry_if is not None and not retry_if(e)):
+                raise
+            delay = random() * min(max_delay, base_delay * 2 ** attempt)
+            left = time_left()
+            if left is not None and left <= delay:
+                raise
+            sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a backend that keeps failing. After `failure_threshold` consecutive failures
+    the circuit opens, and operations fail at once with CircuitOpenError instead of waiting
+    for timeouts. Once `reset_timeout` has passed, one trial operation goes through (half-open):
+    its success closes the circuit, its failure opens it again for twice as long, up to
+    `max_reset_timeout`. Each delay is shortened by a random fraction of up to `jitter`, so
+    that the processes sharing a server do not all try it again at the same moment.
+
+    is_failure(error) tells the errors showing that the backend is unavailable (connection
+    lost, timeout...) from those it answered with, such as a duplicate key, which leave the
+    circuit closed. is_timeout(error) picks the errors counted as timeouts.
+    """
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    # Value of the state gauge
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=1.0, max_reset_timeout=30.0, jitter=0.5,
+                 is_failure=None, is_timeout=None, clock=time.monotonic, random=random.random):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.jitter = jitter
+        self._is_failure = is_failure or (lambda error: isinstance(error, (ConnectionError, TimeoutError)))
+        self._is_timeout = is_timeout or (lambda error: isinstance(error, TimeoutError))
+        self._clock = clock
+        self._random = random
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        # Openings since the circuit was last closed, doubling the delay each time
+        self._openings = 0
+        self._retry_at = 0.0
+        self._trial_running = False
+
+        # Counters
+        self.failures = 0
+        self.timeouts = 0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    @contextmanager
+    def guard(self):
+        """
+        Run the block as one operation on the backend: fails fast while the circuit is open.
+        Errors showing that the backend is unavailable come out as DatabaseUnavailableError,
+        the driver's error being its __cause__, so that callers handle every outage one way.
+        """
+        trial = self._allow()
+        try:
+            yield
+        except BaseException as e:
+            if self._record(trial, e):
+                raise DatabaseUnavailableError(f"Base {self.name} indisponible : {e or type(e).__name__}") from e
+            raise
+        self._record(trial, None)
+
+    def _allow(self):
+        """ Let an operation through, telling whether it is the trial of a half-open circuit """
+        with self._lock:
+            if self._state == self.OPEN:
+                wait = self._retry_at - self._clock()
+                if wait > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"Base {self.name} indisponible : nouvel essai dans {wait:.1f} s")
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN:
+                if self._trial_running:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"Base {self.name} indisponible : essai de reconnexion en cours")
+                self._trial_running = True
+                return True
+            return False
+
+    def _record(self, trial, error):
+        """ Update the state after an operation; returns whether its error is a failure of the backend """
+        # Interruptions (KeyboardInterrupt...) and deadlines running out before the backend was
+        # reached say nothing about it
+        unknown = isinstance(error, DatabaseUnavailableError) or not isinstance(error, (Exception, type(None)))
+        failed = error is not None and not unknown and self._is_failure(error)
+        answered = not failed and not unknown
+        with self._lock:
+            if error is not None and self._is_timeout(error):
+                self.timeouts += 1
+            if failed:
+                self.failures += 1
+            if self._state == self.HALF_OPEN:
+                # Operations started before the circuit opened do not decide for the trial
+                if trial:
+                    self._trial_running = False
+                    if failed:
+                        self._open()
+                    elif answered:
+                        self._state = self.CLOSED
+                        self._openings = 0
+                        self._consecutive_failures = 0
+            elif self._state == self.CLOSED:
+                if failed:
+                    self._consecutive_failures += 1
+                    if self._consecutive_failures >= self.failure_threshold:
+                        self._open()
+                elif answered:
+                    self._consecutive_failures = 0
+        return failed
+
+    def _open(self):
+        self._openings += 1
+        delay = min(self.max_reset_timeout, self.reset_timeout * 2 ** (self._openings - 1))
+        self._retry_at = self._clock() + delay * (1 - self.jitter * self._random())
+        self._state = self.OPEN
+        self._consecutive_failures = 0
+        self.opened += 1
+
+    def stats(self):
+        """ Snapshot of the breaker state and counters """
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_in": max(0.0, self._retry_at - self._clock()) if self._state == self.OPEN else 0.0,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+    def register_metrics(self, metrics=METRICS):
+        """ Expose the state (0 closed, 1 half-open, 2 open) and the counters as gauges circuit_<name>_* """
+        prefix = f"circuit_{self.name}_"
+        metrics.gauge(prefix + "state", lambda: self.STATE_VALUES[self.state])
+        for counter in ("failures", "timeouts", "opened", "rejected"):
+            metrics.gauge(prefix + counter, lambda counter=counter: getattr(self, counter))
+
+
+# Breakers shared by every DAO of a backend ("mysql", "mongo") in the process
+_shared_breakers = {}
+_shared_lock = threading.Lock()
+
+
+def shared_breaker(name, is_failure=None, is_timeout=None):
+    """ Return the process-wide breaker of a backend, built from the settings and published as metrics on first use """
+    with _shared_lock:
+        breaker = _shared_breakers.get(name)
+        if breaker is None:
+            settings = get_settings()
+            breaker = _shared_breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=settings.circuit_failure_threshold,
+                reset_timeout=settings.circuit_reset_timeout_ms / 1000,
+                max_reset_timeout=settings.circuit_max_reset_timeout_ms / 1000,
+                jitter=settings.circuit_jitter,
+                is_failure=is_failure,
+                is_timeout=is_timeout,
+            )
+            breaker.register_metrics()
+        return breaker
+
+
+def operation_timeout():
+    """ Per-operation deadline from DB_OPERATION_TIMEOUT_MS, in seconds, or None when disabled """
+    timeout_ms = get_settings().db_operation_timeout_ms
+    return timeout_ms / 1000 if timeout_ms > 0 else None
@@ -0,0 +1,145 @@
+"""
+SQLite connections for the embedded storage backend
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+from daos.connection_pool import ConnectionPool, acquire_pool
+from daos.resilience import operation_timeout
+
+# Same tables and indexes as db-init/init.sql, in the SQLite dialect
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(80) NOT NULL,
+    email VARCHAR(80) NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users (email);
+
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(80) NOT NULL,
+    brand VARCHAR(20) NOT NULL,
+    price DECIMAL(10, 2) NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_brand ON products (brand);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products (price);
+"""
+
+
+class SQLiteCursor:
+    """ sqlite3 cursor with the subset of the mysql.connector cursor API used by the DAOs """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.lastrowid = None
+
+    @staticmethod
+    def _translate(sql):
+        # MySQL's upsert (with a row alias) becomes SQLite's, on the primary key of our tables
+        head, upsert, assignments = sql.partition(" AS new ON DUPLICATE KEY UPDATE ")
+        if upsert:
+            sql = head + " ON CONFLICT(id) DO UPDATE SET " + assignments.replace("new.", "excluded.")
+        # mysql.connector uses the "format" paramstyle, sqlite3 the "qmark" one
+        return sql.replace("%s", "?")
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(self._translate(sql), params)
+        self.lastrowid = self._cursor.lastrowid
+
+    def executemany(self, sql, seq_of_params):
+        # Like MySQL's multi-row INSERT, lastrowid is the ID of the first inserted row
+        sql = self._translate(sql)
+        first_id = None
+        for params in seq_of_params:
+            self._cursor.execute(sql, params)
+            if first_id is None:
+                first_id = self._cursor.lastrowid
+        self.lastrowid = first_id
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteConnection:
+    """ sqlite3 connection with the subset of the mysql.connector connection API used by the DAOs """
+
+    def __init__(self, path, busy_timeout=5.0):
+        # The pool hands a connection to one thread at a time, so it may move between threads
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False)
+        # WAL commits only append to the log: readers never block the writer, and fsync happens at checkpoints
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def cursor(self, prepared=False):
+        # sqlite3 already keeps its own cache of compiled statements per connection
+        return SQLiteCursor(self._conn.cursor())
+
+    def executescript(self, script):
+        self._conn.executescript(script)
+
+    def begin(self):
+        """ Open a transaction explicitly, so that savepoints nest in it instead of committing on release """
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._conn.close()
+
+
+def create_sqlite_pool(path, pool_size=4):
+    """ Connection pool over an SQLite file in WAL mode with the store schema, usable by ProductDAO and UserDAO """
+    if path == ":memory:":
+        # Every connection to :memory: opens a distinct database, so the pool keeps a single one
+        conn = SQLiteConnection(path)
+        conn.executescript(SCHEMA)
+        return ConnectionPool(lambda: conn, pool_size=1, operation_timeout=operation_timeout())
+
+    setup = SQLiteConnection(path)
+    # WAL mode is persistent: it is stored in the database file
+    setup.executescript("PRAGMA journal_mode=WAL;")
+    setup.executescript(SCHEMA)
+    setup.close()
+    # The embedded database cannot become unreachable: deadlines only bound the wait for a connection
+    return ConnectionPool(lambda: SQLiteConnection(path), pool_size=pool_size, operation_timeout=operation_timeout())
+
+
+def acquire_sqlite_pool(path=None):
+    """ Return the process-wide pool of the given SQLite file (SQLITE_PATH by default) """
+    settings = get_settings()
+    path = path or settings.sqlite_path
+    pool_size = settings.sqlite_pool_size
+    key = "sqlite:" + (path if path == ":memory:" else os.path.abspath(path))
+    return acquire_pool(key, lambda: create_sqlite_pool(path, pool_size))
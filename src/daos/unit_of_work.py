@@ -0,0 +1,176 @@
+"""
+Transactions spanning several DAO operations (unit of work)
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import threading
+from contextlib import ExitStack, contextmanager
+
+# Units of work open in each thread, innermost last
+_local = threading.local()
+
+
+class TransactionError(Exception):
+    """ Raised when a transaction or a savepoint is rolled back because one of its operations failed """
+
+
+def _open_units():
+    units = getattr(_local, "units", None)
+    if units is None:
+        units = _local.units = []
+    return units
+
+
+def current_unit_of_work():
+    """ Innermost UnitOfWork open by the calling thread, or None """
+    units = _open_units()
+    return units[-1] if units else None
+
+
+def in_unit_of_work():
+    """ Tell whether the calling thread is inside a UnitOfWork block """
+    return bool(_open_units())
+
+
+class TransactionConnection:
+    """
+    Connection lent to the DAOs inside a transaction. Their own commit() calls are deferred
+    to the end of the transaction; everything else goes to the real connection.
+    """
+
+    def __init__(self, conn):
+        self.base_connection = conn
+
+    def commit(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.base_connection, name)
+
+
+class SQLTransaction:
+    """ One SQL transaction on a connection borrowed for its whole duration (see ConnectionPool.transaction) """
+
+    def __init__(self, conn):
+        self.connection = TransactionConnection(conn)
+        # Set by the pool when an operation raised, even if the DAO then only printed the error
+        self.failed = False
+        self._savepoints = 0
+        # SQLite needs an explicit BEGIN for savepoints to nest in it; MySQL opens a transaction
+        # implicitly, autocommit being off
+        begin = getattr(conn, "begin", None)
+        if begin is not None:
+            begin()
+
+    def _execute(self, sql):
+        with self.connection.base_connection.cursor() as cursor:
+            cursor.execute(sql)
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Nested transaction: if the block raises, or one of its operations failed, the changes
+        made since the savepoint are rolled back and the error propagates, the rest of the
+        transaction being kept.
+        """
+        self._savepoints += 1
+        name = f"sp_{self._savepoints}"
+        failed_before, self.failed = self.failed, False
+        self._execute(f"SAVEPOINT {name}")
+        try:
+            yield self
+            if self.failed:
+                raise TransactionError("Une opération a échoué : retour au point de sauvegarde")
+        except BaseException:
+            self._execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        else:
+            self._execute(f"RELEASE SAVEPOINT {name}")
+        finally:
+            self.failed = failed_before
+
+
+class MongoTransaction:
+    """
+    Client session of a UserDAOMongo transaction. `atomic` tells whether it runs in a
+    multi-document transaction: that needs a replica set or a sharded cluster, and on a
+    standalone server (like the docker-compose one) the writes are applied as they come,
+    the session then only giving causal consistency.
+    """
+
+    def __init__(self, session, atomic):
+        self.session = session
+        self.atomic = atomic
+
+
+class UnitOfWork:
+    """
+    Groups the operations the calling thread makes on the given DAOs into one transaction
+    per store, committed once at the end of the block, or rolled back if the block raises:
+
+        with UnitOfWork(user_dao, product_dao) as uow:
+            user_dao.insert(user)
+            with uow.savepoint():
+                product_dao.insert(product)
+
+    DAOs sharing a connection pool share one transaction. Operations made by other threads,
+    such as the write-behind queues or the async DAOs, are not part of it. Nothing makes the
+    commits of several stores atomic together: they happen one after the other.
+    """
+
+    def __init__(self, *daos):
+        self.stores = []
+        keys = []
+        for dao in daos:
+            # SQL DAOs on the same pool share its transaction
+            key = getattr(dao, "pool", None) or dao
+            if not any(key is other for other in keys):
+                keys.append(key)
+                self.stores.append(dao)
+        self.transactions = []
+        self._stack = None
+        self._after_commit = []
+
+    def __enter__(self):
+        stack = ExitStack()
+        try:
+            self.transactions = [stack.enter_context(dao.transaction()) for dao in self.stores]
+        except BaseException:
+            stack.close()
+            raise
+        self._stack = stack
+        _open_units().append(self)
+        return self
+
+    def __exit__(self, *exc):
+        units = _open_units()
+        units.remove(self)
+        stack, self._stack = self._stack, None
+        callbacks, self._after_commit = self._after_commit, []
+        # Raises if a commit fails, in which case the callbacks are dropped too
+        suppressed = stack.__exit__(*exc)
+        if exc[0] is None or suppressed:
+            if units:
+                # Still inside an enclosing unit of work, which may yet roll back
+                units[-1]._after_commit.extend(callbacks)
+            else:
+                for callback in callbacks:
+                    callback()
+        return suppressed
+
+    def on_commit(self, callback):
+        """ Call callback() once the changes made so far are committed; never if they are rolled back """
+        self._after_commit.append(callback)
+
+    @contextmanager
+    def savepoint(self):
+        """ Nested unit of work: opening a transaction again on each store makes a savepoint """
+        mark = len(self._after_commit)
+        try:
+            with ExitStack() as stack:
+                for dao in self.stores:
+                    stack.enter_context(dao.transaction())
+                yield self
+        except BaseException:
+            del self._after_commit[mark:]
+            raise
@@ -5,66 +5,231 @@ Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
 """
 import os
 import sys
-from dotenv import find_dotenv, load_dotenv
-import mysql.connector
+from functools import lru_cache
 
 # Add the src directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from daos.batching import DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE, case_by_id, chunked, placeholders
+from daos.connection_pool import acquire_pool, insert_rows, multi_row_insert_step, release_pool
+from daos.fast_rows import fetch_all_fast, text
+from daos.instrumentation import instrumented, rows_from_count
+from daos.prepared import STATEMENTS
 from models.user import User
 
+# Fixed statements, run as prepared statements (see daos.prepared): keep them module-level constants
+SELECT_PAGE_SQL = "SELECT id, name, email FROM users WHERE id > %s ORDER BY id LIMIT %s"
+SELECT_RANGE_SQL = "SELECT id, name, email FROM users WHERE id > %s AND id <= %s ORDER BY id LIMIT %s"
+SELECT_BY_ID_SQL = "SELECT id, name, email FROM users WHERE id = %s"
+SELECT_BY_EMAIL_SQL = "SELECT id, name, email FROM users WHERE email = %s ORDER BY id LIMIT 1"
+COUNT_SQL = "SELECT COUNT(*) FROM users"
+INSERT_SQL = "INSERT INTO users (name, email) VALUES (%s, %s)"
+UPDATE_SQL = "UPDATE users SET name = %s, email = %s WHERE id = %s"
+DELETE_SQL = "DELETE FROM users WHERE id = %s"
+SELECT_ALL_SQL = "SELECT id, name, email FROM users"
+RAW_CONVERTERS = (int, text, text)
+
+# Bulk statements depend on the batch size: built once per size, sent over the text protocol
+@lru_cache(maxsize=16)
+def _update_many_sql(count):
+    """ One UPDATE for `count` users: CASE picks each row's new values, IN selects the rows """
+    columns = ", ".join(case_by_id(column, count) for column in ("name", "email"))
+    return f"UPDATE users SET {columns} WHERE id IN {placeholders(count)}"
+
+@lru_cache(maxsize=16)
+def _delete_many_sql(count):
+    return f"DELETE FROM users WHERE id IN {placeholders(count)}"
+
+@lru_cache(maxsize=16)
+def _upsert_many_sql(count):
+    """ Multi-row INSERT that updates the rows whose ID already exists """
+    rows = ", ".join([placeholders(3)] * count)
+    return f"INSERT INTO users (id, name, email) VALUES {rows} AS new ON DUPLICATE KEY UPDATE name = new.name, email = new.email"
+
 class UserDAO:
-    def __init__(self):
+    def __init__(self, pool=None):
+        """ Use the given connection pool, or the process-wide MySQL pool by default """
+        self.pool = pool
+        self._shared_pool = pool is None
+        # Auto-increment step of insert_many, read from the server on first use
+        self._insert_step = None
+        if pool is not None:
+            return
         try:
-            env_file = find_dotenv()
-            load_dotenv(env_file)
-            db_host = os.getenv("MYSQL_HOST")
-            db_name = os.getenv("MYSQL_DB_NAME")
-            db_user = os.getenv("DB_USERNAME")
-            db_pass = os.getenv("DB_PASSWORD")    
-            self.conn = mysql.connector.connect(host=db_host, user=db_user, password=db_pass, database=db_name) 
-            self.cursor = self.conn.cursor()
+            # Connections are borrowed from the shared pool for each operation
+            self.pool = acquire_pool()
         except FileNotFoundError as e:
             print("Attention : Veuillez créer un fichier .env")
         except Exception as e:
             print("Erreur : " + str(e))
 
-    def select_all(self):
-        """ Select all users from MySQL """
-        self.cursor.execute("SELECT id, name, email FROM users")
-        rows = self.cursor.fetchall()
+    @instrumented("users.select_all")
+    def select_all(self, fast=False, as_tuples=False):
+        """
+        Select all users from MySQL. With fast, rows are mapped by the fast read path
+        (see daos.fast_rows); with as_tuples, they are returned as (id, name, email) tuples
+        instead of User objects, which implies fast.
+        """
+        if fast or as_tuples:
+            with self.pool.connection() as conn:
+                return fetch_all_fast(conn, SELECT_ALL_SQL, RAW_CONVERTERS, None if as_tuples else User)
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(SELECT_ALL_SQL)
+            rows = cursor.fetchall()
+        return [User(*row) for row in rows]
+
+    @instrumented("users.select_page")
+    def select_page(self, after_id=0, limit=DEFAULT_PAGE_SIZE):
+        """ Select up to `limit` users whose ID is greater than `after_id` (keyset pagination) """
+        with self.pool.connection() as conn, STATEMENTS.cursor(conn, SELECT_PAGE_SQL) as cursor:
+            cursor.execute(SELECT_PAGE_SQL, (after_id or 0, limit))
+            rows = cursor.fetchall()
+        return [User(*row) for row in rows]
+
+    @instrumented("users.select_range")
+    def select_range(self, after_id, until_id, limit=DEFAULT_PAGE_SIZE):
+        """ Keyset page limited to after_id < id <= until_id, so that several readers can share the table """
+        with self.pool.connection() as conn, STATEMENTS.cursor(conn, SELECT_RANGE_SQL) as cursor:
+            cursor.execute(SELECT_RANGE_SQL, (after_id, until_id, limit))
+            rows = cursor.fetchall()
         return [User(*row) for row in rows]
 
+    @instrumented("users.id_bounds")
+    def id_bounds(self):
+        """ Smallest and largest user ID, or (0, 0) if the table is empty """
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT MIN(id), MAX(id) FROM users")
+            lo, hi = cursor.fetchone()
+        return (lo or 0, hi or 0)
+
+    def iter_all(self, batch_size=DEFAULT_PAGE_SIZE):
+        """ Iterate over all users one page at a time, so memory use does not grow with the table """
+        after_id = 0
+        while True:
+            users = self.select_page(after_id, batch_size)
+            yield from users
+            if len(users) < batch_size:
+                return
+            after_id = users[-1].id
+
+    @instrumented("users.get_by_id")
+    def get_by_id(self, user_id):
+        """ Select the user with given ID, or None """
+        with self.pool.connection() as conn, STATEMENTS.cursor(conn, SELECT_BY_ID_SQL) as cursor:
+            cursor.execute(SELECT_BY_ID_SQL, (user_id,))
+            rows = cursor.fetchall()
+        return User(*rows[0]) if rows else None
+
+    @instrumented("users.find_by_email")
+    def find_by_email(self, email):
+        """ Select the first user with given email, or None (uses idx_users_email) """
+        with self.pool.connection() as conn, STATEMENTS.cursor(conn, SELECT_BY_EMAIL_SQL) as cursor:
+            cursor.execute(SELECT_BY_EMAIL_SQL, (email,))
+            rows = cursor.fetchall()
+        return User(*rows[0]) if rows else None
+
+    @instrumented("users.count")
+    def count(self):
+        """ Count users in MySQL """
+        with self.pool.connection() as conn, STATEMENTS.cursor(conn, COUNT_SQL) as cursor:
+            cursor.execute(COUNT_SQL)
+            return cursor.fetchall()[0][0]
+
+    @instrumented("users.insert")
     def insert(self, user):
         """ Insert given user into MySQL """
-        self.cursor.execute(
-            "INSERT INTO users (name, email) VALUES (%s, %s)",
-            (user.name, user.email)
-        )
-        self.conn.commit()
-        return self.cursor.lastrowid
+        with self.pool.connection() as conn, STATEMENTS.cursor(conn, INSERT_SQL) as cursor:
+            cursor.execute(INSERT_SQL, (user.name, user.email))
+            conn.commit()
+            return cursor.lastrowid
+
+    def _multi_row_insert_step(self, conn):
+        """ Step between the IDs insert_many assigns: queried from the server once per DAO """
+        if self._insert_step is None:
+            self._insert_step = multi_row_insert_step(conn)
+        return self._insert_step
+
+    @instrumented("users.insert_many")
+    def insert_many(self, users, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ Insert given users into MySQL in batches, with one commit per batch. Returns the assigned IDs """
+        ids = []
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            step = self._multi_row_insert_step(conn)
+            for chunk in chunked(users, chunk_size):
+                chunk_ids = insert_rows(cursor, INSERT_SQL, [(user.name, user.email) for user in chunk], step)
+                conn.commit()
+                ids.extend(chunk_ids)
+        return ids
 
+    @instrumented("users.update_many", rows=sum)
+    def update_many(self, users, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ Update given users by ID, with one UPDATE and one commit per batch. Returns the number of changed rows per batch """
+        counts = []
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            for chunk in chunked(users, chunk_size):
+                params = []
+                for column in ("name", "email"):
+                    for user in chunk:
+                        params += (user.id, getattr(user, column))
+                params.extend(user.id for user in chunk)
+                cursor.execute(_update_many_sql(len(chunk)), params)
+                conn.commit()
+                counts.append(cursor.rowcount)
+        return counts
+
+    @instrumented("users.delete_many", rows=sum)
+    def delete_many(self, user_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ Delete the users with given IDs, with one DELETE ... IN and one commit per batch. Returns the deleted count per batch """
+        counts = []
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            for chunk in chunked(user_ids, chunk_size):
+                cursor.execute(_delete_many_sql(len(chunk)), chunk)
+                conn.commit()
+                counts.append(cursor.rowcount)
+        return counts
+
+    @instrumented("users.upsert_many", rows=sum)
+    def upsert_many(self, users, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Create or replace given users by their ID, with one multi-row INSERT ... ON DUPLICATE
+        KEY UPDATE and one commit per batch. Returns the affected count per batch, as the server
+        counts it: MySQL counts 1 per inserted row and 2 per changed row.
+        """
+        counts = []
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            for chunk in chunked(users, chunk_size):
+                cursor.execute(_upsert_many_sql(len(chunk)), [value for u in chunk for value in (u.id, u.name, u.email)])
+                conn.commit()
+                counts.append(cursor.rowcount)
+        return counts
+
+    @instrumented("users.update", rows=rows_from_count)
     def update(self, user):
-        """ Update given user in MySQL """
-        with self.conn.cursor() as cursor:
-            cursor.execute(
-                "UPDATE users SET name = %s, email = %s WHERE id = %s",
-                (user.name, user.email, user.id)
-            )
-            self.conn.commit()
-            
+        """ Update given user in MySQL. Returns the number of updated rows """
+        with self.pool.connection() as conn, STATEMENTS.cursor(conn, UPDATE_SQL) as cursor:
+            cursor.execute(UPDATE_SQL, (user.name, user.email, user.id))
+            conn.commit()
+            return cursor.rowcount
 
+    @instrumented("users.delete")
     def delete(self, user_id):
         """ Delete user from MySQL with given user ID """
-        with self.conn.cursor() as cursor:
-            cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
-            self.conn.commit()
+        with self.pool.connection() as conn, STATEMENTS.cursor(conn, DELETE_SQL) as cursor:
+            cursor.execute(DELETE_SQL, (user_id,))
+            conn.commit()
 
+    @instrumented("users.delete_all")
     def delete_all(self): #optional
         """ Empty users table in MySQL """
-        with self.conn.cursor() as cursor:
+        with self.pool.connection() as conn, conn.cursor() as cursor:
             cursor.execute("DELETE FROM users")
-            self.conn.commit()
+            conn.commit()
         
+    def transaction(self):
+        """ Transaction of the calling thread on this DAO's pool, shared with the other DAOs of the pool """
+        return self.pool.transaction()
+
     def close(self):
-        self.cursor.close()
-        self.conn.close()
+        """ Give this DAO's reference to the shared pool back """
+        if self.pool and self._shared_pool:
+            release_pool(self.pool)
+        self.pool = None
@@ -0,0 +1,366 @@
+"""
+User repository split between a MySQL write model and a MongoDB read model (CQRS)
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from pymongo import DeleteMany, DeleteOne, ReplaceOne, UpdateOne
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+from daos.batching import DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE
+from daos.instrumentation import METRICS, instrumented
+from daos.user_dao import UserDAO
+from daos.user_dao_mongo import UserDAOMongo
+from models.user import User
+
+_STOP = object()
+_DELETE_ALL = object()
+
+
+class UserPropagator:
+    """
+    Copies the changes made on the write model to the Mongo read model from one background
+    thread. Changes are numbered in the order they were committed; each batch is coalesced
+    (last change per user wins) and applied with a single ordered bulk_write.
+
+    A batch that fails is retried after `retry_delay` seconds, so the read model lags behind
+    instead of losing changes. lag_seconds() is the age of the oldest change not yet applied.
+    Changes are numbered when published, after their commit: two threads updating the same
+    user at the same instant may publish in the opposite order of their commits.
+    """
+
+    def __init__(self, collection, batch_size=500, max_delay=0.05, max_pending=100000, retry_delay=1.0,
+                 gauge_prefix="users_read_model"):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._state = threading.Condition()
+        # Keeps queue order equal to sequence order
+        self._publish_lock = threading.Lock()
+        self._in_flight = deque()   # (seq, committed_at) of changes not applied yet, oldest first
+        self._next_seq = 0
+        self.applied_seq = 0
+        self._closed = False
+
+        # Counters
+        self.batches = 0
+        self.changes = 0
+        self.failures = 0
+
+        self._gauge_prefix = gauge_prefix
+        METRICS.gauge(gauge_prefix + "_lag_seconds", self.lag_seconds)
+        METRICS.gauge(gauge_prefix + "_pending", self.pending)
+
+        self._worker = threading.Thread(target=self._run, name="user-propagator", daemon=True)
+        self._worker.start()
+
+    def upsert(self, users):
+        """ Record that these users were created or updated; returns the sequence number of the change """
+        return self._publish([("upsert", user.id, user) for user in users])
+
+    def update(self, users):
+        """ Record that these existing users were updated: the read model never creates them """
+        return self._publish([("update", user.id, user) for user in users])
+
+    def delete(self, user_id):
+        return self._publish([("delete", user_id, None)])
+
+    def delete_many(self, user_ids):
+        return self._publish([("delete", user_id, None) for user_id in user_ids])
+
+    def delete_all(self):
+        return self._publish([("delete", _DELETE_ALL, None)])
+
+    def _publish(self, changes):
+        if self._closed:
+            raise RuntimeError("Le propagateur est arrêté")
+        with self._publish_lock:
+            with self._state:
+                self._next_seq += 1
+                seq = self._next_seq
+                self._in_flight.append((seq, time.monotonic()))
+            self._queue.put((seq, changes))
+        return seq
+
+    def wait_for(self, seq, timeout=None):
+        """ Block until the change numbered seq is visible in the read model; returns False on timeout """
+        with self._state:
+            return self._state.wait_for(lambda: self.applied_seq >= seq, timeout)
+
+    def lag_seconds(self):
+        with self._state:
+            return time.monotonic() - self._in_flight[0][1] if self._in_flight else 0.0
+
+    def pending(self):
+        """ Number of changes committed on the write model but not yet visible in the read model """
+        with self._state:
+            return len(self._in_flight)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.max_delay
+            while True:
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._apply_with_retry(batch)
+
+    def _apply_with_retry(self, batch):
+        operations = self._coalesce(batch)
+        while True:
+            try:
+                self._apply(operations)
+                break
+            except Exception as e:
+                self.failures += 1
+                print(f"Erreur lors de la propagation vers MongoDB : {e}")
+                if self._closed:
+                    # Do not block shutdown forever: rebuild_read_model() catches the read model up later
+                    return
+                time.sleep(self.retry_delay)
+
+        last_seq = batch[-1][0]
+        with self._state:
+            while self._in_flight and self._in_flight[0][0] <= last_seq:
+                self._in_flight.popleft()
+            self.applied_seq = last_seq
+            self._state.notify_all()
+        self.batches += 1
+        self.changes += sum(len(changes) for _, changes in batch)
+
+    @staticmethod
+    def _coalesce(batch):
+        """ One operation per user (the last change wins), after a DeleteMany if the table was emptied """
+        delete_all = False
+        latest = OrderedDict()
+        for _, changes in batch:
+            for kind, user_id, user in changes:
+                if user_id is _DELETE_ALL:
+                    delete_all = True
+                    latest.clear()
+                    continue
+                previous = latest.pop(user_id, None)
+                # Updating a user created in the same batch still has to create it
+                if kind == "update" and previous is not None and previous[0] == "upsert":
+                    kind = "upsert"
+                latest[user_id] = (kind, user)
+
+        operations = [DeleteMany({})] if delete_all else []
+        for user_id, (kind, user) in latest.items():
+            if kind == "delete":
+                operations.append(DeleteOne({"_id": int(user_id)}))
+            elif kind == "update":
+                operations.append(UpdateOne({"_id": int(user.id)}, {"$set": {"name": user.name, "email": user.email}}))
+            else:
+                operations.append(ReplaceOne({"_id": int(user.id)}, {"name": user.name, "email": user.email}, upsert=True))
+        return operations
+
+    @instrumented("users_read_model.apply")
+    def _apply(self, operations):
+        if operations:
+            self.collection.bulk_write(operations, ordered=True)
+        return operations
+
+    def flush(self, timeout=None):
+        """ Wait until every change published so far is applied """
+        with self._state:
+            seq = self._next_seq
+        return self.wait_for(seq, timeout)
+
+    def close(self, timeout=None):
+        """ Apply the queued changes, then stop the worker """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+        METRICS.remove_gauge(self._gauge_prefix + "_lag_seconds")
+        METRICS.remove_gauge(self._gauge_prefix + "_pending")
+
+
+class UserDAOCQRS:
+    """
+    User DAO whose writes go to MySQL (the source of truth) and whose reads are served by
+    the Mongo read model, kept up to date by a UserPropagator. Both use the same user ids.
+
+    Reads are eventually consistent. With read_your_writes, a thread that wrote waits (up to
+    `consistency_timeout` seconds) until its own last change reached the read model before
+    reading, and reads from MySQL if it did not make it in time.
+    """
+
+    def __init__(self, writer=None, reader=None, read_your_writes=None, consistency_timeout=None, propagator=None):
+        settings = get_settings()
+        self.writer = writer if writer is not None else UserDAO()
+        self.reader = reader if reader is not None else UserDAOMongo()
+        self.read_your_writes = settings.user_read_your_writes if read_your_writes is None else read_your_writes
+        self.consistency_timeout = (settings.user_read_model_timeout_ms / 1000
+                                    if consistency_timeout is None else consistency_timeout)
+        self.propagator = propagator if propagator is not None else UserPropagator(
+            self.reader.users,
+            batch_size=settings.user_propagation_batch_size,
+            max_delay=settings.user_propagation_max_delay_ms / 1000,
+        )
+        self._local = threading.local()
+
+        # Counters
+        self.consistent_reads = 0
+        self.fallback_reads = 0
+
+    def _read_model(self):
+        """ DAO to read from: the read model, unless this thread's last write is not visible in time """
+        if self.read_your_writes:
+            seq = getattr(self._local, "last_seq", 0)
+            if seq > self.propagator.applied_seq:
+                if not self.propagator.wait_for(seq, self.consistency_timeout):
+                    self.fallback_reads += 1
+                    return self.writer
+                self.consistent_reads += 1
+        return self.reader
+
+    def _propagate(self, kind, *args):
+        """ Publish a change to the read model, or keep it until the current transaction commits """
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.append((kind, args))
+        else:
+            self._local.last_seq = getattr(self.propagator, kind)(*args)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Transaction of the calling thread on the write model. Its changes reach the read model
+        only once committed, and not at all if it rolls back. A nested call makes a savepoint.
+        """
+        pending = getattr(self._local, "pending", None)
+        outer = pending is None
+        if outer:
+            pending = self._local.pending = []
+        mark = len(pending)
+        try:
+            with self.writer.transaction() as transaction:
+                yield transaction
+        except BaseException:
+            # Changes rolled back with the (outer transaction or) savepoint
+            del pending[mark:]
+            raise
+        finally:
+            if outer:
+                self._local.pending = None
+        if outer:
+            for kind, args in pending:
+                self._propagate(kind, *args)
+
+    # Queries: read model
+
+    def select_all(self, fast=False, as_tuples=False):
+        return self._read_model().select_all(fast, as_tuples)
+
+    def select_page(self, after_id=0, limit=DEFAULT_PAGE_SIZE):
+        return self._read_model().select_page(after_id, limit)
+
+    def iter_all(self, batch_size=DEFAULT_PAGE_SIZE):
+        return self._read_model().iter_all(batch_size)
+
+    def get_by_id(self, user_id):
+        return self._read_model().get_by_id(user_id)
+
+    def find_by_email(self, email):
+        return self._read_model().find_by_email(email)
+
+    def count(self):
+        return self._read_model().count()
+
+    # Commands: write model, then propagation
+
+    def insert(self, user):
+        new_id = self.writer.insert(user)
+        self._propagate("upsert", [User(new_id, user.name, user.email)])
+        return new_id
+
+    def insert_many(self, users, chunk_size=DEFAULT_CHUNK_SIZE):
+        users = list(users)
+        ids = self.writer.insert_many(users, chunk_size)
+        if ids:
+            self._propagate("upsert", [User(new_id, u.name, u.email) for new_id, u in zip(ids, users)])
+        return ids
+
+    def update(self, user):
+        result = self.writer.update(user)
+        # No row matched: there is nothing to copy, and nothing must appear in the read model
+        if result:
+            self._propagate("update", [user])
+        return result
+
+    def update_many(self, users, chunk_size=DEFAULT_CHUNK_SIZE):
+        users = list(users)
+        counts = self.writer.update_many(users, chunk_size)
+        # Ids MySQL did not match are no-ops in the read model too: updates there never insert
+        if any(counts):
+            self._propagate("update", users)
+        return counts
+
+    def upsert_many(self, users, chunk_size=DEFAULT_CHUNK_SIZE):
+        users = list(users)
+        counts = self.writer.upsert_many(users, chunk_size)
+        self._propagate("upsert", users)
+        return counts
+
+    def delete_many(self, user_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+        user_ids = list(user_ids)
+        counts = self.writer.delete_many(user_ids, chunk_size)
+        self._propagate("delete_many", user_ids)
+        return counts
+
+    def delete(self, user_id):
+        result = self.writer.delete(user_id)
+        self._propagate("delete", user_id)
+        return result
+
+    def delete_all(self):
+        result = self.writer.delete_all()
+        self._propagate("delete_all")
+        return result
+
+    def rebuild_read_model(self, batch_size=DEFAULT_CHUNK_SIZE):
+        """ Copy every user of the write model to an emptied read model, e.g. when setting it up """
+        self.propagator.delete_all()
+        batch = []
+        for user in self.writer.iter_all(batch_size):
+            batch.append(user)
+            if len(batch) >= batch_size:
+                self.propagator.upsert(batch)
+                batch = []
+        if batch:
+            self.propagator.upsert(batch)
+        self.propagator.flush()
+
+    def lag(self):
+        """ Age in seconds of the oldest change not yet visible in the read model, and number of such changes """
+        return self.propagator.lag_seconds(), self.propagator.pending()
+
+    def close(self):
+        """ Propagate what is pending, then close both models """
+        self.propagator.close()
+        self.writer.close()
+        self.reader.close()
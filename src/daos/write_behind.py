@@ -0,0 +1,186 @@
+"""
+Write-behind queue: group commit of inserts on a background thread
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+
+_STOP = object()
+
+
+class WriteBehindFullError(Exception):
+    """ Raised by submit() when the queue stays full for longer than the put timeout """
+
+
+class WriteBehindQueue:
+    """
+    Queues inserts and writes them with dao.insert_many() from one background thread,
+    so that many creates share one transaction (and one commit) instead of paying one each.
+    A batch is written when it reaches `batch_size` items or when its first item has
+    waited `max_delay` seconds, whichever comes first.
+
+    submit() returns a Future that resolves to the assigned id once the batch is committed.
+    At most `max_pending` items wait in the queue: beyond that, submit() blocks (back-pressure)
+    and raises WriteBehindFullError after `put_timeout` seconds.
+    """
+
+    def __init__(self, dao, batch_size=500, max_delay=0.05, max_pending=10000, put_timeout=None, on_flush=None):
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.dao = dao
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.put_timeout = put_timeout
+        self.on_flush = on_flush
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+        # Counters
+        self.batches = 0
+        self.rows = 0
+        self.failed_rows = 0
+
+        self._worker = threading.Thread(target=self._run, name=f"{type(dao).__name__}-write-behind", daemon=True)
+        self._worker.start()
+
+    def submit(self, item, timeout=None):
+        """ Queue one item for insertion; returns a Future of its id """
+        future = Future()
+        # Checked and queued under the lock taken by close(), so that no item lands behind the stop marker
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("La file d'écriture est fermée")
+            try:
+                self._queue.put((item, future), timeout=timeout if timeout is not None else self.put_timeout)
+            except queue.Full:
+                raise WriteBehindFullError(f"File d'écriture pleine ({self._queue.maxsize} éléments en attente)")
+        return future
+
+    def pending(self):
+        """ Approximate number of items waiting to be written """
+        return self._queue.qsize()
+
+    def flush(self, timeout=None):
+        """ Block until every item submitted before this call is written; returns False on timeout """
+        done = threading.Event()
+        with self._close_lock:
+            if self._closed:
+                return not self._worker.is_alive()
+            self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        """ Write everything still queued, then stop the worker; later submits raise RuntimeError """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+
+    def _run(self):
+        try:
+            self._consume()
+        finally:
+            # Free the room a blocked submit() is waiting for, then refuse new items
+            self._fail_leftovers()
+            with self._close_lock:
+                self._closed = True
+            self._fail_leftovers()
+
+    def _fail_leftovers(self):
+        """ Fail the futures still queued once the worker has stopped, and release flush() callers """
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(entry, threading.Event):
+                entry.set()
+            elif entry is not _STOP:
+                _, future = entry
+                if future.set_running_or_notify_cancel():
+                    self.failed_rows += 1
+                    future.set_exception(RuntimeError("La file d'écriture est fermée"))
+
+    def _consume(self):
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.max_delay
+            while True:
+                if entry is _STOP:
+                    stopping = True
+                    break
+                if isinstance(entry, threading.Event):
+                    # flush() marker: write what we have right away
+                    waiters.append(entry)
+                    break
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+
+    def _write(self, batch):
+        # Callers may have cancelled their future while it was queued
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        items = [item for item, _ in batch]
+        try:
+            ids = list(self.dao.insert_many(items, len(items)))
+        except Exception as e:
+            self.failed_rows += len(batch)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(ids)
+        for (_, future), new_id in zip(batch, ids):
+            future.set_result(new_id)
+        # DAOs that report their own errors return the ids of what was committed
+        for _, future in batch[len(ids):]:
+            self.failed_rows += 1
+            future.set_exception(RuntimeError("Insertion différée échouée"))
+        if ids and self.on_flush is not None:
+            self.on_flush(ids)
+
+    def stats(self):
+        return {
+            "pending": self.pending(),
+            "batches": self.batches,
+            "rows": self.rows,
+            "failed_rows": self.failed_rows,
+            "rows_per_batch": self.rows / self.batches if self.batches else 0.0,
+        }
+
+
+def write_behind_queue(dao, on_flush=None):
+    """ Build a write-behind queue for dao from the WRITE_BEHIND_* settings """
+    settings = get_settings()
+    return WriteBehindQueue(
+        dao,
+        batch_size=settings.write_behind_batch_size,
+        max_delay=settings.write_behind_max_delay_ms / 1000,
+        max_pending=settings.write_behind_queue_size,
+        on_flush=on_flush,
+    )
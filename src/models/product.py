@@ -5,6 +5,9 @@ Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
 """
 
 class Product:
+    # No per-instance __dict__: large product lists only pay for these four references
+    __slots__ = ("id", "name", "brand", "price")
+
     def __init__(self, id=None, name=None, brand=None, price=None):
         self.id = id
         self.name = name
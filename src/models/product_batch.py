@@ -0,0 +1,112 @@
+"""
+Columnar batch of products
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import os
+import sys
+from array import array
+from decimal import Decimal, ROUND_HALF_UP
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.product import Product
+
+
+def to_cents(price):
+    """ Convert a price (Decimal, float, str or int in currency units) to integer cents """
+    if isinstance(price, Decimal):
+        return int(price.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+    if isinstance(price, (int, float)):
+        # round() absorbs the binary representation error of two-decimal prices
+        return round(price * 100)
+    return int(Decimal(str(price)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+
+
+class ProductBatch:
+    """
+    Products stored column by column in contiguous arrays instead of one object per row:
+    - ids and prices (fixed-point integer cents) are 8-byte machine integers
+    - names are one UTF-8 buffer indexed by an array of offsets
+    - brands are dictionary-encoded, since a catalog only has a few distinct brands
+    Rows are materialized as Product objects only when they are read.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.price_cents = array("q")
+        self._name_data = bytearray()
+        self._name_offsets = array("Q", [0])
+        self._brand_codes = array("I")
+        self._brand_values = []
+        self._brand_index = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """ Build a batch from (id, name, brand, price) tuples """
+        batch = cls()
+        batch.extend(rows)
+        return batch
+
+    @classmethod
+    def from_products(cls, products):
+        batch = cls()
+        batch.extend((p.id, p.name, p.brand, p.price) for p in products)
+        return batch
+
+    def append(self, product_id, name, brand, price):
+        self.ids.append(product_id)
+        self.price_cents.append(to_cents(price))
+        self._name_data += name.encode("utf-8")
+        self._name_offsets.append(len(self._name_data))
+        code = self._brand_index.get(brand)
+        if code is None:
+            code = len(self._brand_values)
+            self._brand_index[brand] = code
+            self._brand_values.append(brand)
+        self._brand_codes.append(code)
+
+    def extend(self, rows):
+        for product_id, name, brand, price in rows:
+            self.append(product_id, name, brand, price)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def name(self, i):
+        return self._name_data[self._name_offsets[i]:self._name_offsets[i + 1]].decode("utf-8")
+
+    def brand(self, i):
+        return self._brand_values[self._brand_codes[i]]
+
+    def price(self, i):
+        return self.price_cents[i] / 100
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("ProductBatch index out of range")
+        return Product(id=self.ids[i], name=self.name(i), brand=self.brand(i), price=self.price(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def brands(self):
+        """ Distinct brands, in order of first appearance """
+        return list(self._brand_values)
+
+    def total_cents(self):
+        return sum(self.price_cents)
+
+    def nbytes(self):
+        """ Approximate size of the column buffers, in bytes """
+        return (
+            self.ids.itemsize * len(self.ids)
+            + self.price_cents.itemsize * len(self.price_cents)
+            + len(self._name_data)
+            + self._name_offsets.itemsize * len(self._name_offsets)
+            + self._brand_codes.itemsize * len(self._brand_codes)
+            + sum(len(brand.encode("utf-8")) for brand in self._brand_values)
+        )
@@ -5,6 +5,8 @@ Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
 """
 
 class User:
+    __slots__ = ("id", "name", "email")
+
     def __init__(self, user_id, name, email):
         self.id = user_id
         self.name = name
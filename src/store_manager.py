@@ -10,8 +10,20 @@ from views.view import View
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from views.user_view import UserView
+from views import cli
+from config import get_settings
+from daos.instrumentation import METRICS
 
 if __name__ == '__main__':
+    # Subcommands (import, export...) run without the interactive menu
+    if len(sys.argv) > 1:
+        sys.exit(cli.main(sys.argv[1:]))
+
     print("===== LE MAGASIN DU COIN =====")
     main_menu = View()
     main_menu.show_options()
+
+    # Optional metrics dump at exit (.prom for Prometheus text format, JSON otherwise)
+    metrics_file = get_settings().dao_metrics_file
+    if METRICS.enabled and metrics_file:
+        METRICS.write(metrics_file)
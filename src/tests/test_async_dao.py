@@ -0,0 +1,60 @@
+from ..daos.async_dao import AsyncDAO
+import asyncio
+import threading
+import time
+import pytest
+
+class SlowDAO:
+    """ Blocking stand-in that records how many calls overlap """
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def select_all(self):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return ['row']
+
+def test_async_dao_overlaps_calls():
+    dao = SlowDAO()
+    async_dao = AsyncDAO(dao, max_workers=4)
+
+    async def main():
+        return await asyncio.gather(*(async_dao.select_all() for _ in range(8)))
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    async_dao.close()
+
+    assert results == [['row']] * 8
+    assert dao.max_running == 4
+    assert elapsed < 8 * dao.delay
+
+def test_async_dao_limits_concurrency():
+    dao = SlowDAO(delay=0.01)
+    async_dao = AsyncDAO(dao, max_workers=4, max_concurrency=2)
+
+    async def main():
+        await asyncio.gather(*(async_dao.select_all() for _ in range(6)))
+
+    asyncio.run(main())
+    async_dao.close()
+    assert dao.max_running <= 2
+
+def test_async_dao_timeout():
+    dao = SlowDAO(delay=0.2)
+    async_dao = AsyncDAO(dao, max_workers=1)
+
+    async def main():
+        await async_dao.select_all(timeout=0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+    async_dao.close()
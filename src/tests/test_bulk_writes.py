@@ -0,0 +1,156 @@
+from ..controllers.product_controller import ProductController
+from ..daos.connection_pool import AUTO_INCREMENT_STEP_SQL, ConnectionPool
+from ..daos.product_dao import ProductDAO, _update_many_sql, _upsert_many_sql
+from ..daos.product_dao_sqlite import ProductDAOSQLite
+from ..daos.user_dao import UserDAO
+from ..daos.user_dao_sqlite import UserDAOSQLite
+from ..models.product import Product
+from ..models.user import User
+import pytest
+
+@pytest.fixture
+def product_dao(tmp_path):
+    dao = ProductDAOSQLite(str(tmp_path / 'store.sqlite3'))
+    dao.insert_many([Product(None, f'Produit {i}', 'Acme', 10.0 + i) for i in range(10)])
+    yield dao
+    dao.close()
+
+def test_bulk_statements_are_built_per_batch_size():
+    assert _update_many_sql(2) == (
+        "UPDATE products SET name = CASE id WHEN %s THEN %s WHEN %s THEN %s END, "
+        "brand = CASE id WHEN %s THEN %s WHEN %s THEN %s END, "
+        "price = CASE id WHEN %s THEN %s WHEN %s THEN %s END WHERE id IN (%s, %s)"
+    )
+    assert _upsert_many_sql(2).endswith(
+        "VALUES (%s, %s, %s, %s), (%s, %s, %s, %s) AS new "
+        "ON DUPLICATE KEY UPDATE name = new.name, brand = new.brand, price = new.price"
+    )
+    assert _update_many_sql(2) is _update_many_sql(2)
+
+def test_product_update_many_in_batches(product_dao):
+    products = product_dao.select_all()
+    for product in products:
+        product.price = round(product.price * 0.9, 2)
+
+    counts = product_dao.update_many(products[:7], chunk_size=3)
+
+    assert counts == [3, 3, 1]
+    assert product_dao.get_by_id(1).price == 9.0
+    assert product_dao.get_by_id(7).price == 14.4
+    assert product_dao.get_by_id(8).price == 17.0
+
+def test_product_delete_many_and_upsert_many(product_dao):
+    assert product_dao.delete_many([1, 2, 3, 42], chunk_size=2) == [2, 1]
+    assert product_dao.count() == 7
+
+    counts = product_dao.upsert_many([Product(4, 'Pixel 8', 'Google', 699.99), Product(20, 'iPhone 15', 'Apple', 999.99)])
+
+    assert sum(counts) == 2
+    assert product_dao.get_by_id(4).name == 'Pixel 8'
+    assert product_dao.get_by_id(20).brand == 'Apple'
+    # The next generated ID follows the upserted ones
+    assert product_dao.insert(Product(None, 'Galaxy S24', 'Samsung', 899.99)) == 21
+
+def test_user_bulk_writes(tmp_path):
+    dao = UserDAOSQLite(str(tmp_path / 'store.sqlite3'))
+    ids = dao.insert_many([User(None, f'Client {i}', f'client{i}@example.com') for i in range(5)])
+
+    assert dao.update_many([User(ids[0], 'Ada Lovelace', 'ada@example.com'), User(ids[1], 'Alan Turing', 'alan@example.com')]) == [2]
+    assert dao.delete_many(ids[3:]) == [2]
+    assert sum(dao.upsert_many([User(ids[2], 'Grace Hopper', 'grace@example.com'), User(100, 'Edsger Dijkstra', 'ewd@example.com')])) == 2
+    assert [u.name for u in dao.select_all()] == ['Ada Lovelace', 'Alan Turing', 'Grace Hopper', 'Edsger Dijkstra']
+    dao.close()
+
+def test_mongo_bulk_writes():
+    pytest.importorskip("mongomock")
+    from ..benchmarks.standins import create_mongo_client
+    from ..daos.user_dao_mongo import UserDAOMongo
+
+    dao = UserDAOMongo(client=create_mongo_client())
+    ids = dao.insert_many([User(None, f'Client {i}', f'client{i}@example.com') for i in range(5)])
+
+    assert dao.update_many([User(user_id, f'Modifié {user_id}', 'x@example.com') for user_id in ids], chunk_size=2) == [2, 2, 1]
+    assert dao.delete_many(ids[:3] + [999], chunk_size=3) == [3, 0]
+    assert [u.name for u in dao.select_all()] == [f'Modifié {ids[3]}', f'Modifié {ids[4]}']
+
+def test_controller_reprices_catalog(tmp_path):
+    controller = ProductController(dao=ProductDAOSQLite(str(tmp_path / 'store.sqlite3')))
+    for i in range(4):
+        controller.create_product(Product(None, f'Produit {i}', 'Acme', 100.0))
+    assert len(controller.search_products(lo=100, hi=100)) == 4
+
+    products = controller.list_products()
+    for product in products:
+        product.price = 80.0
+    assert controller.update_products(products) == [4]
+    controller.delete_products([products[0].id])
+
+    assert [p.id for p in controller.search_products(lo=80, hi=80)] == [p.id for p in products[1:]]
+    assert [p.price for p in controller.list_products()] == [80.0, 80.0, 80.0]
+    controller.shutdown()
+
+class AutoIncrementServer:
+    """ MySQL stand-in giving the rows of each multi-row INSERT IDs `increment` apart """
+    def __init__(self, increment=1):
+        self.increment = increment
+        self.next_id = 1
+        self.rows = {}
+        self.statements = []
+
+    def cursor(self):
+        return AutoIncrementCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+class AutoIncrementCursor:
+    def __init__(self, server):
+        self.server = server
+        self.lastrowid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        self.server.statements.append(sql)
+        self.result = [(self.server.increment,)]
+
+    def executemany(self, sql, rows):
+        self.server.statements.append(sql)
+        ids = range(self.server.next_id, self.server.next_id + self.server.increment * len(rows), self.server.increment)
+        # Another client's insert comes next
+        self.server.next_id = ids[-1] + 2 * self.server.increment
+        self.server.rows.update(zip(ids, rows))
+        self.lastrowid = ids[0]
+
+    def fetchall(self):
+        return self.result
+
+@pytest.mark.parametrize('increment', [1, 2])
+def test_mysql_insert_many_returns_the_assigned_ids(increment):
+    server = AutoIncrementServer(increment)
+    pool = ConnectionPool(lambda: server, pool_size=1)
+    products = ProductDAO(pool=pool)
+    users = UserDAO(pool=pool)
+
+    product_ids = products.insert_many([Product(None, f'Produit {i}', 'Acme', 1.0 + i) for i in range(5)], chunk_size=2)
+    user_ids = users.insert_many([User(None, f'Client {i}', f'client{i}@example.com') for i in range(3)])
+    products.insert_many([Product(None, 'Pixel 8', 'Google', 699.99)])
+
+    assert [server.rows[i][0] for i in product_ids] == [f'Produit {i}' for i in range(5)]
+    assert [server.rows[i][0] for i in user_ids] == [f'Client {i}' for i in range(3)]
+    # One multi-row INSERT per batch, and the step read once per DAO
+    assert server.statements.count(AUTO_INCREMENT_STEP_SQL) == 2
+    assert len(server.statements) == 2 + 3 + 1 + 1
@@ -0,0 +1,72 @@
+from ..controllers.cache import TTLCache
+from ..controllers.product_controller import ProductController
+from ..daos.product_dao_sqlite import ProductDAOSQLite
+from ..models.product import Product
+import pytest
+import sqlite3
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_cache_read_through():
+    cache = TTLCache(ttl=10, maxsize=4)
+    loads = []
+    load = lambda: loads.append(1) or ['product']
+
+    assert cache.get_or_load('all', load) == ['product']
+    assert cache.get_or_load('all', load) == ['product']
+    assert len(loads) == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_cache_entries_expire():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, maxsize=4, clock=clock)
+    cache.set('all', ['product'])
+
+    clock.now = 9.9
+    assert cache.get('all') == ['product']
+    clock.now = 10.0
+    assert cache.get('all') is None
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
+
+def test_cache_invalidate():
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.set('all', ['product'])
+    cache.invalidate()
+
+    assert cache.get('all') is None
+    assert cache.stats()['size'] == 0
+
+def test_failed_catalog_load_is_not_cached(tmp_path):
+    controller = ProductController(cache=TTLCache(ttl=30), dao=ProductDAOSQLite(str(tmp_path / 'store.sqlite3')))
+    controller.create_product(Product(None, 'Pixel 8', 'Google', 699.99))
+    dao = controller.dao
+    with dao.pool.connection() as conn:
+        conn.executescript("ALTER TABLE products RENAME TO products_moved;")
+
+    with pytest.raises(sqlite3.OperationalError):
+        controller.list_products()
+    with pytest.raises(sqlite3.OperationalError):
+        controller.list_products_page()
+    with dao.pool.connection() as conn:
+        conn.executescript("ALTER TABLE products_moved RENAME TO products;")
+
+    # Still within the TTL: the failures left nothing behind in the cache
+    assert [p.name for p in controller.list_products()] == ['Pixel 8']
+    assert [p.name for p in controller.list_products_page()] == ['Pixel 8']
+    controller.shutdown()
@@ -0,0 +1,32 @@
+from ..config import Settings
+from ..controllers.lazy import Lazy
+
+def test_settings_defaults():
+    settings = Settings({})
+    assert settings.mysql_pool_size == 5
+    assert settings.store_backend == "mysql"
+    assert settings.user_backend == "mysql"
+    assert settings.dao_metrics is False
+    assert settings.mongodb_probe_localhost is True
+    assert settings.db_operation_timeout_ms == 15000
+    assert settings.mysql_read_timeout == 30
+
+def test_user_backend_follows_store_backend():
+    settings = Settings({"STORE_BACKEND": "SQLite"})
+    assert settings.user_backend == "sqlite"
+    assert Settings({"STORE_BACKEND": "sqlite", "USER_BACKEND": "mongo"}).user_backend == "mongo"
+
+def test_lazy_builds_on_first_use_only():
+    built = []
+    def factory():
+        built.append(1)
+        return "controller"
+
+    lazy = Lazy(factory)
+    assert not lazy.created
+    assert built == []
+
+    assert lazy.upper() == "CONTROLLER"
+    assert lazy.startswith("c")
+    assert lazy.created
+    assert built == [1]
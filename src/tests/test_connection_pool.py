@@ -0,0 +1,108 @@
+from ..daos.connection_pool import ConnectionPool, PoolTimeoutError
+import threading
+import time
+import pytest
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return self.alive
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+def test_pool_reuses_connections():
+    opened = []
+    pool = ConnectionPool(lambda: opened.append(FakeConnection()) or opened[-1], pool_size=2)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert len(opened) == 1
+    assert pool.stats()["checkouts"] == 2
+
+def test_pool_replaces_dead_connection_on_checkout():
+    pool = ConnectionPool(FakeConnection, pool_size=1, ping_interval=0)
+
+    with pool.connection() as conn:
+        conn.alive = False
+    with pool.connection() as replacement:
+        pass
+
+    assert replacement is not conn
+    assert conn.closed
+    assert pool.stats()["health_check_failures"] == 1
+
+def test_pool_rolls_back_on_error():
+    pool = ConnectionPool(FakeConnection, pool_size=1)
+
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            raise ValueError("boom")
+
+    assert conn.rollbacks == 1
+    assert pool.stats()["idle"] == 1
+
+def test_pool_times_out_when_exhausted():
+    pool = ConnectionPool(FakeConnection, pool_size=1, checkout_timeout=0.05)
+
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+
+    assert pool.stats()["waits"] == 1
+
+def test_pool_bounds_open_connections_across_threads():
+    opened = []
+    pool = ConnectionPool(lambda: opened.append(FakeConnection()) or opened[-1], pool_size=3)
+
+    def work():
+        for _ in range(50):
+            with pool.connection():
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(opened) <= 3
+    assert pool.stats()["checkouts"] == 400
+
+def test_pool_serves_waiting_threads_first():
+    pool = ConnectionPool(FakeConnection, pool_size=1, checkout_timeout=2.0)
+    release = threading.Event()
+    got = []
+
+    def wait_for_connection():
+        with pool.connection() as conn:
+            got.append(conn)
+            release.wait()
+
+    with pool.connection() as held:
+        waiter = threading.Thread(target=wait_for_connection)
+        waiter.start()
+        while pool.stats()["waiting"] == 0:
+            time.sleep(0.001)
+
+    # The released connection went to the waiting thread, not to the next caller
+    pool.checkout_timeout = 0.05
+    with pytest.raises(PoolTimeoutError):
+        with pool.connection():
+            pass
+    release.set()
+    waiter.join()
+
+    assert got == [held]
@@ -0,0 +1,37 @@
+import os
+import pytest
+import subprocess
+import sys
+
+def test_local_benchmark_runs(capsys):
+    pytest.importorskip("mongomock")
+    from ..benchmarks.dao_benchmark import run
+
+    report = run("local", sizes=[20], samples=3, batch_size=5, model_count=10)
+
+    # The SQL DAOs report their errors instead of raising them
+    assert "Erreur" not in capsys.readouterr().out
+    names = {(r["target"], r["name"]) for r in report["results"]}
+    for target in ("products_sqlite", "users_sqlite", "users_mongomock"):
+        assert {(target, "insert_many[5]"), (target, "select_all_fast[20]")} <= names
+
+def test_compare_refuses_reports_of_different_backends():
+    pytest.importorskip("mongomock")
+    from ..benchmarks.dao_benchmark import compare
+
+    result = {"target": "users_mongo", "name": "insert", "throughput": 1000.0, "p95_ms": 1.0}
+    slower = dict(result, throughput=500.0)
+    assert compare({"meta": {"backend": "docker"}, "results": [result]},
+                   {"meta": {"backend": "docker"}, "results": [slower]}, 0.2) == [(slower, result)]
+    with pytest.raises(ValueError):
+        compare({"meta": {"backend": "docker"}, "results": [result]}, {"meta": {"backend": "local"}, "results": [result]}, 0.2)
+
+def test_importing_the_standins_leaves_mongomock_alone():
+    pytest.importorskip("mongomock")
+    # In a fresh interpreter: the other tests have already built stand-in clients
+    check = ("import benchmarks.standins as standins, mongomock.not_implemented as features\n"
+             "assert not features._IGNORED_FEATURES['session']\n"
+             "standins.create_mongo_client()\n"
+             "assert features._IGNORED_FEATURES['session']\n")
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", check], cwd=src, check=True)
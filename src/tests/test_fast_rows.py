@@ -0,0 +1,86 @@
+from ..daos.fast_rows import fetch_all_fast, row_mapper, text
+from ..daos.product_dao_sqlite import ProductDAOSQLite
+from ..daos.user_dao_sqlite import UserDAOSQLite
+from ..models.product import Product
+from ..models.user import User
+from mysql.connector.connection import MySQLConnection
+import bson
+import pytest
+
+class RawCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, sql, params=()):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+class PureMySQLConnection(MySQLConnection):
+    """ Pure Python connection that never connects: its cursor returns raw rows """
+    def __init__(self, rows):
+        self.rows = rows
+        self.raw_requested = False
+
+    def cursor(self, raw=False):
+        self.raw_requested = raw
+        return RawCursor(self.rows)
+
+def test_row_mapper_converts_each_column():
+    to_tuple = row_mapper((int, text, None))
+    to_user = row_mapper((int, text, text), User)
+
+    assert to_tuple((b'7', bytearray(b'Zo\xc3\xa9'), 'x')) == (7, 'Zoé', 'x')
+    user = to_user((b'7', b'Ada', b'ada@example.com'))
+    assert (user.id, user.name, user.email) == (7, 'Ada', 'ada@example.com')
+    assert row_mapper((int, text, None)) is to_tuple
+
+def test_fetch_all_fast_uses_raw_rows_with_pure_python_connector():
+    conn = PureMySQLConnection([(b'1', b'iPhone 15', b'Apple', b'999.99')])
+
+    products = fetch_all_fast(conn, "SELECT ...", (int, text, text, float), Product)
+
+    assert conn.raw_requested
+    assert str(products[0]) == str(Product(1, 'iPhone 15', 'Apple', 999.99))
+
+def test_sqlite_fast_select_all_matches_default(tmp_path):
+    path = str(tmp_path / 'store.sqlite3')
+    products, users = ProductDAOSQLite(path), UserDAOSQLite(path)
+    products.insert_many([Product(None, f'Produit {i}', 'Acme', i + 0.99) for i in range(50)])
+    users.insert_many([User(None, f'Client {i}', f'client{i}@example.com') for i in range(50)])
+
+    assert [str(p) for p in products.select_all(fast=True)] == [str(p) for p in products.select_all()]
+    assert products.select_all(as_tuples=True)[3] == (4, 'Produit 3', 'Acme', 3.99)
+    assert [(u.id, u.name, u.email) for u in users.select_all(fast=True)] == users.select_all(as_tuples=True)
+    assert len(users.select_all(as_tuples=True)) == 50
+    products.close()
+    users.close()
+
+class RawBatchCollection:
+    """ Collection whose find_raw_batches returns BSON batches, like pymongo's """
+    def __init__(self, docs, batch_size):
+        self.batches = [b''.join(bson.encode(d) for d in docs[i:i + batch_size]) for i in range(0, len(docs), batch_size)]
+
+    def find_raw_batches(self, *args, **kwargs):
+        return iter(self.batches)
+
+def test_mongo_fast_select_all_decodes_raw_batches():
+    pytest.importorskip("mongomock")
+    from ..benchmarks.standins import create_mongo_client
+    from ..daos.user_dao_mongo import UserDAOMongo
+
+    dao = UserDAOMongo(client=create_mongo_client())
+    dao.insert_many([User(None, f'Client {i}', f'client{i}@example.com') for i in range(30)])
+    # mongomock has no raw batches: the fast path falls back to a batched cursor
+    assert [(u.id, u.name) for u in dao.select_all(fast=True)] == [(u.id, u.name) for u in dao.select_all()]
+
+    dao.users = RawBatchCollection([{'_id': i, 'name': f'Client {i}', 'email': f'c{i}@example.com'} for i in range(1, 26)], 10)
+    assert dao.select_all(as_tuples=True)[-1] == (25, 'Client 25', 'c25@example.com')
+    assert [u.id for u in dao.select_all(fast=True)] == list(range(1, 26))
@@ -0,0 +1,60 @@
+from ..daos.id_allocator import BlockIdAllocator
+import threading
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+@pytest.fixture
+def counters():
+    return mongomock.MongoClient().db.counters
+
+def test_allocator_reserves_one_block_per_block_size(counters):
+    allocator = BlockIdAllocator(counters, "users", block_size=10)
+
+    ids = [allocator.next_id() for _ in range(25)]
+
+    assert ids == list(range(1, 26))
+    assert allocator.blocks_reserved == 3
+    assert counters.find_one({"_id": "users"})["seq"] == 30
+
+def test_allocators_share_counter_without_collisions(counters):
+    first = BlockIdAllocator(counters, "users", block_size=5)
+    second = BlockIdAllocator(counters, "users", block_size=5)
+
+    ids = []
+    def work(allocator):
+        for _ in range(50):
+            ids.append(allocator.next_id())
+
+    threads = [threading.Thread(target=work, args=(a,)) for a in (first, second, first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(ids) == 200
+    assert len(set(ids)) == 200
+
+def test_allocator_release_returns_unused_ids(counters):
+    allocator = BlockIdAllocator(counters, "users", block_size=10)
+    allocator.next_id()
+    allocator.next_id()
+
+    assert allocator.release()
+    assert counters.find_one({"_id": "users"})["seq"] == 2
+
+def test_allocator_release_keeps_gap_after_concurrent_reservation(counters):
+    first = BlockIdAllocator(counters, "users", block_size=10)
+    second = BlockIdAllocator(counters, "users", block_size=10)
+    first.next_id()
+    second.next_id()
+
+    assert not first.release()
+    assert second.next_id() == 12
+
+def test_allocator_creates_counter_on_first_reservation(counters):
+    allocator = BlockIdAllocator(counters, "users", block_size=10)
+    assert counters.find_one({"_id": "users"}) is None
+
+    assert allocator.next_id() == 1
+    assert counters.find_one({"_id": "users"})["seq"] == 10
@@ -0,0 +1,75 @@
+from ..daos.instrumentation import METRICS, instrumented, rows_from_count
+import pytest
+
+class FakeDAO:
+    @instrumented("fake.select_all")
+    def select_all(self):
+        return ['a', 'b', 'c']
+
+    @instrumented("fake.delete", rows=rows_from_count)
+    def delete(self, item_id):
+        return 1
+
+    @instrumented("fake.insert")
+    def insert(self, item):
+        raise RuntimeError("boom")
+
+    @instrumented("fake.update")
+    def update(self, item):
+        # Errors caught by the DAO itself are reported with mark_failed
+        METRICS.mark_failed()
+
+@pytest.fixture
+def metrics():
+    enabled, threshold = METRICS.enabled, METRICS.slow_query_threshold
+    METRICS.enabled = True
+    METRICS.reset()
+    yield METRICS
+    METRICS.enabled, METRICS.slow_query_threshold = enabled, threshold
+    METRICS.reset()
+
+def test_metrics_record_calls_rows_and_errors(metrics):
+    dao = FakeDAO()
+    dao.select_all()
+    dao.select_all()
+    dao.delete(1)
+    dao.update('item')
+    with pytest.raises(RuntimeError):
+        dao.insert('item')
+
+    operations = metrics.snapshot()['operations']
+    assert operations['fake.select_all']['calls'] == 2
+    assert operations['fake.select_all']['rows'] == 6
+    assert operations['fake.delete']['rows'] == 1
+    assert operations['fake.update']['errors'] == 1
+    assert operations['fake.insert']['errors'] == 1
+
+def test_metrics_slow_query_log(metrics):
+    metrics.slow_query_threshold = 0
+    FakeDAO().delete(42)
+
+    entry = metrics.snapshot()['slow_log'][0]
+    assert entry['operation'] == 'fake.delete'
+    assert '42' in entry['args']
+
+def test_metrics_prometheus_format(metrics):
+    FakeDAO().select_all()
+    text = metrics.to_prometheus()
+
+    assert 'dao_operation_duration_seconds_count{operation="fake.select_all"} 1' in text
+    assert 'dao_operation_duration_seconds_bucket{operation="fake.select_all",le="+Inf"} 1' in text
+    assert 'dao_operation_rows_total{operation="fake.select_all"} 3' in text
+
+def test_metrics_disabled_records_nothing(metrics):
+    metrics.enabled = False
+    FakeDAO().select_all()
+    assert metrics.snapshot()['operations'] == {}
+
+def test_metrics_gauges(metrics):
+    metrics.gauge('users_read_model_lag_seconds', lambda: 0.25)
+    try:
+        assert metrics.snapshot()['gauges'] == {'users_read_model_lag_seconds': 0.25}
+        assert 'dao_users_read_model_lag_seconds 0.25' in metrics.to_prometheus()
+    finally:
+        metrics.remove_gauge('users_read_model_lag_seconds')
+    assert metrics.snapshot()['gauges'] == {}
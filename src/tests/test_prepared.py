@@ -0,0 +1,83 @@
+from ..daos.prepared import StatementCache
+import gc
+import pytest
+
+class FakeCursor:
+    def __init__(self, prepared):
+        self.prepared = prepared
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class FakeConnection:
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self, prepared=False):
+        cursor = FakeCursor(prepared)
+        self.cursors.append(cursor)
+        return cursor
+
+SELECT = "SELECT 1"
+INSERT = "INSERT INTO t VALUES (%s)"
+
+def test_statement_cache_reuses_prepared_cursor():
+    cache = StatementCache()
+    conn = FakeConnection()
+
+    for _ in range(3):
+        with cache.cursor(conn, SELECT) as cursor:
+            assert cursor.prepared
+    with cache.cursor(conn, INSERT):
+        pass
+
+    assert len(conn.cursors) == 2
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+def test_statement_cache_is_per_connection():
+    cache = StatementCache()
+    first, second = FakeConnection(), FakeConnection()
+
+    with cache.cursor(first, SELECT) as a, cache.cursor(second, SELECT) as b:
+        assert a is not b
+
+    del first
+    gc.collect()
+    assert cache.stats()["connections"] == 1
+
+def test_statement_cache_evicts_least_recently_used():
+    cache = StatementCache(max_statements=2)
+    conn = FakeConnection()
+    for sql in ("A", "B", "A", "C"):
+        with cache.cursor(conn, sql):
+            pass
+
+    assert cache.stats()["evictions"] == 1
+    assert conn.cursors[1].closed  # B was the least recently used
+
+def test_statement_cache_discards_connection_after_error():
+    cache = StatementCache()
+    conn = FakeConnection()
+    with pytest.raises(RuntimeError):
+        with cache.cursor(conn, SELECT):
+            raise RuntimeError("server gone away")
+
+    assert conn.cursors[0].closed
+    with cache.cursor(conn, SELECT) as cursor:
+        assert cursor is conn.cursors[1]
+
+def test_statement_cache_disabled_uses_plain_cursors():
+    cache = StatementCache(enabled=False)
+    conn = FakeConnection()
+    with cache.cursor(conn, SELECT) as cursor:
+        assert not cursor.prepared
+    assert cursor.closed
+    assert cache.stats()["misses"] == 0
@@ -37,6 +37,45 @@ def test_product_select(setup_product_dao):
         assert product.brand is not None
         assert product.price is not None
 
+def test_product_select_page(setup_product_dao):
+    dao = setup_product_dao
+    all_products = dao.select_all()
+    
+    # Walk the table two rows at a time and compare with select_all
+    first_page = dao.select_page(0, 2)
+    assert [p.id for p in first_page] == [p.id for p in all_products[:2]]
+    next_page = dao.select_page(first_page[-1].id, 2)
+    assert [p.id for p in next_page] == [p.id for p in all_products[2:4]]
+    
+    streamed_ids = [p.id for p in dao.iter_all(batch_size=2)]
+    assert streamed_ids == [p.id for p in all_products]
+
+def test_product_lookups(setup_product_dao):
+    dao = setup_product_dao
+    samsung = dao.find_by_brand('Samsung')
+    assert [p.name for p in samsung] == ['Galaxy S24']
+    
+    # Look the same product up by ID
+    product = dao.get_by_id(samsung[0].id)
+    assert product.name == 'Galaxy S24'
+    assert dao.get_by_id(999999) is None
+    
+    # Price range bounds are inclusive and results are sorted by price
+    in_range = dao.find_by_price_range(699.99, 899.99)
+    assert [p.name for p in in_range] == ['Pixel 8', 'Galaxy S24']
+
+def test_product_aggregates(setup_product_dao):
+    dao = setup_product_dao
+    assert dao.exists()
+    assert dao.count() == len(dao.select_all())
+    
+    # Aggregates are computed per brand by MySQL
+    stats = {s['brand']: s for s in dao.price_stats_by_brand()}
+    assert stats['Samsung']['count'] == 1
+    assert stats['Samsung']['min'] == 899.99
+    assert stats['Samsung']['sum'] == 899.99
+    assert sum(s['count'] for s in stats.values()) == dao.count()
+
 def test_product_insert(setup_product_dao):
     dao = setup_product_dao
     # Create a new product
@@ -57,6 +96,20 @@ def test_product_insert(setup_product_dao):
     assert inserted_product.brand == 'Apple'
     assert inserted_product.price == 1999.99
 
+def test_product_insert_many(setup_product_dao):
+    dao = setup_product_dao
+    new_products = [Product(None, f'Bulk Product {i}', 'Bulk', 10.0 + i) for i in range(5)]
+    
+    # Insert in chunks smaller than the input to exercise several commits
+    inserted_ids = dao.insert_many(new_products, chunk_size=2)
+    assert len(inserted_ids) == 5
+    assert len(set(inserted_ids)) == 5
+    
+    # Verify every product was inserted with its assigned ID
+    products_by_id = {p.id: p for p in dao.select_all()}
+    for inserted_id, product in zip(inserted_ids, new_products):
+        assert products_by_id[inserted_id].name == product.name
+
 def test_product_update(setup_product_dao):
     dao = setup_product_dao
     
@@ -154,3 +207,5 @@ def test_product_delete_all_empty_table(setup_product_dao):
     # Verify table is still empty
     products_after = dao.select_all()
     assert len(products_after) == 0
+    assert dao.count() == 0
+    assert not dao.exists()
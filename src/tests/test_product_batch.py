@@ -0,0 +1,29 @@
+from ..models.product_batch import ProductBatch, to_cents
+from decimal import Decimal
+
+def test_to_cents():
+    assert to_cents(Decimal('999.99')) == 99999
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents(12) == 1200
+
+def test_product_batch_round_trip():
+    rows = [
+        (1, 'iPhone 15', 'Apple', Decimal('999.99')),
+        (2, 'Galaxy S24', 'Samsung', Decimal('899.99')),
+        (3, 'MacBook Pro', 'Apple', Decimal('1999.99')),
+        (4, 'Café crème', 'Nespresso', 4.5),
+    ]
+    batch = ProductBatch.from_rows(rows)
+
+    assert len(batch) == 4
+    assert list(batch.ids) == [1, 2, 3, 4]
+    assert batch.brands == ['Apple', 'Samsung', 'Nespresso']
+    assert batch.total_cents() == 99999 + 89999 + 199999 + 450
+
+    product = batch[3]
+    assert product.id == 4
+    assert product.name == 'Café crème'
+    assert product.brand == 'Nespresso'
+    assert product.price == 4.5
+    assert [p.name for p in batch] == [row[1] for row in rows]
+    assert batch[-1].id == 4
@@ -0,0 +1,17 @@
+from ..daos.factory import PRODUCT_BACKENDS, USER_BACKENDS
+from ..daos.protocols import ProductDAOProtocol, UserDAOProtocol
+import inspect
+import pytest
+
+def protocol_methods(protocol):
+    return [name for name in vars(protocol) if not name.startswith('_')]
+
+@pytest.mark.parametrize('protocol, backend, dao_class',
+                         [(ProductDAOProtocol, name, cls) for name, cls in PRODUCT_BACKENDS.items()]
+                         + [(UserDAOProtocol, name, cls) for name, cls in USER_BACKENDS.items()])
+def test_every_backend_implements_its_protocol(protocol, backend, dao_class):
+    assert issubclass(dao_class, protocol)
+    # Callers pass arguments by name too: the parameters must match, not only the method names
+    for name in protocol_methods(protocol):
+        expected = list(inspect.signature(getattr(protocol, name)).parameters)
+        assert list(inspect.signature(getattr(dao_class, name)).parameters) == expected, f"{backend}.{name}"
@@ -0,0 +1,272 @@
+from ..daos.connection_pool import ConnectionPool
+from ..daos.instrumentation import DAOMetrics
+from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
+import pytest
+import threading
+import time
+# Same module as the pool and the DAOs, which import it from the src directory they put on sys.path
+from daos.resilience import (CircuitBreaker, CircuitOpenError, DatabaseUnavailableError, DeadlineExceededError, deadline,
+                             retry_with_jitter, time_left)
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def fail(error):
+    raise error
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast():
+    clock = Clock()
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=2.0, jitter=0.5, clock=clock, random=lambda: 1.0)
+
+    for _ in range(2):
+        with pytest.raises(DatabaseUnavailableError) as raised:
+            with breaker.guard():
+                fail(ConnectionRefusedError())
+        assert isinstance(raised.value.__cause__, ConnectionRefusedError)
+    # The backend answered: consecutive failures start over
+    with pytest.raises(ValueError):
+        with breaker.guard():
+            fail(ValueError())
+    for _ in range(3):
+        with pytest.raises(DatabaseUnavailableError):
+            with breaker.guard():
+                fail(TimeoutError())
+
+    assert breaker.state == CircuitBreaker.OPEN
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            calls.append(1)
+    assert calls == []
+    # Full jitter: the 2 s delay is shortened by half at most
+    assert breaker.stats()["retry_in"] == 1.0
+    assert breaker.stats() | {"retry_in": 0} == {
+        "state": "open", "consecutive_failures": 0, "retry_in": 0, "failures": 5, "timeouts": 3, "opened": 1, "rejected": 1,
+    }
+
+def test_breaker_lets_one_trial_through_and_backs_off():
+    clock = Clock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=1.0, max_reset_timeout=3.0, jitter=0, clock=clock)
+    with pytest.raises(DatabaseUnavailableError):
+        with breaker.guard():
+            fail(ConnectionError())
+
+    clock.now += 1.0
+    with pytest.raises(DatabaseUnavailableError):
+        with breaker.guard():
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            # Only the trial reaches the backend
+            with pytest.raises(CircuitOpenError):
+                with breaker.guard():
+                    pass
+            fail(ConnectionError())
+    # The failed trial doubles the delay
+    assert breaker.stats()["retry_in"] == 2.0
+
+    clock.now += 2.0
+    with breaker.guard():
+        pass
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.opened == 2
+
+def test_deadline_only_shortens():
+    assert time_left(5) == 5
+    with deadline(10):
+        with deadline(0.05):
+            assert time_left() <= 0.05
+            with deadline(60):
+                assert time_left() <= 0.05
+            time.sleep(0.06)
+            with pytest.raises(DeadlineExceededError):
+                time_left()
+        assert 9 < time_left() <= 10
+    assert time_left() is None
+
+def test_retry_with_jitter_retries_only_transient_errors():
+    attempts, delays = [], []
+    def connect():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionRefusedError()
+        return "conn"
+
+    assert retry_with_jitter(connect, attempts=3, base_delay=0.1, sleep=delays.append, random=lambda: 0.5) == "conn"
+    assert delays == [0.05, 0.1]
+    with pytest.raises(PermissionError):
+        retry_with_jitter(lambda: fail(PermissionError()), attempts=3, sleep=delays.append,
+                          retry_if=lambda e: isinstance(e, ConnectionError))
+    assert len(delays) == 2
+
+class FakeConnection:
+    def rollback(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+def test_pool_fails_fast_when_database_is_down():
+    attempts = []
+    def connect():
+        attempts.append(1)
+        raise ConnectionRefusedError()
+    pool = ConnectionPool(connect, pool_size=2, breaker=CircuitBreaker("test", failure_threshold=2, reset_timeout=60))
+
+    for _ in range(2):
+        with pytest.raises(DatabaseUnavailableError):
+            with pool.connection():
+                pass
+    with pytest.raises(CircuitOpenError):
+        with pool.connection():
+            pass
+
+    assert len(attempts) == 2
+    assert pool.stats()["open"] == 0
+
+def test_pool_deadline_bounds_wait_and_round_trips():
+    timeouts = []
+    pool = ConnectionPool(FakeConnection, pool_size=1, checkout_timeout=10, operation_timeout=5,
+                          set_timeouts=lambda conn, left: timeouts.append(left))
+    busy, release = threading.Event(), threading.Event()
+    def hold():
+        with pool.connection():
+            busy.set()
+            release.wait()
+    holder = threading.Thread(target=hold)
+    holder.start()
+    busy.wait()
+
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceededError):
+        with deadline(0.05):
+            with pool.connection():
+                pass
+    assert time.perf_counter() - start < 1
+    release.set()
+    holder.join()
+
+    assert 4 < timeouts[0] <= 5
+    with deadline(1):
+        with pool.connection():
+            pass
+    assert timeouts[1] <= 1
+
+def test_mongo_breaker_counts_timeouts():
+    pytest.importorskip("mongomock")
+    from ..benchmarks.standins import create_mongo_client
+    from daos.user_dao_mongo import UserDAOMongo, is_mongo_failure, is_mongo_timeout
+
+    breaker = CircuitBreaker("mongo_test", failure_threshold=2, reset_timeout=60,
+                             is_failure=is_mongo_failure, is_timeout=is_mongo_timeout)
+    dao = UserDAOMongo(client=create_mongo_client(), breaker=breaker)
+    dao.users.find_one = lambda *args, **kwargs: fail(DuplicateKeyError("E11000"))
+    with pytest.raises(DuplicateKeyError):
+        dao.get_by_id(1)
+    dao.users.find_one = lambda *args, **kwargs: fail(ServerSelectionTimeoutError("mongo:27017: timed out"))
+    for _ in range(2):
+        with pytest.raises(DatabaseUnavailableError):
+            dao.get_by_id(1)
+    with pytest.raises(CircuitOpenError):
+        dao.count()
+
+    metrics = DAOMetrics()
+    breaker.register_metrics(metrics)
+    gauges = metrics.snapshot()["gauges"]
+    assert gauges["circuit_mongo_test_state"] == 2.0
+    assert gauges["circuit_mongo_test_timeouts"] == 2.0
+    assert gauges["circuit_mongo_test_rejected"] == 1.0
+
+@pytest.fixture
+def dead_mysql(monkeypatch):
+    """ Settings and connector of a MySQL server that refuses connections, with fresh shared pools and breakers """
+    import mysql.connector
+    from mysql.connector.errors import InterfaceError
+    import config, daos.connection_pool, daos.resilience
+
+    attempts = []
+    def connect(**kwargs):
+        attempts.append(kwargs)
+        raise InterfaceError("2003: Can't connect to MySQL server on '127.0.0.1:3306' (111)", errno=2003)
+    monkeypatch.setattr(mysql.connector, "connect", connect)
+    monkeypatch.setattr(daos.connection_pool, "_shared_pools", {})
+    monkeypatch.setattr(daos.resilience, "_shared_breakers", {})
+    for name, value in {"STORE_BACKEND": "mysql", "USER_BACKEND": "mysql", "MYSQL_CONNECT_RETRIES": "0",
+                        "CIRCUIT_FAILURE_THRESHOLD": "2", "CIRCUIT_RESET_TIMEOUT_MS": "60000"}.items():
+        monkeypatch.setenv(name, value)
+    config.reload_settings()
+    yield attempts
+    monkeypatch.undo()
+    config.reload_settings()
+
+def test_menu_survives_a_dead_database(dead_mysql, monkeypatch, capsys):
+    from ..views.view import View
+    choices = iter(['1', '1', '1', '8'])
+    monkeypatch.setattr('builtins.input', lambda prompt="": next(choices))
+
+    View.show_options()
+
+    out = capsys.readouterr().out
+    assert out.count("Base mysql indisponible : 2003") == 2
+    assert out.count("Base mysql indisponible : nouvel essai dans") == 1
+    assert out.count("Réessayez plus tard.") == 3
+    assert "Au revoir!" in out
+    # The open circuit spared the third attempt
+    assert len(dead_mysql) == 2
+
+def test_mongo_deadline_applies_per_batch():
+    pytest.importorskip("mongomock")
+    from ..benchmarks.standins import create_mongo_client
+    from daos.user_dao_mongo import UserDAOMongo
+    from ..models.user import User
+
+    dao = UserDAOMongo(client=create_mongo_client())
+    dao.operation_timeout = 0.05
+    insert_many = dao.users.insert_many
+    def slow_insert_many(*args, **kwargs):
+        time.sleep(0.02)
+        # Raises once the deadline of the whole call would have passed
+        time_left()
+        return insert_many(*args, **kwargs)
+    dao.users.insert_many = slow_insert_many
+
+    ids = dao.insert_many([User(None, f'Client {i}', f'client{i}@example.com') for i in range(25)], chunk_size=5)
+
+    assert len(ids) == 25
+    assert [u.id for u in dao.iter_all(batch_size=10)] == ids
+    assert [u.id for u in dao.select_all(fast=True)] == ids
+
+def test_product_reads_raise_while_the_circuit_is_open():
+    from ..daos.product_dao import ProductDAO
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    with pytest.raises(DatabaseUnavailableError):
+        with breaker.guard():
+            fail(ConnectionRefusedError())
+    dao = ProductDAO(pool=ConnectionPool(FakeConnection, pool_size=1, breaker=breaker))
+
+    for read in (dao.count, dao.exists, lambda: dao.get_by_id(1), lambda: dao.find_by_brand("Acme"),
+                 lambda: dao.find_by_price_range(0, 10), dao.price_stats_by_brand):
+        with pytest.raises(CircuitOpenError):
+            read()
+
+def test_menu_does_not_show_an_empty_catalog_when_the_database_is_down(dead_mysql, monkeypatch, capsys):
+    from ..views.view import View
+    choices = iter(['5', '6', '8'])
+    monkeypatch.setattr('builtins.input', lambda prompt="": next(choices))
+
+    View.show_options()
+
+    out = capsys.readouterr().out
+    assert "Aucun article disponible" not in out
+    assert out.count("Réessayez plus tard.") == 2
+
+def test_cli_exits_with_an_error_when_the_database_is_down(dead_mysql, capsys):
+    from ..views.cli import main
+
+    assert main(["list-products"]) == 1
+    assert "Base mysql indisponible : 2003" in capsys.readouterr().err
@@ -0,0 +1,49 @@
+from ..views.row_writer import RowWriter
+from ..models.product import Product
+import io
+import json
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+PRODUCTS = [Product(1, 'Pixel 8', 'Google', 699.99), Product(2, 'Galaxy, S24', 'Samsung', 899.99)]
+COLUMNS = ('id', 'name', 'brand', 'price')
+
+def test_row_writer_table():
+    out = io.StringIO()
+    writer = RowWriter(out, COLUMNS, 'table')
+    writer.write_rows(PRODUCTS)
+    writer.close()
+
+    lines = out.getvalue().splitlines()
+    assert lines[0].split() == ['id', 'name', 'brand', 'price']
+    assert lines[2] == '1   Pixel 8      Google   699.99'
+
+def test_row_writer_csv_and_jsonl():
+    out = io.StringIO()
+    writer = RowWriter(out, COLUMNS, 'csv')
+    writer.write_rows(PRODUCTS)
+    writer.close()
+    assert out.getvalue().splitlines()[2] == '2,"Galaxy, S24",Samsung,899.99'
+
+    out = io.StringIO()
+    writer = RowWriter(out, COLUMNS, 'jsonl')
+    writer.write_rows(PRODUCTS)
+    writer.close()
+    assert json.loads(out.getvalue().splitlines()[1])['name'] == 'Galaxy, S24'
+
+def test_row_writer_writes_in_chunks():
+    out = CountingStream()
+    writer = RowWriter(out, COLUMNS, 'jsonl', buffer_rows=100)
+    for start in range(0, 1000, 50):
+        writer.write_rows([Product(i, 'p', 'b', 1.0) for i in range(start, start + 50)])
+    writer.close()
+
+    assert writer.rows == 1000
+    assert out.writes == 10
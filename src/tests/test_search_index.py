@@ -0,0 +1,72 @@
+from ..controllers.product_controller import ProductController
+from ..controllers.search_index import ProductSearchIndex, tokenize
+from ..daos.batching import DEFAULT_PAGE_SIZE
+from ..daos.product_dao_sqlite import ProductDAOSQLite
+from ..models.product import Product
+import pytest
+import sqlite3
+
+@pytest.fixture
+def index():
+    return ProductSearchIndex().build([
+        Product(1, 'iPhone 15 Pro', 'Apple', 1199.99),
+        Product(2, 'Galaxy S24', 'Samsung', 899.99),
+        Product(3, 'Pixel 8', 'Google', 699.99),
+        Product(4, 'MacBook Pro', 'Apple', 1999.99),
+        Product(5, 'Café équitable', 'Bio', 8.5),
+    ])
+
+def test_tokenize_removes_case_and_accents():
+    assert tokenize('Café Équitable-Bio') == ['cafe', 'equitable', 'bio']
+
+def test_search_by_word_prefix(index):
+    assert [p.id for p in index.search('pro')] == [1, 4]
+    assert [p.id for p in index.search('apple mac')] == [4]
+    assert [p.id for p in index.search('cafe')] == [5]
+    assert index.search('sony') == []
+
+def test_search_by_price_range(index):
+    assert [p.id for p in index.search(lo=700, hi=1500)] == [2, 1]
+    assert [p.id for p in index.search('apple', hi=1500)] == [1]
+    assert [p.id for p in index.search(lo=0, limit=2)] == [5, 3]
+
+def test_index_add_and_remove(index):
+    index.add(Product(6, 'Pixel 9 Pro', 'Google', 999.0))
+    assert [p.id for p in index.search('pixel')] == [3, 6]
+
+    index.remove(3)
+    index.remove(6)
+    assert index.search('pixel') == []
+    assert index.stats()['products'] == 4
+    assert [p.id for p in index.search(lo=600, hi=1000)] == [2]
+
+def test_controller_keeps_index_up_to_date(tmp_path):
+    controller = ProductController(dao=ProductDAOSQLite(str(tmp_path / 'store.sqlite3')))
+    controller.create_product(Product(None, 'Pixel 8', 'Google', 699.99))
+    assert [p.name for p in controller.search_products('pix')] == ['Pixel 8']
+
+    new_id = controller.create_product(Product(None, 'Pixel 9', 'Google', 899.99))
+    assert len(controller.search_products('google')) == 2
+
+    controller.delete_product(new_id)
+    assert [p.name for p in controller.search_products('pixel')] == ['Pixel 8']
+    controller.shutdown()
+
+def test_failed_index_build_is_retried(tmp_path):
+    controller = ProductController(dao=ProductDAOSQLite(str(tmp_path / 'store.sqlite3')))
+    # More than one page, so that the failure happens after part of the catalog was indexed
+    controller.dao.insert_many([Product(None, f'Pixel {i}', 'Google', 599.99) for i in range(DEFAULT_PAGE_SIZE + 5)])
+    select_rows = controller.dao._select_rows
+    def failing_select_rows(after_id, limit):
+        if after_id:
+            raise sqlite3.OperationalError("disk I/O error")
+        return select_rows(after_id, limit)
+    controller.dao._select_rows = failing_select_rows
+
+    with pytest.raises(sqlite3.OperationalError):
+        controller.search_products('pixel')
+    controller.dao._select_rows = select_rows
+
+    assert controller.search_products('pixel 7')[0].name == 'Pixel 7'
+    assert len(controller.search_index) == DEFAULT_PAGE_SIZE + 5
+    controller.shutdown()
@@ -0,0 +1,69 @@
+from ..daos.product_dao_sqlite import ProductDAOSQLite
+from ..daos.user_dao_sqlite import UserDAOSQLite
+from ..models.product import Product
+from ..models.user import User
+import pytest
+
+@pytest.fixture
+def product_dao(tmp_path):
+    """Product DAO on a fresh SQLite file, no server needed"""
+    dao = ProductDAOSQLite(str(tmp_path / 'store.sqlite3'))
+    dao.insert(Product(None, 'iPhone 15', 'Apple', 999.99))
+    dao.insert(Product(None, 'Galaxy S24', 'Samsung', 899.99))
+    dao.insert(Product(None, 'Pixel 8', 'Google', 699.99))
+    yield dao
+    dao.close()
+
+@pytest.fixture
+def user_dao(tmp_path):
+    dao = UserDAOSQLite(str(tmp_path / 'store.sqlite3'))
+    dao.insert(User(None, 'Ada Lovelace', 'alovelace@example.com'))
+    dao.insert(User(None, 'Adele Goldberg', 'agoldberg@example.com'))
+    dao.insert(User(None, 'Alan Turing', 'aturing@example.com'))
+    yield dao
+    dao.close()
+
+def test_sqlite_product_crud(product_dao):
+    dao = product_dao
+    inserted_id = dao.insert(Product(None, 'MacBook Pro', 'Apple', 1999.99))
+    assert dao.get_by_id(inserted_id).name == 'MacBook Pro'
+
+    product = dao.get_by_id(inserted_id)
+    product.price = 1899.99
+    dao.update(product)
+    assert dao.get_by_id(inserted_id).price == 1899.99
+
+    dao.delete(inserted_id)
+    assert dao.get_by_id(inserted_id) is None
+    assert dao.count() == 3
+
+def test_sqlite_product_bulk_and_pages(product_dao):
+    dao = product_dao
+    ids = dao.insert_many([Product(None, f'Bulk {i}', 'Bulk', 1.0 + i) for i in range(7)], chunk_size=3)
+    assert len(set(ids)) == 7
+    assert [p.name for p in dao.select_page(ids[0] - 1, 2)] == ['Bulk 0', 'Bulk 1']
+    assert [p.id for p in dao.iter_all(batch_size=4)] == [p.id for p in dao.select_all()]
+    assert len(dao.select_batch(batch_size=4)) == 10
+
+def test_sqlite_product_queries(product_dao):
+    dao = product_dao
+    assert [p.name for p in dao.find_by_brand('Samsung')] == ['Galaxy S24']
+    assert [p.name for p in dao.find_by_price_range(699.99, 899.99)] == ['Pixel 8', 'Galaxy S24']
+    assert dao.exists()
+    stats = {s['brand']: s for s in dao.price_stats_by_brand()}
+    assert stats['Apple']['max'] == 999.99
+
+    dao.delete_all()
+    assert not dao.exists()
+
+def test_sqlite_user_crud(user_dao):
+    dao = user_dao
+    user = dao.find_by_email('aturing@example.com')
+    user.email = 'alan.turing@example.com'
+    dao.update(user)
+    assert dao.get_by_id(user.id).email == 'alan.turing@example.com'
+
+    dao.delete(user.id)
+    assert dao.count() == 2
+    ids = dao.insert_many([User(None, f'User {i}', f'user{i}@example.com') for i in range(3)])
+    assert [u.id for u in dao.select_page(ids[0] - 1, 10)] == ids
@@ -0,0 +1,94 @@
+from ..controllers.transfer_controller import TransferController
+from ..daos.product_dao_sqlite import ProductDAOSQLite
+from ..daos.user_dao_sqlite import UserDAOSQLite
+import io
+import json
+import pytest
+import sqlite3
+
+@pytest.fixture
+def products(tmp_path):
+    controller = TransferController('products', ProductDAOSQLite(str(tmp_path / 'store.sqlite3')))
+    yield controller
+    controller.shutdown()
+
+def test_import_csv_in_chunks(products):
+    feed = io.StringIO("name,brand,price\n" + "".join(f'"Produit, {i}",Acme,{i}.99\n' for i in range(25)))
+    reports = []
+
+    progress = products.import_stream(feed, 'csv', chunk_size=10, on_progress=lambda p: reports.append(p.rows))
+
+    assert progress.rows == 25
+    assert reports == [10, 20, 25]
+    assert products.dao.count() == 25
+    assert products.dao.get_by_id(1).name == 'Produit, 0'
+
+def test_export_then_import_jsonl(products, tmp_path):
+    products.import_stream(io.StringIO('{"name": "Pixel 8", "brand": "Google", "price": 699.99}\n\n'), 'jsonl')
+    out = io.StringIO()
+
+    progress = products.export_stream(out, 'jsonl', batch_size=1)
+
+    assert progress.rows == 1
+    assert json.loads(out.getvalue()) == {'id': 1, 'name': 'Pixel 8', 'brand': 'Google', 'price': 699.99}
+
+def test_import_invalid_jsonl(products):
+    with pytest.raises(ValueError):
+        products.import_stream(io.StringIO('{"name": "ok", "brand": "b", "price": 1}\nnot json\n'), 'jsonl')
+
+def test_export_users_csv(tmp_path):
+    controller = TransferController('users', UserDAOSQLite(str(tmp_path / 'store.sqlite3')))
+    controller.import_stream(io.StringIO("name,email\nAda Lovelace,alovelace@example.com\n"), 'csv')
+    out = io.StringIO()
+    controller.export_stream(out, 'csv')
+    controller.shutdown()
+
+    assert out.getvalue().splitlines() == ['id,name,email', '1,Ada Lovelace,alovelace@example.com']
+
+def test_export_fails_when_a_page_cannot_be_read(products):
+    products.import_stream(io.StringIO("name,brand,price\n" + "".join(f"Produit {i},Acme,{i}.99\n" for i in range(25))), 'csv')
+    select_rows = products.dao._select_rows
+    pages = []
+    def failing_select_rows(after_id, limit):
+        pages.append(after_id)
+        if len(pages) == 2:
+            raise sqlite3.OperationalError("disk I/O error")
+        return select_rows(after_id, limit)
+    products.dao._select_rows = failing_select_rows
+
+    # An error must not read as the end of the table, which would give a truncated export
+    with pytest.raises(sqlite3.OperationalError):
+        products.export_stream(io.StringIO(), 'csv', batch_size=10)
+    assert pages == [0, 10]
+
+def test_import_reports_the_line_of_a_malformed_record(products):
+    with pytest.raises(ValueError, match="Ligne 3 : champ 'price' manquant"):
+        products.import_stream(io.StringIO('{"name": "ok", "brand": "b", "price": 1}\n\n{"name": "x", "brand": "b"}\n'), 'jsonl')
+    with pytest.raises(ValueError, match="Ligne 2 : enregistrement invalide"):
+        products.import_stream(io.StringIO('{"name": "ok", "brand": "b", "price": 1}\n["x", "b", 1]\n'), 'jsonl')
+    with pytest.raises(ValueError, match="Ligne 3 : enregistrement invalide"):
+        products.import_stream(io.StringIO("name,brand,price\nok,b,1\nx,b,gratuit\n"), 'csv')
+
+@pytest.fixture
+def sqlite_store(tmp_path, monkeypatch):
+    """ Settings of a SQLite store in tmp_path, for the command line """
+    import config
+    monkeypatch.setenv("STORE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / 'store.sqlite3'))
+    config.reload_settings()
+    yield tmp_path
+    monkeypatch.undo()
+    config.reload_settings()
+
+def test_cli_reports_errors_with_an_exit_code(sqlite_store, capsys):
+    from ..views.cli import main
+    feed = sqlite_store / 'products.jsonl'
+    feed.write_text('{"name": "Pixel 8", "brand": "Google"}\n')
+
+    assert main(["import", str(feed)]) == 1
+    assert "Erreur : Ligne 1 : champ 'price' manquant" in capsys.readouterr().err
+
+    # A database error, not a traceback
+    (sqlite_store / 'store.sqlite3').write_text("pas une base SQLite")
+    assert main(["export", str(sqlite_store / 'out.csv')]) == 1
+    assert "Erreur de la base de données" in capsys.readouterr().err
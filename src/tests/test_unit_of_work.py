@@ -0,0 +1,136 @@
+from ..controllers.product_controller import ProductController
+from ..daos.product_dao_sqlite import ProductDAOSQLite
+from ..daos.user_dao_cqrs import UserDAOCQRS
+from ..daos.user_dao_sqlite import UserDAOSQLite
+from ..models.product import Product
+from ..models.user import User
+import pytest
+# Same module as the DAOs, which import it from the src directory they put on sys.path
+from daos.unit_of_work import TransactionError, UnitOfWork, in_unit_of_work
+
+@pytest.fixture
+def daos(tmp_path):
+    path = str(tmp_path / 'store.sqlite3')
+    users, products = UserDAOSQLite(path), ProductDAOSQLite(path)
+    yield users, products
+    users.close()
+    products.close()
+
+def test_unit_of_work_commits_once_on_one_connection(daos):
+    users, products = daos
+    checkouts = products.pool.stats()['checkouts']
+
+    with UnitOfWork(users, products) as uow:
+        assert in_unit_of_work()
+        users.insert(User(None, 'Ada Lovelace', 'alovelace@example.com'))
+        products.insert_many([Product(None, f'Produit {i}', 'Acme', 9.99) for i in range(5)])
+        products.insert(Product(None, 'Pixel 8', 'Google', 699.99))
+        # Reads inside the block see its uncommitted writes
+        assert products.count() == 6
+
+    assert len(uow.stores) == 1
+    assert products.pool.stats()['checkouts'] == checkouts + 1
+    assert not in_unit_of_work()
+    assert users.count() == 1
+    assert products.count() == 6
+
+def test_unit_of_work_rolls_back_when_block_raises(daos):
+    users, products = daos
+
+    with pytest.raises(RuntimeError):
+        with UnitOfWork(users, products):
+            users.insert(User(None, 'Ada Lovelace', 'alovelace@example.com'))
+            products.insert(Product(None, 'Pixel 8', 'Google', 699.99))
+            raise RuntimeError("abandon")
+
+    assert users.count() == 0
+    assert products.count() == 0
+
+def test_unit_of_work_rolls_back_when_an_operation_failed(daos):
+    users, products = daos
+
+    # ProductDAO only prints its errors: the failure still cancels the whole unit of work
+    with pytest.raises(TransactionError):
+        with UnitOfWork(users, products):
+            users.insert(User(None, 'Ada Lovelace', 'alovelace@example.com'))
+            assert products.insert(Product(None, None, 'Google', 699.99)) is None
+
+    assert users.count() == 0
+
+def test_savepoint_rolls_back_only_its_block(daos):
+    users, products = daos
+
+    with UnitOfWork(users, products) as uow:
+        users.insert(User(None, 'Ada Lovelace', 'alovelace@example.com'))
+        with pytest.raises(TransactionError):
+            with uow.savepoint():
+                products.insert(Product(None, 'Pixel 8', 'Google', 699.99))
+                products.insert(Product(None, None, 'Google', 699.99))
+        with uow.savepoint():
+            products.insert(Product(None, 'iPhone 15', 'Apple', 999.99))
+
+    assert users.count() == 1
+    assert [p.name for p in products.select_all()] == ['iPhone 15']
+
+def test_controller_indexes_products_only_once_committed(tmp_path):
+    controller = ProductController(dao=ProductDAOSQLite(str(tmp_path / 'store.sqlite3')), write_behind=True)
+    controller.create_product(Product(None, 'Galaxy S24', 'Samsung', 899.99))
+    assert len(controller.search_index) == 1
+
+    with pytest.raises(RuntimeError):
+        with controller.transaction():
+            controller.create_product(Product(None, 'Pixel 8', 'Google', 699.99))
+            raise RuntimeError("abandon")
+    with controller.transaction() as uow:
+        with pytest.raises(TransactionError):
+            with uow.savepoint():
+                controller.create_product(Product(None, 'Pixel 7', 'Google', 599.99))
+                controller.create_product(Product(None, None, 'Google', 1.0))
+        # Synchronous inside a unit of work, even in write-behind mode
+        product_id = controller.create_product(Product(None, 'iPhone 15', 'Apple', 999.99))
+        assert controller.search_products('iphone') == []
+
+    assert [p.id for p in controller.search_products('iphone')] == [product_id]
+    assert controller.search_products('pixel') == []
+    assert controller.count_products() == 2
+    controller.shutdown()
+
+def test_mongo_transaction_uses_a_session():
+    pytest.importorskip("mongomock")
+    from ..benchmarks.standins import create_mongo_client
+    from ..daos.user_dao_mongo import UserDAOMongo
+
+    dao = UserDAOMongo(client=create_mongo_client())
+    with UnitOfWork(dao) as uow:
+        dao.insert(User(None, 'Ada Lovelace', 'alovelace@example.com'))
+        # The stand-in is a standalone server: a session, but no multi-document transaction
+        assert uow.transactions[0].atomic is False
+        assert dao._session() is uow.transactions[0].session
+        with pytest.raises(TransactionError):
+            with uow.savepoint():
+                pass
+
+    assert dao._session() is None
+    assert dao.count() == 1
+
+def test_cqrs_propagates_only_committed_changes(tmp_path):
+    pytest.importorskip("mongomock")
+    from ..benchmarks.standins import create_mongo_client
+    from ..daos.user_dao_mongo import UserDAOMongo
+
+    dao = UserDAOCQRS(UserDAOSQLite(str(tmp_path / 'store.sqlite3')), UserDAOMongo(client=create_mongo_client()),
+                      read_your_writes=True)
+    with pytest.raises(RuntimeError):
+        with UnitOfWork(dao):
+            dao.insert(User(None, 'Ada Lovelace', 'alovelace@example.com'))
+            raise RuntimeError("abandon")
+    with UnitOfWork(dao) as uow:
+        user_id = dao.insert(User(None, 'Alan Turing', 'aturing@example.com'))
+        with pytest.raises(RuntimeError):
+            with uow.savepoint():
+                dao.insert(User(None, 'Grace Hopper', 'ghopper@example.com'))
+                raise RuntimeError("abandon")
+        assert dao.propagator.pending() == 0
+
+    assert [u.id for u in dao.select_all()] == [user_id]
+    dao.close()
@@ -27,6 +27,28 @@ def test_user_select(setup_test_data):
     user_list = dao.select_all()
     assert len(user_list) >= 3
 
+def test_user_select_page(setup_test_data):
+    dao = setup_test_data
+    all_ids = [u.id for u in dao.select_all()]
+
+    first_page = dao.select_page(0, 2)
+    assert [u.id for u in first_page] == all_ids[:2]
+    next_page = dao.select_page(first_page[-1].id, 2)
+    assert [u.id for u in next_page] == all_ids[2:4]
+
+    assert [u.id for u in dao.iter_all(batch_size=2)] == all_ids
+
+def test_user_lookups(setup_test_data):
+    dao = setup_test_data
+    user = dao.find_by_email('aturing@example.com')
+    assert user.name == 'Alan Turing'
+    assert dao.get_by_id(user.id).email == 'aturing@example.com'
+    assert dao.find_by_email('nobody@example.com') is None
+
+def test_user_count(setup_test_data):
+    dao = setup_test_data
+    assert dao.count() == len(dao.select_all())
+
 def test_user_insert(setup_test_data):
     dao = setup_test_data
     user = User(None, 'Margaret Hamilton', 'hamilton@example.com')
@@ -35,6 +57,16 @@ def test_user_insert(setup_test_data):
     emails = [u.email for u in user_list]
     assert user.email in emails
 
+def test_user_insert_many(setup_test_data):
+    dao = setup_test_data
+    users = [User(None, f'Bulk User {i}', f'bulk{i}@example.com') for i in range(5)]
+    assigned_ids = dao.insert_many(users, chunk_size=2)
+    assert len(set(assigned_ids)) == 5
+
+    users_by_id = {u.id: u for u in dao.select_all()}
+    for assigned_id, user in zip(assigned_ids, users):
+        assert users_by_id[assigned_id].email == user.email
+
 def test_user_update(setup_test_data):
     dao = setup_test_data
     user = User(None, 'Charles Babbage', 'babage@example.com')
@@ -0,0 +1,119 @@
+from ..daos.user_dao_cqrs import UserDAOCQRS, UserPropagator
+from ..daos.user_dao_sqlite import UserDAOSQLite
+from ..models.user import User
+from pymongo import ReplaceOne
+import threading
+import pytest
+
+pytest.importorskip("mongomock")
+from ..benchmarks.standins import create_mongo_client
+from ..daos.user_dao_mongo import UserDAOMongo
+
+class BlockingCollection:
+    """ Read-model collection whose writes wait until released """
+    def __init__(self, collection):
+        self.collection = collection
+        self.release = threading.Event()
+
+    def bulk_write(self, operations, ordered=True):
+        self.release.wait()
+        return self.collection.bulk_write(operations, ordered=ordered)
+
+@pytest.fixture
+def models(tmp_path):
+    writer = UserDAOSQLite(str(tmp_path / 'store.sqlite3'))
+    reader = UserDAOMongo(client=create_mongo_client())
+    yield writer, reader
+
+def test_cqrs_writes_go_to_mysql_and_reads_to_mongo(models):
+    writer, reader = models
+    dao = UserDAOCQRS(writer, reader, read_your_writes=False)
+
+    user_id = dao.insert(User(None, 'Ada Lovelace', 'alovelace@example.com'))
+    ids = dao.insert_many([User(None, 'Alan Turing', 'aturing@example.com'), User(None, 'Grace Hopper', 'ghopper@example.com')])
+    assert dao.propagator.flush(timeout=5)
+
+    assert writer.get_by_id(user_id).name == 'Ada Lovelace'
+    assert [u.id for u in reader.select_all()] == [user_id] + ids
+    assert dao.find_by_email('aturing@example.com').id == ids[0]
+    assert dao.count() == 3
+    assert dao.lag() == (0.0, 0)
+    dao.close()
+
+def test_cqrs_propagates_updates_and_deletes(models):
+    writer, reader = models
+    dao = UserDAOCQRS(writer, reader, read_your_writes=True)
+
+    user_id = dao.insert(User(None, 'Ada', 'ada@example.com'))
+    dao.update(User(user_id, 'Ada Lovelace', 'ada@example.com'))
+    assert dao.get_by_id(user_id).name == 'Ada Lovelace'
+
+    dao.delete(user_id)
+    assert dao.get_by_id(user_id) is None
+    dao.insert(User(None, 'Alan', 'alan@example.com'))
+    dao.delete_all()
+    assert dao.count() == 0
+    dao.close()
+
+def test_cqrs_update_of_missing_user_creates_nothing(models):
+    writer, reader = models
+    dao = UserDAOCQRS(writer, reader, read_your_writes=True)
+    user_id = dao.insert(User(None, 'Ada', 'ada@example.com'))
+
+    assert dao.update(User(4242, 'Ghost', 'ghost@example.com')) == 0
+    assert dao.update_many([User(777, 'Ghost', 'ghost@example.com'), User(user_id, 'Ada Lovelace', 'ada@example.com')]) == [1]
+    assert dao.propagator.flush(timeout=5)
+
+    assert writer.get_by_id(4242) is None
+    assert reader.get_by_id(4242) is None and reader.get_by_id(777) is None
+    assert [(u.id, u.name) for u in reader.select_all()] == [(user_id, 'Ada Lovelace')]
+    assert writer.count() == reader.count() == 1
+    dao.close()
+
+def test_update_right_after_insert_still_creates_the_user():
+    operations = UserPropagator._coalesce([
+        (1, [("upsert", 1, User(1, 'Ada', 'ada@example.com'))]),
+        (2, [("update", 1, User(1, 'Ada Lovelace', 'ada@example.com'))]),
+    ])
+    assert operations == [ReplaceOne({'_id': 1}, {'name': 'Ada Lovelace', 'email': 'ada@example.com'}, upsert=True)]
+
+def test_cqrs_propagates_bulk_writes(models):
+    writer, reader = models
+    dao = UserDAOCQRS(writer, reader, read_your_writes=True)
+    ids = dao.insert_many([User(None, f'Client {i}', f'client{i}@example.com') for i in range(4)])
+
+    assert dao.update_many([User(ids[0], 'Ada Lovelace', 'ada@example.com')]) == [1]
+    assert dao.delete_many(ids[1:3]) == [2]
+    dao.upsert_many([User(ids[3], 'Alan Turing', 'alan@example.com'), User(50, 'Grace Hopper', 'grace@example.com')])
+
+    assert [(u.id, u.name) for u in dao.select_all()] == [(ids[0], 'Ada Lovelace'), (ids[3], 'Alan Turing'), (50, 'Grace Hopper')]
+    dao.close()
+
+def test_read_your_writes_falls_back_to_mysql_when_lagging(models):
+    writer, reader = models
+    collection = BlockingCollection(reader.users)
+    propagator = UserPropagator(collection, max_delay=0)
+    dao = UserDAOCQRS(writer, reader, read_your_writes=True, consistency_timeout=0.05, propagator=propagator)
+
+    user_id = dao.insert(User(None, 'Ada', 'ada@example.com'))
+    lag, pending = dao.lag()
+    assert pending == 1
+
+    # The read model does not have the user yet: the read goes to MySQL
+    assert dao.get_by_id(user_id).name == 'Ada'
+    assert dao.fallback_reads == 1
+
+    collection.release.set()
+    assert propagator.flush(timeout=5)
+    assert reader.get_by_id(user_id).name == 'Ada'
+    dao.close()
+
+def test_propagator_coalesces_changes_per_user():
+    operations = UserPropagator._coalesce([
+        (1, [("upsert", 1, User(1, 'a', 'a@x')), ("upsert", 2, User(2, 'b', 'b@x'))]),
+        (2, [("upsert", 1, User(1, 'a2', 'a@x'))]),
+        (3, [("delete", 2, None)]),
+    ])
+    assert len(operations) == 2
+    assert operations[0]._doc == {'name': 'a2', 'email': 'a@x'}
+    assert operations[1]._filter == {'_id': 2}
@@ -0,0 +1,130 @@
+from ..daos.write_behind import WriteBehindFullError, WriteBehindQueue
+from ..daos.product_dao_sqlite import ProductDAOSQLite
+from ..models.product import Product
+import threading
+import pytest
+
+class RecordingDAO:
+    """ Stand-in that records every insert_many batch """
+    def __init__(self, gate=None):
+        self.batches = []
+        self.next_id = 1
+        self.gate = gate
+
+    def insert_many(self, items, chunk_size=None):
+        if self.gate is not None:
+            self.gate.wait()
+        self.batches.append(list(items))
+        ids = list(range(self.next_id, self.next_id + len(items)))
+        self.next_id += len(items)
+        return ids
+
+def test_write_behind_groups_inserts_into_batches():
+    dao = RecordingDAO()
+    writes = WriteBehindQueue(dao, batch_size=10, max_delay=1.0)
+
+    futures = [writes.submit(f"row {i}") for i in range(25)]
+    assert writes.flush(timeout=5)
+
+    assert [f.result() for f in futures] == list(range(1, 26))
+    assert [len(batch) for batch in dao.batches] == [10, 10, 5]
+    writes.close()
+
+def test_write_behind_flushes_after_max_delay():
+    dao = RecordingDAO()
+    writes = WriteBehindQueue(dao, batch_size=100, max_delay=0.01)
+
+    assert writes.submit("row").result(timeout=5) == 1
+    writes.close()
+
+def test_write_behind_close_writes_pending_items():
+    dao = RecordingDAO()
+    writes = WriteBehindQueue(dao, batch_size=1000, max_delay=60)
+    futures = [writes.submit(i) for i in range(50)]
+
+    writes.close()
+
+    assert all(f.done() for f in futures)
+    assert sum(len(batch) for batch in dao.batches) == 50
+    with pytest.raises(RuntimeError):
+        writes.submit("late")
+
+def test_write_behind_applies_back_pressure():
+    gate = threading.Event()
+    writes = WriteBehindQueue(RecordingDAO(gate), batch_size=1, max_delay=0, max_pending=2, put_timeout=0.05)
+
+    # The worker holds one item while blocked on the gate, the queue holds two more
+    writes.submit(1)
+    with pytest.raises(WriteBehindFullError):
+        for i in range(3):
+            writes.submit(i)
+
+    gate.set()
+    writes.close()
+
+def test_write_behind_reports_dao_errors():
+    class FailingDAO:
+        def insert_many(self, items, chunk_size=None):
+            raise ValueError("duplicate")
+
+    writes = WriteBehindQueue(FailingDAO(), max_delay=0)
+    future = writes.submit("row")
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+    writes.close()
+    assert writes.stats()["failed_rows"] == 1
+
+def test_write_behind_on_sqlite(tmp_path):
+    dao = ProductDAOSQLite(str(tmp_path / 'store.sqlite3'))
+    writes = WriteBehindQueue(dao, batch_size=64, max_delay=0.01)
+
+    futures = [writes.submit(Product(None, f'Produit {i}', 'Marque', 1.0 + i)) for i in range(200)]
+    writes.close()
+
+    ids = [f.result() for f in futures]
+    assert len(set(ids)) == 200
+    assert dao.get_by_id(ids[-1]).name == 'Produit 199'
+    assert writes.batches <= 200 // 64 + 2
+    dao.close()
+
+def test_write_behind_submit_racing_close_never_strands_a_future():
+    for _ in range(20):
+        writes = WriteBehindQueue(RecordingDAO(), batch_size=8, max_delay=0)
+        futures, start = [], threading.Barrier(5)
+        def submit_until_closed():
+            start.wait()
+            try:
+                while True:
+                    futures.append(writes.submit("row"))
+            except RuntimeError:
+                pass
+        submitters = [threading.Thread(target=submit_until_closed) for _ in range(4)]
+        for thread in submitters:
+            thread.start()
+        start.wait()
+        writes.close()
+        for thread in submitters:
+            thread.join()
+
+        # Every accepted item was written before the worker stopped
+        assert all(f.done() for f in futures)
+        assert len({f.result() for f in futures}) == len(futures)
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_write_behind_fails_items_left_behind_by_the_worker():
+    def crash(ids):
+        raise KeyboardInterrupt()
+
+    gate = threading.Event()
+    writes = WriteBehindQueue(RecordingDAO(gate), batch_size=1, max_delay=0, on_flush=crash)
+    first = writes.submit("first")
+    second = writes.submit("second")
+    gate.set()
+    writes._worker.join(5)
+
+    assert first.result(timeout=5) == 1
+    with pytest.raises(RuntimeError):
+        second.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        writes.submit("late")
+    assert writes.stats()["failed_rows"] == 1
@@ -0,0 +1,170 @@
+"""
+Non-interactive command line for the store manager
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import argparse
+import sqlite3
+import sys
+import os
+import mysql.connector
+from pymongo.errors import PyMongoError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.migration_controller import DEFAULT_WORKERS, UserMigration
+from controllers.product_controller import ProductController
+from controllers.transfer_controller import ENTITIES, FORMATS, TransferController
+from controllers.user_controller import UserController
+from daos.batching import DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE
+from daos.resilience import DatabaseUnavailableError
+from views.pagination import SCREEN_SIZE
+from views.row_writer import OUTPUT_FORMATS, RowWriter
+
+
+def print_progress(progress):
+    """ Progress goes to stderr so that exports to stdout stay clean """
+    print(f"\r{progress.rows} lignes, {progress.rows_per_second:.0f} lignes/s", end="", file=sys.stderr, flush=True)
+
+
+def import_command(args):
+    controller = TransferController(args.entity)
+    try:
+        progress = controller.import_file(args.file, args.format, args.chunk_size, print_progress, args.load_data)
+    finally:
+        controller.shutdown()
+    print(f"\nImporté {progress.rows} lignes en {progress.elapsed:.1f} s ({progress.rows_per_second:.0f} lignes/s)",
+          file=sys.stderr)
+    return 0
+
+
+def export_command(args):
+    controller = TransferController(args.entity)
+    try:
+        if args.file == "-":
+            progress = controller.export_stream(sys.stdout, args.format or "csv", args.chunk_size)
+        else:
+            progress = controller.export_file(args.file, args.format, args.chunk_size, print_progress)
+    finally:
+        controller.shutdown()
+    print(f"\nExporté {progress.rows} lignes en {progress.elapsed:.1f} s ({progress.rows_per_second:.0f} lignes/s)",
+          file=sys.stderr)
+    return 0
+
+
+def ask_next_page():
+    """ Prompt on stderr so that the listing on stdout stays clean """
+    print("Entrée pour la page suivante, q pour arrêter : ", end="", file=sys.stderr, flush=True)
+    answer = sys.stdin.readline()
+    return bool(answer) and answer.strip().lower() != "q"
+
+
+def list_command(args):
+    if args.entity == "products":
+        controller = ProductController()
+        fetch_page = controller.list_products_page
+    else:
+        controller = UserController()
+        fetch_page = controller.list_users_page
+    writer = RowWriter(sys.stdout, ENTITIES[args.entity][0], args.format)
+    page_size = args.page_size if args.page else DEFAULT_PAGE_SIZE
+    try:
+        # Pages are written as they arrive: memory use does not depend on the number of rows
+        after_id, remaining = args.after_id, args.limit
+        while remaining is None or remaining > 0:
+            limit = page_size if remaining is None else min(page_size, remaining)
+            rows = fetch_page(after_id, limit)
+            writer.write_rows(rows)
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < limit:
+                break
+            after_id = rows[-1].id
+            if args.page and (remaining is None or remaining > 0):
+                writer.flush()
+                if not ask_next_page():
+                    break
+        writer.close()
+    finally:
+        controller.shutdown()
+    return 0
+
+
+def migrate_users_command(args):
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    migration = UserMigration(workers=args.workers, chunk_size=args.chunk_size, checkpoint_path=args.checkpoint)
+    try:
+        migration.plan()
+        progress = migration.copy(print_progress)
+        print(f"\nCopié {progress.rows} lignes en {progress.elapsed:.1f} s ({progress.rows_per_second:.0f} lignes/s)",
+              file=sys.stderr)
+        if args.no_verify:
+            return 0
+        report = migration.verify()
+    finally:
+        migration.shutdown()
+    print(f"Vérification : {report['source_rows']} lignes dans MySQL, {report['target_rows']} dans MongoDB", file=sys.stderr)
+    for after_id, until_id in report["mismatched_ranges"]:
+        print(f"Différence dans les ID {after_id + 1} à {until_id}", file=sys.stderr)
+    return 1 if report["mismatched_ranges"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="store_manager.py", description="Le magasin du coin")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    importer = subcommands.add_parser("import", help="importer un fichier CSV ou JSONL")
+    importer.add_argument("file")
+    importer.add_argument("--entity", choices=sorted(ENTITIES), default="products")
+    importer.add_argument("--format", choices=FORMATS, help="par défaut, déduit de l'extension du fichier")
+    importer.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="lignes par lot (un commit par lot)")
+    importer.add_argument("--load-data", action="store_true",
+                          help="utiliser LOAD DATA LOCAL INFILE pour un CSV de produits sur MySQL")
+    importer.set_defaults(handler=import_command)
+
+    exporter = subcommands.add_parser("export", help="exporter vers un fichier CSV ou JSONL")
+    exporter.add_argument("file", help="fichier de sortie, ou - pour la sortie standard")
+    exporter.add_argument("--entity", choices=sorted(ENTITIES), default="products")
+    exporter.add_argument("--format", choices=FORMATS, help="par défaut, déduit de l'extension du fichier")
+    exporter.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="lignes lues par page")
+    exporter.set_defaults(handler=export_command)
+
+    for entity in ("products", "users"):
+        lister = subcommands.add_parser(f"list-{entity}", help=f"lister les {'produits' if entity == 'products' else 'utilisateurs'}")
+        lister.add_argument("--format", choices=OUTPUT_FORMATS, default="table")
+        lister.add_argument("--limit", type=int, help="nombre maximal de lignes")
+        lister.add_argument("--after-id", type=int, default=0, help="commencer après cet ID")
+        lister.add_argument("--page", action="store_true", help="s'arrêter après chaque écran")
+        lister.add_argument("--page-size", type=int, default=SCREEN_SIZE, help="lignes par écran avec --page")
+        lister.set_defaults(handler=list_command, entity=entity)
+
+    migrator = subcommands.add_parser("migrate-users", help="copier les utilisateurs de MySQL vers MongoDB")
+    migrator.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="lectures et écritures en parallèle")
+    migrator.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="lignes par lot")
+    migrator.add_argument("--checkpoint", default="users_migration.checkpoint.json",
+                          help="fichier de reprise ; une nouvelle exécution ne copie que ce qui reste")
+    migrator.add_argument("--restart", action="store_true", help="ignorer le fichier de reprise et tout recopier")
+    migrator.add_argument("--no-verify", action="store_true", help="ne pas comparer les comptes et les sommes de contrôle")
+    migrator.set_defaults(handler=migrate_users_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # The reader of our output went away (e.g. `| head`): stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except DatabaseUnavailableError as e:
+        # Database unreachable, circuit open or deadline exceeded
+        print(f"\nErreur : {e}. Réessayez plus tard.", file=sys.stderr)
+        return 1
+    except (mysql.connector.Error, sqlite3.Error, PyMongoError) as e:
+        print(f"\nErreur de la base de données : {e}", file=sys.stderr)
+        return 1
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"\nErreur : {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1,20 @@
+"""
+Pagination helper for the views
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+
+SCREEN_SIZE = 20
+
+def show_pages(fetch_page, show_rows, page_size=SCREEN_SIZE):
+    """ Show rows one screen at a time; fetch_page(after_id, limit) returns the rows after the given ID """
+    after_id = 0
+    while True:
+        rows = fetch_page(after_id, page_size)
+        if rows:
+            show_rows(rows)
+        if len(rows) < page_size:
+            return
+        if input("Entrée pour la page suivante, q pour arrêter : ").strip().lower() == 'q':
+            return
+        after_id = rows[-1].id
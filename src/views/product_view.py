@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from controllers.product_controller import ProductController
 from models.product import Product
+from views.pagination import show_pages
 
 class ProductView:
     @staticmethod
@@ -21,8 +22,7 @@ class ProductView:
             choice = input("Choisissez une option: ")
 
             if choice == '1':
-                products = controller.list_products()
-                ProductView.show_products(products)
+                ProductView.show_product_pages(controller)
             elif choice == '2':
                 name, brand, price = ProductView.get_inputs()
                 product = Product(None, name, brand, price)
@@ -35,8 +35,23 @@ class ProductView:
 
     @staticmethod
     def show_products(products):
-        """ List products """
-        print("\n".join(f"{product.id}: {product.name} ({product.brand}) - {product.price}€" for product in products))
+        """ List products, one line at a time rather than one big joined string """
+        sys.stdout.writelines(f"{product.id}: {product.name} ({product.brand}) - {product.price}€\n" for product in products)
+
+    @staticmethod
+    def show_product_pages(controller):
+        """ List products one screen at a time """
+        show_pages(controller.list_products_page, ProductView.show_products)
+
+    @staticmethod
+    def show_summary(total, stats):
+        """ Show product count and price statistics per brand """
+        print(f"{total} article(s)")
+        print("\n".join(
+            f"{stat['brand']}: {stat['count']} article(s), prix min {stat['min']:.2f}€, max {stat['max']:.2f}€, "
+            f"moyen {stat['avg']:.2f}€, total {stat['sum']:.2f}€"
+            for stat in stats
+        ))
 
     @staticmethod
     def get_inputs():
@@ -46,6 +61,14 @@ class ProductView:
         price = float(input("Prix du produit : ").strip())
         return name, brand, price
 
+    @staticmethod
+    def get_search_inputs():
+        """ Prompt user for search words and an optional price range """
+        text = input("Mots recherchés (nom ou marque, début de mot accepté) : ").strip()
+        lo = input("Prix minimum (vide pour aucun) : ").strip()
+        hi = input("Prix maximum (vide pour aucun) : ").strip()
+        return text, float(lo) if lo else None, float(hi) if hi else None
+
     @staticmethod
     def get_product_id():
         """ Prompt user for product ID """
@@ -0,0 +1,78 @@
+"""
+Buffered, streamed output of rows as a table, CSV or JSON lines
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Auteurs : Gabriel C. Ullmann, Fabio Petrillo, 2025
+"""
+import csv
+import json
+
+OUTPUT_FORMATS = ("table", "csv", "jsonl")
+# Rows formatted before each write to the stream
+DEFAULT_BUFFER_ROWS = 1000
+MAX_COLUMN_WIDTH = 40
+
+
+class RowWriter:
+    """
+    Formats model objects as they arrive and writes them in chunks of `buffer_rows` rows,
+    so that output of any length only keeps one chunk in memory. Table column widths are
+    taken from the first rows written; longer values later on simply overflow.
+    """
+
+    def __init__(self, stream, columns, fmt="table", buffer_rows=DEFAULT_BUFFER_ROWS):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Format inconnu : {fmt}")
+        self.stream = stream
+        self.columns = columns
+        self.fmt = fmt
+        self.buffer_rows = buffer_rows
+        self.rows = 0
+        self._buffer = []
+        self._widths = None
+        # csv.writer formats into our buffer through write()
+        self._csv = csv.writer(self, lineterminator="\n") if fmt == "csv" else None
+        if self._csv:
+            self._csv.writerow(columns)
+
+    def write(self, text):
+        self._buffer.append(text)
+
+    def write_rows(self, items):
+        """ Format items (objects with the columns as attributes), flushing every buffer_rows rows """
+        for item in items:
+            values = [getattr(item, column) for column in self.columns]
+            if self._csv:
+                self._csv.writerow(values)
+            elif self.fmt == "jsonl":
+                self._buffer.append(json.dumps(dict(zip(self.columns, values)), ensure_ascii=False) + "\n")
+            else:
+                if self._widths is None:
+                    self._start_table(items)
+                self._buffer.append(self._table_line(values))
+            self.rows += 1
+            if self.rows % self.buffer_rows == 0:
+                self.flush()
+
+    def _start_table(self, items):
+        widths = [len(column) for column in self.columns]
+        for item in items[:self.buffer_rows] if isinstance(items, list) else ():
+            for i, column in enumerate(self.columns):
+                widths[i] = max(widths[i], min(len(str(getattr(item, column))), MAX_COLUMN_WIDTH))
+        self._widths = widths
+        self._buffer.append(self._table_line(self.columns))
+        self._buffer.append("  ".join("-" * width for width in widths) + "\n")
+
+    def _table_line(self, values):
+        return "  ".join(str(value).ljust(width) for value, width in zip(values, self._widths)).rstrip() + "\n"
+
+    def close(self):
+        """ Write what is left (and the table header if no row came) """
+        if self.fmt == "table" and self._widths is None:
+            self._start_table([])
+        self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+        self.stream.flush()
@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.user import User
 from controllers.user_controller import UserController
+from views.pagination import show_pages
 
 class UserView:
     @staticmethod
@@ -20,8 +21,7 @@ class UserView:
             choice = input("Choisissez une option: ")
 
             if choice == '1':
-                users = controller.list_users()
-                UserView.show_users(users)
+                UserView.show_user_pages(controller)
             elif choice == '2':
                 name, email = UserView.get_inputs()
                 user = User(None, name, email)
@@ -34,8 +34,13 @@ class UserView:
 
     @staticmethod
     def show_users(users):
-        """ List users """
-        print("\n".join(f"{user.id}: {user.name} ({user.email})" for user in users))
+        """ List users, one line at a time rather than one big joined string """
+        sys.stdout.writelines(f"{user.id}: {user.name} ({user.email})\n" for user in users)
+
+    @staticmethod
+    def show_user_pages(controller):
+        """ List users one screen at a time """
+        show_pages(controller.list_users_page, UserView.show_users)
 
     @staticmethod
     def get_inputs():
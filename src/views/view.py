@@ -10,8 +10,12 @@ from views.product_view import ProductView
 from views.user_view import UserView
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config import get_settings
+from controllers.cache import catalog_cache_from_env
+from controllers.lazy import Lazy
 from controllers.product_controller import ProductController
 from controllers.user_controller import UserController
+from daos.resilience import DatabaseUnavailableError
 from models.product import Product
 from models.user import User
 
@@ -19,8 +23,10 @@ class View:
     @staticmethod
     def show_options():
         """ Show menu with operation options which can be selected by the user """
-        user_controller = UserController()
-        product_controller = ProductController()
+        # Controllers (and their connections) are only built when an option needs them
+        write_behind = get_settings().write_behind
+        user_controller = Lazy(lambda: UserController(write_behind=write_behind))
+        product_controller = Lazy(lambda: ProductController(cache=catalog_cache_from_env(), write_behind=write_behind))
         
         while True:
             print("\n=== MENU PRINCIPAL ===")
@@ -29,45 +35,61 @@ class View:
             print("3. Montrer la liste d'articles")
             print("4. Ajouter un article")
             print("5. Supprimer un article")
-            print("6. Quitter l'appli")
+            print("6. Résumé du catalogue")
+            print("7. Rechercher un article")
+            print("8. Quitter l'appli")
             
             choice = input("Choisissez une option: ")
             
-            if choice == '1':
-                # Voir la liste d'utilisateurs
-                users = user_controller.list_users()
-                UserView.show_users(users)
-            elif choice == '2':
-                # Remplir formulaire d'utilisateur et ajouter
-                name, email = UserView.get_inputs()
-                user = User(None, name, email)
-                user_controller.create_user(user)
-                print("Utilisateur ajouté avec succès!")
-            elif choice == '3':
-                # Voir la liste d'articles
-                products = product_controller.list_products()
-                ProductView.show_products(products)
-            elif choice == '4':
-                # Remplir formulaire d'article et ajouter
-                name, brand, price = ProductView.get_inputs()
-                product = Product(None, name, brand, price)
-                product_controller.create_product(product)
-                print("Article ajouté avec succès!")
-            elif choice == '5':
-                # Supprimer un article
-                products = product_controller.list_products()
-                if products:
-                    ProductView.show_products(products)
-                    product_id = ProductView.get_product_id()
-                    product_controller.delete_product(product_id)
-                    print("Article supprimé avec succès!")
+            try:
+                if choice == '1':
+                    # Voir la liste d'utilisateurs
+                    UserView.show_user_pages(user_controller)
+                elif choice == '2':
+                    # Remplir formulaire d'utilisateur et ajouter
+                    name, email = UserView.get_inputs()
+                    user = User(None, name, email)
+                    user_controller.create_user(user)
+                    print("Utilisateur ajouté avec succès!")
+                elif choice == '3':
+                    # Voir la liste d'articles
+                    ProductView.show_product_pages(product_controller)
+                elif choice == '4':
+                    # Remplir formulaire d'article et ajouter
+                    name, brand, price = ProductView.get_inputs()
+                    product = Product(None, name, brand, price)
+                    product_controller.create_product(product)
+                    print("Article ajouté avec succès!")
+                elif choice == '5':
+                    # Supprimer un article
+                    if product_controller.has_products():
+                        ProductView.show_product_pages(product_controller)
+                        product_id = ProductView.get_product_id()
+                        product_controller.delete_product(product_id)
+                        print("Article supprimé avec succès!")
+                    else:
+                        print("Aucun article disponible à supprimer.")
+                elif choice == '6':
+                    # Statistiques calculées par la base de données
+                    ProductView.show_summary(product_controller.count_products(), product_controller.catalog_summary())
+                elif choice == '7':
+                    # Recherche par mot, préfixe ou fourchette de prix, dans l'index en mémoire
+                    text, lo, hi = ProductView.get_search_inputs()
+                    products = product_controller.search_products(text, lo, hi)
+                    if products:
+                        ProductView.show_products(products)
+                    else:
+                        print("Aucun article trouvé.")
+                elif choice == '8':
+                    # Quitter l'appli
+                    if user_controller.created:
+                        user_controller.shutdown()
+                    if product_controller.created:
+                        product_controller.shutdown()
+                    print("Au revoir!")
+                    break
                 else:
-                    print("Aucun article disponible à supprimer.")
-            elif choice == '6':
-                # Quitter l'appli
-                user_controller.shutdown()
-                product_controller.shutdown()
-                print("Au revoir!")
-                break
-            else:
-                print("Cette option n'existe pas.")
\ No newline at end of file
+                    print("Cette option n'existe pas.")
+            except DatabaseUnavailableError as e:
+                # Database unreachable, circuit open or deadline exceeded: back to the menu instead of exiting
+                print(f"{e}. Réessayez plus tard.")
\ No newline at end of file